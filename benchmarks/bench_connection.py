@@ -0,0 +1,99 @@
+"""Latencia por llamada: conexión nueva por operación vs. conexión persistente.
+
+Uso: ``python benchmarks/bench_connection.py [--calls N]``
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import models
+import seed
+
+
+def _legacy_connection() -> sqlite3.Connection:
+    # Réplica del get_connection() original: mkdir + connect + pragmas en cada llamada.
+    db.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _legacy_count_alimentos() -> int:
+    with _legacy_connection() as conn:
+        return int(conn.execute("SELECT COUNT(*) FROM alimentos").fetchone()[0])
+
+
+def _legacy_upsert(minuta_id: int, alimento_id: int, gramos: float) -> None:
+    with _legacy_connection() as conn:
+        existing = conn.execute(
+            "SELECT id FROM minuta_items WHERE minuta_id = ? AND alimento_id = ?",
+            (minuta_id, alimento_id),
+        ).fetchone()
+        if existing:
+            conn.execute("UPDATE minuta_items SET gramos_1_2 = ? WHERE id = ?", (gramos, existing["id"]))
+        else:
+            conn.execute(
+                "INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2) VALUES (?, ?, ?)",
+                (minuta_id, alimento_id, gramos),
+            )
+        conn.commit()
+
+
+def _per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATA_DIR = Path(tmp)
+        db.DB_PATH = db.DATA_DIR / "bench.db"
+        db.init_db()
+        seed.seed_if_empty()
+        minuta_id = models.create_minuta("Bench")
+        alimento_ids = [row["id"] for row in models.list_alimentos()]
+
+        def legacy_write() -> None:
+            _legacy_upsert(minuta_id, alimento_ids[0], 10.0)
+
+        def pooled_write() -> None:
+            models.add_or_update_item_by_group(minuta_id, alimento_ids[0], "g1", 10.0)
+
+        def pooled_write_batched() -> None:
+            with db.transaction():
+                for alimento_id in alimento_ids[:50]:
+                    models.add_or_update_item_by_group(minuta_id, alimento_id, "g1", 10.0)
+
+        results = [
+            ("lectura count_alimentos (antes)", _per_call_us(_legacy_count_alimentos, args.calls)),
+            ("lectura count_alimentos (después)", _per_call_us(models.count_alimentos, args.calls)),
+            ("upsert por fila (antes)", _per_call_us(legacy_write, args.calls // 4)),
+            ("upsert por fila (después)", _per_call_us(pooled_write, args.calls // 4)),
+            (
+                "upsert en transacción, por fila (después)",
+                _per_call_us(pooled_write_batched, max(1, args.calls // 200)) / 50,
+            ),
+        ]
+        db.close_connection()
+
+    for label, micros in results:
+        print(f"{label:<45} {micros:10.1f} µs/llamada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""RSS máximo y tiempo de lectura de una hoja grande: modo normal vs. streaming.
+
+Cada medición corre en un subproceso aparte para que el RSS máximo sea propio.
+
+Uso: ``python benchmarks/bench_excel_streaming.py [--rows N]``
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+
+def _build_workbook(path: Path, rows: int) -> None:
+    from openpyxl import Workbook
+
+    import excel_minutas
+    import seed
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("MinutaGrupo")
+    ws.append(excel_minutas.GROUP_HEADERS)
+    for idx in range(rows):
+        ws.append([seed.INITIAL_FOODS[idx % len(seed.INITIAL_FOODS)], 10 + idx % 90])
+    wb.save(path)
+
+
+def _measure(mode: str, xlsx: Path, data_dir: Path) -> dict[str, float]:
+    start = time.perf_counter()
+    if mode == "normal":
+        # Lectura previa a este cambio: libro completo en memoria.
+        from openpyxl import load_workbook
+
+        wb = load_workbook(filename=xlsx, data_only=True)
+        ws = wb["MinutaGrupo"]
+        count = sum(1 for _ in ws.iter_rows(min_row=2, values_only=True))
+    else:
+        import db
+        import excel_minutas
+        import models
+        import seed
+
+        db.DATA_DIR = data_dir
+        db.DB_PATH = data_dir / f"bench_{mode}.db"
+        db.init_db()
+        seed.seed_if_empty()
+        minuta_id = models.create_minuta("Bench")
+        if mode == "streaming":
+            with excel_minutas._read_sheet(xlsx, "MinutaGrupo") as (rows, _total):
+                next(rows)
+                count = sum(1 for _ in rows)
+        else:
+            count = excel_minutas.import_minuta_group(xlsx, minuta_id=minuta_id, grupo="g1").rows_processed
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"rows": count, "seconds": elapsed, "peak_rss_mib": peak_kib / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "XLSX", "DATA_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, xlsx, data_dir = args.child
+        print(json.dumps(_measure(mode, Path(xlsx), Path(data_dir))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = Path(tmp) / "bench.xlsx"
+        _build_workbook(xlsx, args.rows)
+        for mode, label in (
+            ("normal", "lectura modo normal (antes)"),
+            ("streaming", "lectura read_only (después)"),
+            ("import", "import_minuta_group completo"),
+        ):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(xlsx), tmp],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{label:<32} filas={result['rows']:>7}  "
+                f"tiempo={result['seconds']:6.2f} s  RSS máx={result['peak_rss_mib']:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Tiempo y memoria de la exportación de pedidos semanales (una hoja por jardín).
+
+Uso: ``python benchmarks/bench_export_pedidos.py [--jardines 300] [--alimentos 150]``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import excel_pedidos
+
+MINUTAS = 25
+MINUTAS_PER_WEEK = 5
+
+
+def _populate(jardines: int, alimentos: int) -> list[int]:
+    rng = random.Random(jardines * alimentos)
+    conn = db.get_connection()
+    with db.transaction():
+        conn.executemany(
+            "INSERT INTO alimentos(nombre, nombre_normalizado) VALUES (?, ?)",
+            [(f"Alimento {i}", f"alimento {i}") for i in range(alimentos)],
+        )
+        alimento_ids = [row[0] for row in conn.execute("SELECT id FROM alimentos")]
+        conn.executemany(
+            "INSERT INTO minutas(nombre, nombre_clave) VALUES (?, ?)",
+            [(f"Minuta {i}", f"minuta {i}") for i in range(MINUTAS)],
+        )
+        minuta_ids = [row[0] for row in conn.execute("SELECT id FROM minutas")]
+        # Cada minuta usa todo el catálogo para que cada hoja tenga ``alimentos`` filas.
+        conn.executemany(
+            "INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5) VALUES (?, ?, ?, ?)",
+            [
+                (minuta_id, alimento_id, rng.randint(5, 80), rng.randint(5, 120))
+                for minuta_id in minuta_ids
+                for alimento_id in alimento_ids
+            ],
+        )
+        conn.executemany("INSERT INTO jardines(nombre) VALUES (?)", [(f"Jardín {i}",) for i in range(jardines)])
+        jardin_ids = [row[0] for row in conn.execute("SELECT id FROM jardines")]
+        conn.executemany(
+            "INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden) VALUES (?, ?, ?)",
+            [
+                (jardin_id, minuta_id, orden)
+                for jardin_id in jardin_ids
+                for orden, minuta_id in enumerate(rng.sample(minuta_ids, MINUTAS_PER_WEEK), start=1)
+            ],
+        )
+    return jardin_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jardines", type=int, default=300)
+    parser.add_argument("--alimentos", type=int, default=150)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATA_DIR = Path(tmp)
+        db.DB_PATH = db.DATA_DIR / "bench.db"
+        db.init_db()
+        jardin_ids = _populate(args.jardines, args.alimentos)
+        ninos = {jardin_id: (20, 25) for jardin_id in jardin_ids}
+
+        for nombre, export, suffix in (
+            ("xlsx", excel_pedidos.export_weekly_orders_xlsx, ".xlsx"),
+            ("csv", excel_pedidos.export_weekly_orders_csv, ".csv"),
+        ):
+            output = Path(tmp) / f"pedido{suffix}"
+            start = time.perf_counter()
+            export(output, ninos)
+            elapsed = time.perf_counter() - start
+            size_kib = output.stat().st_size / 1024
+            print(f"{nombre:>5}: {elapsed:6.2f}s  {size_kib:8.0f} KiB")
+        db.close_connection()
+
+    print(f"RSS máximo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Tiempo por consulta del FoodMatcher sobre catálogos sintéticos grandes.
+
+Uso: ``python benchmarks/bench_fuzzy_match.py [--foods 10000 50000] [--queries 2000]``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fuzzy_match import FoodMatcher
+from seed import INITIAL_FOODS
+
+QUALIFIERS = ["crudo", "cocido", "orgánico", "fresco", "congelado", "en polvo", "maduro", "verde", "tajado"]
+SYLLABLES = [
+    onset + vowel
+    for onset in ["b", "c", "d", "f", "g", "j", "l", "m", "n", "p", "r", "s", "t", "v", "z", "ch", "ll", "br", "tr", "cr"]
+    for vowel in "aeiou"
+]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _catalog(size: int, rng: random.Random) -> list[str]:
+    """Nombres de 1 a 3 palabras de un vocabulario amplio, con calificadores comunes."""
+    vocabulary = sorted({_word(rng) for _ in range(size // 2)} | {name.split(",")[0] for name in INITIAL_FOODS})
+    names: set[str] = set()
+    while len(names) < size:
+        words = rng.sample(vocabulary, rng.randint(1, 2))
+        if rng.random() < 0.4:
+            words.append(rng.choice(QUALIFIERS))
+        names.add(" ".join(words).capitalize())
+    return sorted(names)
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    chars = list(name.lower())
+    position = rng.randrange(len(chars))
+    chars[position] = rng.choice("aeiou")
+    return "".join(chars)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--foods", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in args.foods:
+        rng = random.Random(size)
+        catalog = _catalog(size, rng)
+        start = time.perf_counter()
+        matcher = FoodMatcher(enumerate(catalog, start=1))
+        build_ms = (time.perf_counter() - start) * 1000
+
+        queries = [_typo(rng.choice(catalog), rng) for _ in range(args.queries)]
+        start = time.perf_counter()
+        for query in queries:
+            matcher.match(query)
+        per_query_ms = (time.perf_counter() - start) / len(queries) * 1000
+        print(f"catálogo={size:>6}  índice={build_ms:8.1f} ms  consulta={per_query_ms:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
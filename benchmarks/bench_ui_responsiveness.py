@@ -0,0 +1,99 @@
+"""Pausas del hilo de interfaz mientras una importación grande corre en segundo plano.
+
+Simula el bucle de eventos de Tk con ticks de 10 ms en el hilo principal y mide
+el mayor intervalo entre ticks mientras ``import_minutas`` procesa un Excel de
+``--rows`` filas, primero en el mismo hilo (como antes) y luego con TaskRunner.
+
+Uso: ``python benchmarks/bench_ui_responsiveness.py [--rows 50000]``
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import datagen
+import db
+import excel_minutas
+import seed
+from ui_tasks import TaskRunner
+
+TICK_S = 0.010
+
+
+class LoopScheduler:
+    """``after()`` mínimo: guarda callbacks para el bucle simulado."""
+
+    def __init__(self) -> None:
+        self.callbacks: list = []
+
+    def after(self, _ms: int, callback) -> None:
+        self.callbacks.append(callback)
+
+
+def _fresh_db(tmp: Path, name: str) -> None:
+    db.close_connection()
+    db.DATA_DIR = tmp
+    db.DB_PATH = tmp / name
+    db.init_db()
+    seed.seed_if_empty()
+
+
+def _blocking(path: Path) -> float:
+    # Con la importación en el hilo de interfaz no hay ticks: la pausa es toda la importación.
+    start = time.perf_counter()
+    excel_minutas.import_minutas(path)
+    return (time.perf_counter() - start) * 1000
+
+
+def _background(path: Path) -> tuple[float, float]:
+    scheduler = LoopScheduler()
+    runner = TaskRunner(scheduler, poll_ms=25)
+    done: list[object] = []
+    runner.submit(excel_minutas.import_minutas, path, on_success=done.append, on_error=done.append)
+
+    start = last = time.perf_counter()
+    max_gap = 0.0
+    while not done:
+        time.sleep(TICK_S)
+        now = time.perf_counter()
+        max_gap = max(max_gap, now - last)
+        last = now
+        due, scheduler.callbacks = scheduler.callbacks, []
+        for callback in due:
+            callback()
+    return (time.perf_counter() - start) * 1000, max_gap * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    logging.getLogger("excel_minutas").setLevel(logging.ERROR)
+
+    scale = datagen.Scale(alimentos=2_000, jardines=0, minutas=0, items_per_minuta=0, minutas_per_week=0, excel_rows=args.rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        path = datagen.write_minutas_workbook(tmp / "minutas.xlsx", scale, seed=1)
+        catalog = datagen.Scale(alimentos=2_000, jardines=0, minutas=0, items_per_minuta=0, minutas_per_week=0, excel_rows=0)
+
+        _fresh_db(tmp, "blocking.db")
+        datagen.populate(catalog, 1)
+        blocked_ms = _blocking(path)
+
+        _fresh_db(tmp, "background.db")
+        datagen.populate(catalog, 1)
+        db.close_connection()
+        total_ms, max_gap_ms = _background(path)
+
+    print(f"Hilo de interfaz: pausa de {blocked_ms:.0f} ms")
+    print(f"TaskRunner:       importación {total_ms:.0f} ms, mayor intervalo entre ticks {max_gap_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Tabla virtual vs. Treeview completo para tablas grandes.
+
+Mide el almacén por columnas (carga, refresco tras editar una fila, orden) y,
+si hay pantalla, el costo de llenar un Treeview fila a fila frente a la tabla
+virtual.
+
+Uso: ``python benchmarks/bench_virtual_table.py [--rows N]``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ui_virtual_table import ColumnStore
+
+
+def _rows(count: int, seed: int = 7) -> list[tuple[int, tuple[str, float, float]]]:
+    rng = random.Random(seed)
+    return [(key, (f"Alimento {rng.randrange(count):06d}", rng.uniform(1, 80), rng.uniform(1, 120))) for key in range(count)]
+
+
+def _timed(label: str, fn) -> None:
+    started = time.perf_counter()
+    fn()
+    print(f"{label:<44} {(time.perf_counter() - started) * 1000:>10.1f} ms")
+
+
+def bench_store(rows: list) -> None:
+    store = ColumnStore(["alimento", "g1", "g2"])
+    _timed("ColumnStore.replace (carga inicial)", lambda: store.replace(rows))
+    edited = list(rows)
+    key, (name, g1, g2) = edited[len(edited) // 2]
+    edited[len(edited) // 2] = (key, (name, g1 + 1, g2))
+    _timed("ColumnStore.replace (1 fila editada)", lambda: store.replace(edited))
+    _timed("ColumnStore.sort por alimento", lambda: store.sort("alimento"))
+    _timed("ColumnStore.sort por g1 descendente", lambda: store.sort("g1", reverse=True))
+    _timed("ColumnStore.replace (1 fila editada, ordenado)", lambda: store.replace(rows))
+
+
+def bench_widgets(rows: list) -> None:
+    import tkinter as tk
+    from tkinter import ttk
+
+    from ui_virtual_table import VirtualTable
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("(sin pantalla: se omite la comparación de widgets)")
+        return
+    root.withdraw()
+    columns = [("alimento", "Alimento", 220, "w"), ("g1", "G1", 90, "e"), ("g2", "G2", 90, "e")]
+
+    tree = ttk.Treeview(root, columns=[c[0] for c in columns], show="headings")
+
+    def fill_tree() -> None:
+        tree.delete(*tree.get_children())
+        for key, values in rows:
+            tree.insert("", "end", iid=str(key), values=values)
+        root.update_idletasks()
+
+    table = VirtualTable(root, columns)
+
+    def fill_table() -> None:
+        table.set_rows(rows)
+        root.update_idletasks()
+
+    _timed("Treeview: insertar todas las filas", fill_tree)
+    _timed("Treeview: refrescar (borrar + insertar)", fill_tree)
+    _timed("VirtualTable: set_rows", fill_table)
+    _timed("VirtualTable: set_rows sin cambios", fill_table)
+    root.destroy()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    print(f"Filas: {args.rows}")
+    bench_store(rows)
+    bench_widgets(rows)
+
+
+if __name__ == "__main__":
+    main()
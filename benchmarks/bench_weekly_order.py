@@ -0,0 +1,96 @@
+"""Latencia del pedido semanal: agregación sobre minuta_items vs. totales materializados.
+
+Uso: ``python benchmarks/bench_weekly_order.py [--scales 25 250 2500]``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import models
+import seed
+
+ITEMS_PER_MINUTA = 30
+MINUTAS_PER_WEEK = 5
+JARDINES = 200
+REPEATS = 200
+
+
+def _populate(minutas: int) -> list[int]:
+    rng = random.Random(minutas)
+    conn = db.get_connection()
+    alimento_ids = [row["id"] for row in models.list_alimentos()]
+    with db.transaction():
+        conn.executemany(
+            "INSERT INTO minutas(nombre, nombre_clave) VALUES (?, ?)",
+            [(f"Minuta {i}", f"minuta {i}") for i in range(minutas)],
+        )
+        minuta_ids = [row[0] for row in conn.execute("SELECT id FROM minutas")]
+        conn.executemany(
+            "INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5) VALUES (?, ?, ?, ?)",
+            [
+                (minuta_id, alimento_id, rng.randint(5, 80), rng.randint(5, 120))
+                for minuta_id in minuta_ids
+                for alimento_id in rng.sample(alimento_ids, ITEMS_PER_MINUTA)
+            ],
+        )
+        conn.executemany("INSERT INTO jardines(nombre) VALUES (?)", [(f"Jardín {i}",) for i in range(JARDINES)])
+        jardin_ids = [row[0] for row in conn.execute("SELECT id FROM jardines")]
+        conn.executemany(
+            "INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden) VALUES (?, ?, ?)",
+            [
+                (jardin_id, minuta_id, orden)
+                for jardin_id in jardin_ids
+                for orden, minuta_id in enumerate(rng.sample(minuta_ids, MINUTAS_PER_WEEK), start=1)
+            ],
+        )
+    return jardin_ids
+
+
+def _ms(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[25, 250, 2500])
+    args = parser.parse_args()
+
+    print(f"{'minutas':>8} {'raw/jardín':>12} {'mat./jardín':>12} {'raw todos':>11} {'mat. todos':>11}")
+    for minutas in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.DATA_DIR = Path(tmp)
+            db.DB_PATH = db.DATA_DIR / "bench.db"
+            db.init_db()
+            seed.seed_if_empty()
+            jardin_ids = _populate(minutas)
+            weeks = {
+                jardin_id: [row["minuta_id"] for row in models.list_jardin_minutas_semana(jardin_id)]
+                for jardin_id in jardin_ids
+            }
+            target = jardin_ids[len(jardin_ids) // 2]
+            ninos = {jardin_id: (20, 25) for jardin_id in jardin_ids}
+
+            raw_one = _ms(lambda: models.calculate_weekly_order(weeks[target], 20, 25), REPEATS)
+            mat_one = _ms(lambda: models.calculate_weekly_order_for_jardin(target, 20, 25), REPEATS)
+            raw_all = _ms(
+                lambda: [models.calculate_weekly_order(week, 20, 25) for week in weeks.values()], 5
+            )
+            mat_all = _ms(lambda: models.calculate_weekly_orders_bulk(ninos), 5)
+            db.close_connection()
+
+        print(f"{minutas:>8} {raw_one:>10.3f}ms {mat_one:>10.3f}ms {raw_all:>9.1f}ms {mat_all:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
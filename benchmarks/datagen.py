@@ -0,0 +1,149 @@
+"""Generador determinista de datos sintéticos para los benchmarks.
+
+Con la misma escala y semilla produce siempre el mismo catálogo, jardines,
+minutas, ítems y archivos Excel, de modo que dos corridas del suite sean
+comparables entre sí.
+"""
+from __future__ import annotations
+
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import excel_minutas
+import models
+from seed import INITIAL_FOODS
+
+QUALIFIERS = ["crudo", "cocido", "fresco", "congelado", "en polvo", "maduro", "verde", "tajado"]
+
+# Minutas distintas en los Excel generados.
+EXCEL_MINUTAS = 20
+
+
+@dataclass(frozen=True)
+class Scale:
+    alimentos: int
+    jardines: int
+    minutas: int
+    items_per_minuta: int
+    minutas_per_week: int
+    excel_rows: int
+
+
+SCALES = {
+    "small": Scale(alimentos=300, jardines=20, minutas=25, items_per_minuta=30, minutas_per_week=5, excel_rows=2_000),
+    "medium": Scale(alimentos=2_000, jardines=200, minutas=250, items_per_minuta=40, minutas_per_week=5, excel_rows=20_000),
+    "large": Scale(alimentos=10_000, jardines=1_000, minutas=2_500, items_per_minuta=60, minutas_per_week=5, excel_rows=100_000),
+}
+
+
+def scale_dict(scale: Scale) -> dict[str, int]:
+    return asdict(scale)
+
+
+def food_names(count: int, seed: int) -> list[str]:
+    """Catálogo inicial más nombres sintéticos únicos hasta llegar a ``count``."""
+    rng = random.Random(seed)
+    names = {name: None for name in INITIAL_FOODS}
+    bases = [name.split(",")[0] for name in INITIAL_FOODS]
+    serial = 0
+    while len(names) < count:
+        serial += 1
+        name = f"{rng.choice(bases)} {rng.choice(QUALIFIERS)} {serial}"
+        names.setdefault(name, None)
+    return list(names)[:count]
+
+
+def populate(scale: Scale, seed: int) -> dict[str, list[int]]:
+    """Carga catálogo, jardines, minutas, ítems y semanas en la base activa (``db.DB_PATH``).
+
+    Inserta directamente por SQL, en lotes, en vez de pasar por ``models``; los
+    triggers mantienen ``jardin_semana_totales``.
+    """
+    rng = random.Random(seed)
+    conn = db.get_connection()
+    with db.transaction():
+        conn.executemany(
+            "INSERT OR IGNORE INTO alimentos(nombre, nombre_normalizado) VALUES (?, ?)",
+            [(name, models.normalize_food_name(name)) for name in food_names(scale.alimentos, seed)],
+        )
+        alimento_ids = [row[0] for row in conn.execute("SELECT id FROM alimentos ORDER BY id")]
+
+        conn.executemany(
+            "INSERT INTO jardines(nombre, nombre_normalizado) VALUES (?, ?)",
+            [(nombre, models.normalize_food_name(nombre)) for nombre in (f"Jardín {i:05d}" for i in range(scale.jardines))],
+        )
+        jardin_ids = [row[0] for row in conn.execute("SELECT id FROM jardines ORDER BY id")]
+
+        conn.executemany(
+            "INSERT INTO minutas(nombre, nombre_clave) VALUES (?, ?)",
+            [(f"Minuta {i:05d}", f"minuta {i:05d}") for i in range(scale.minutas)],
+        )
+        minuta_ids = [row[0] for row in conn.execute("SELECT id FROM minutas ORDER BY id")]
+
+        per_minuta = min(scale.items_per_minuta, len(alimento_ids))
+        conn.executemany(
+            "INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5) VALUES (?, ?, ?, ?)",
+            [
+                (minuta_id, alimento_id, rng.randint(5, 80), rng.randint(5, 120))
+                for minuta_id in minuta_ids
+                for alimento_id in rng.sample(alimento_ids, per_minuta)
+            ],
+        )
+
+        per_week = min(scale.minutas_per_week, len(minuta_ids))
+        conn.executemany(
+            "INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden) VALUES (?, ?, ?)",
+            [
+                (jardin_id, minuta_id, orden)
+                for jardin_id in jardin_ids
+                for orden, minuta_id in enumerate(rng.sample(minuta_ids, per_week), start=1)
+            ],
+        )
+    return {"alimentos": alimento_ids, "jardines": jardin_ids, "minutas": minuta_ids}
+
+
+def _food_variant(name: str, rng: random.Random) -> str:
+    """Misma comida escrita distinto (mayúsculas/espacios), como llega en archivos reales."""
+    choice = rng.random()
+    if choice < 0.2:
+        return name.upper()
+    if choice < 0.3:
+        return f"  {name}  "
+    return name
+
+
+def write_minutas_workbook(path: Path, scale: Scale, seed: int, unknown_ratio: float = 0.02) -> Path:
+    """Plantilla general (``minuta, alimento, gramos_grupo_1, gramos_grupo_2``) con ``excel_rows`` filas."""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    names = food_names(scale.alimentos, seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Minutas")
+    ws.append(excel_minutas.HEADERS)
+    for row in range(scale.excel_rows):
+        food = f"Desconocido {row}" if rng.random() < unknown_ratio else _food_variant(rng.choice(names), rng)
+        ws.append([f"Importada {rng.randrange(EXCEL_MINUTAS):02d}", food, rng.randint(5, 80), rng.randint(5, 120)])
+    wb.save(path)
+    return path
+
+
+def write_group_workbook(path: Path, scale: Scale, seed: int, unknown_ratio: float = 0.02) -> Path:
+    """Plantilla por grupo (``alimento, gramos``) con ``excel_rows`` filas."""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    names = food_names(scale.alimentos, seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("MinutaGrupo")
+    ws.append(excel_minutas.GROUP_HEADERS)
+    for row in range(scale.excel_rows):
+        food = f"Desconocido {row}" if rng.random() < unknown_ratio else _food_variant(rng.choice(names), rng)
+        ws.append([food, rng.randint(5, 120)])
+    wb.save(path)
+    return path
@@ -0,0 +1,380 @@
+"""Suite de benchmarks reproducible con resultados en JSON y comparación contra una línea base.
+
+Uso::
+
+    python benchmarks/suite.py --scale small --output resultados.json
+    python benchmarks/suite.py --scale small --compare baseline.json --threshold 0.25
+    python benchmarks/suite.py --list
+    python benchmarks/suite.py --only weekly_order --only list_
+
+Cada escenario mide varias repeticiones y guarda mediana, mínimo y media en
+milisegundos. Con ``--compare`` se marca como regresión todo escenario cuyo
+``--metric`` (por defecto el mínimo, el menos sensible al ruido de la máquina)
+supere al de la línea base en más de ``--threshold`` (proporción) y en más de
+``--min-delta-ms``; en ese caso el proceso sale con código 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import datagen
+import db
+import excel_minutas
+import models
+import seed
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 0.05
+DEFAULT_METRIC = "min_ms"
+METRICS = ("min_ms", "median_ms", "mean_ms")
+
+
+@dataclass
+class Env:
+    workdir: Path
+    scale: datagen.Scale
+    seed: int
+    populated_db: Path
+    catalog_db: Path
+    minutas_xlsx: Path
+    group_xlsx: Path
+    ids: dict[str, list[int]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    repeats: int
+    # Recibe el entorno y devuelve (preparación, operación medida); la preparación no se mide.
+    build: Callable[[Env], tuple[Callable[[], Any] | None, Callable[[], Any]]]
+
+
+SCENARIOS: list[Scenario] = []
+
+
+def scenario(name: str, repeats: int = 20) -> Callable:
+    def register(build: Callable[[Env], tuple[Callable[[], Any] | None, Callable[[], Any]]]) -> Callable:
+        SCENARIOS.append(Scenario(name, repeats, build))
+        return build
+
+    return register
+
+
+def _use_db(path: Path) -> None:
+    # get_connection() reabre sola cuando cambia DB_PATH; si no cambia, se reutiliza la conexión.
+    db.DATA_DIR = path.parent
+    db.DB_PATH = path
+
+
+def _copy_db(source: Path, target: Path) -> Callable[[], None]:
+    """Preparación que deja ``target`` como copia fresca de ``source`` y la activa."""
+
+    def prepare() -> None:
+        db.close_connection()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{target}{suffix}").unlink(missing_ok=True)
+        shutil.copyfile(source, target)
+        _use_db(target)
+
+    return prepare
+
+
+def _fresh_db(target: Path) -> Callable[[], None]:
+    def prepare() -> None:
+        db.close_connection()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{target}{suffix}").unlink(missing_ok=True)
+        _use_db(target)
+
+    return prepare
+
+
+@scenario("init_db.fresh", repeats=10)
+def _init_db_fresh(env: Env):
+    return _fresh_db(env.workdir / "fresh.db"), db.init_db
+
+
+@scenario("init_db.current", repeats=200)
+def _init_db_current(env: Env):
+    return (lambda: _use_db(env.populated_db)), db.init_db
+
+
+@scenario("seed_if_empty.empty", repeats=10)
+def _seed_empty(env: Env):
+    target = env.workdir / "seed.db"
+
+    def prepare() -> None:
+        _fresh_db(target)()
+        db.init_db()
+
+    return prepare, seed.seed_if_empty
+
+
+@scenario("seed_if_empty.populated", repeats=200)
+def _seed_populated(env: Env):
+    return (lambda: _use_db(env.populated_db)), seed.seed_if_empty
+
+
+@scenario("weekly_order.minutas", repeats=100)
+def _weekly_order_minutas(env: Env):
+    jardin_id = env.ids["jardines"][len(env.ids["jardines"]) // 2]
+    state: dict[str, list[int]] = {}
+
+    def prepare() -> None:
+        _use_db(env.populated_db)
+        state["week"] = [row["minuta_id"] for row in models.list_jardin_minutas_semana(jardin_id)]
+
+    return prepare, lambda: models.calculate_weekly_order(state["week"], 20, 25)
+
+
+@scenario("weekly_order.jardin", repeats=100)
+def _weekly_order_jardin(env: Env):
+    jardin_id = env.ids["jardines"][len(env.ids["jardines"]) // 2]
+    return (lambda: _use_db(env.populated_db)), lambda: models.calculate_weekly_order_for_jardin(jardin_id, 20, 25)
+
+
+@scenario("weekly_order.all_jardines", repeats=5)
+def _weekly_order_all(env: Env):
+    ninos = {jardin_id: (20, 25) for jardin_id in env.ids["jardines"]}
+    return (lambda: _use_db(env.populated_db)), lambda: models.calculate_weekly_orders_bulk(ninos)
+
+
+@scenario("import.minutas", repeats=3)
+def _import_minutas(env: Env):
+    return _copy_db(env.catalog_db, env.workdir / "import.db"), lambda: excel_minutas.import_minutas(env.minutas_xlsx)
+
+
+@scenario("import.minuta_group", repeats=3)
+def _import_group(env: Env):
+    minuta_id = env.ids["minutas"][0]
+    return (
+        _copy_db(env.populated_db, env.workdir / "import_group.db"),
+        lambda: excel_minutas.import_minuta_group(env.group_xlsx, minuta_id=minuta_id, grupo="g1"),
+    )
+
+
+@scenario("export.template", repeats=3)
+def _export_template(env: Env):
+    output = env.workdir / "plantilla.xlsx"
+    return (lambda: _use_db(env.populated_db)), lambda: excel_minutas.export_template(output)
+
+
+@scenario("export.group_template", repeats=3)
+def _export_group_template(env: Env):
+    output = env.workdir / "plantilla_grupo.xlsx"
+    return (lambda: _use_db(env.populated_db)), lambda: excel_minutas.export_group_template(output)
+
+
+@scenario("list_alimentos", repeats=50)
+def _list_alimentos(env: Env):
+    return (lambda: _use_db(env.populated_db)), models.list_alimentos
+
+
+@scenario("list_jardines", repeats=50)
+def _list_jardines(env: Env):
+    return (lambda: _use_db(env.populated_db)), models.list_jardines
+
+
+@scenario("list_minutas", repeats=50)
+def _list_minutas(env: Env):
+    return (lambda: _use_db(env.populated_db)), models.list_minutas
+
+
+@scenario("list_minutas_page", repeats=200)
+def _list_minutas_page(env: Env):
+    return (lambda: _use_db(env.populated_db)), models.list_minutas_page
+
+
+@scenario("list_minuta_items", repeats=200)
+def _list_minuta_items(env: Env):
+    minuta_id = env.ids["minutas"][0]
+    return (lambda: _use_db(env.populated_db)), lambda: models.list_minuta_items(minuta_id)
+
+
+@scenario("list_jardin_minutas_semana", repeats=200)
+def _list_semana(env: Env):
+    jardin_id = env.ids["jardines"][0]
+    return (lambda: _use_db(env.populated_db)), lambda: models.list_jardin_minutas_semana(jardin_id)
+
+
+@scenario("week.assign_many", repeats=3)
+def _week_assign_many(env: Env):
+    minuta_ids = env.ids["minutas"][:3]
+    return (
+        _copy_db(env.populated_db, env.workdir / "week_assign.db"),
+        lambda: models.assign_minutas_a_jardines(env.ids["jardines"], minuta_ids),
+    )
+
+
+@scenario("week.copy", repeats=3)
+def _week_copy(env: Env):
+    jardin_ids = env.ids["jardines"]
+    return (
+        _copy_db(env.populated_db, env.workdir / "week_copy.db"),
+        lambda: models.copy_semana(jardin_ids[0], jardin_ids[1:]),
+    )
+
+
+def build_env(workdir: Path, scale: datagen.Scale, seed_value: int) -> Env:
+    """Genera las bases y los Excel de entrada una sola vez por corrida."""
+    catalog_db = workdir / "catalog.db"
+    _use_db(catalog_db)
+    db.init_db()
+    seed.seed_if_empty()
+    catalog_scale = datagen.Scale(
+        alimentos=scale.alimentos, jardines=0, minutas=0, items_per_minuta=0, minutas_per_week=0, excel_rows=0
+    )
+    datagen.populate(catalog_scale, seed_value)
+
+    populated_db = workdir / "populated.db"
+    _use_db(populated_db)
+    db.init_db()
+    ids = datagen.populate(scale, seed_value)
+
+    for path in (catalog_db, populated_db):
+        _use_db(path)
+        db.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.close_connection()
+
+    return Env(
+        workdir=workdir,
+        scale=scale,
+        seed=seed_value,
+        populated_db=populated_db,
+        catalog_db=catalog_db,
+        minutas_xlsx=datagen.write_minutas_workbook(workdir / "minutas.xlsx", scale, seed_value),
+        group_xlsx=datagen.write_group_workbook(workdir / "grupo.xlsx", scale, seed_value),
+        ids=ids,
+    )
+
+
+def run_scenario(item: Scenario, env: Env, repeat_factor: float = 1.0) -> dict[str, float | int]:
+    prepare, operation = item.build(env)
+    repeats = max(1, round(item.repeats * repeat_factor))
+    samples: list[float] = []
+    for _ in range(repeats):
+        if prepare is not None:
+            prepare()
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    db.close_connection()
+    return {
+        "repeats": repeats,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+    metric: str = DEFAULT_METRIC,
+) -> list[dict[str, Any]]:
+    """Compara escenario por escenario; ``status`` es ``regresion``, ``mejora``, ``igual`` o ``nuevo``."""
+    rows = []
+    for name, result in current["results"].items():
+        row: dict[str, Any] = {"scenario": name, "current_ms": result[metric], "baseline_ms": None, "ratio": None}
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append({**row, "status": "nuevo"})
+            continue
+        row["baseline_ms"] = base[metric]
+        delta = result[metric] - base[metric]
+        row["ratio"] = result[metric] / base[metric] if base[metric] else float("inf")
+        status = "igual"
+        if abs(delta) > min_delta_ms and row["ratio"] > 1 + threshold:
+            status = "regresion"
+        elif abs(delta) > min_delta_ms and row["ratio"] < 1 / (1 + threshold):
+            status = "mejora"
+        rows.append({**row, "status": status})
+    return rows
+
+
+def _metadata(scale_name: str, scale: datagen.Scale, seed_value: int) -> dict[str, Any]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "scale_name": scale_name,
+        "scale": datagen.scale_dict(scale),
+        "seed": seed_value,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(datagen.SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", action="append", default=[], help="Prefijo de escenario a ejecutar (repetible).")
+    parser.add_argument("--repeat-factor", type=float, default=1.0, help="Multiplica las repeticiones de cada escenario.")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--compare", help="JSON de una corrida anterior usado como línea base.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument("--metric", choices=METRICS, default=DEFAULT_METRIC, help="Estadístico usado al comparar.")
+    parser.add_argument("--list", action="store_true", help="Lista los escenarios y termina.")
+    args = parser.parse_args(argv)
+
+    selected = [item for item in SCENARIOS if not args.only or any(item.name.startswith(p) for p in args.only)]
+    if args.list:
+        for item in selected:
+            print(item.name)
+        return 0
+
+    # Las filas con alimentos desconocidos son parte del escenario; sus avisos sólo ensucian la salida.
+    logging.getLogger("excel_minutas").setLevel(logging.ERROR)
+    scale = datagen.SCALES[args.scale]
+    report: dict[str, Any] = {"metadata": _metadata(args.scale, scale, args.seed), "results": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = build_env(Path(tmp), scale, args.seed)
+        for item in selected:
+            result = run_scenario(item, env, args.repeat_factor)
+            report["results"][item.name] = result
+            print(f"{item.name:<30} {result['median_ms']:>10.3f} ms  (min {result['min_ms']:.3f}, n={result['repeats']})")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    if not args.compare:
+        return 0
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    if baseline.get("metadata", {}).get("scale") != report["metadata"]["scale"]:
+        print("Aviso: la línea base usa otra escala; la comparación no es representativa.", file=sys.stderr)
+    rows = compare(report, baseline, args.threshold, args.min_delta_ms, args.metric)
+    print()
+    print(f"{'escenario':<30} {'base':>10} {'actual':>10} {'razón':>7}  estado")
+    for row in rows:
+        base = "-" if row["baseline_ms"] is None else f"{row['baseline_ms']:.3f}"
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        print(f"{row['scenario']:<30} {base:>10} {row['current_ms']:>10.3f} {ratio:>7}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regresion"]
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es) sobre la línea base.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,159 @@
+"""Punto de entrada de la aplicación de escritorio.
+
+El arranque dibuja la ventana principal antes de tocar la base: ``init_db`` y
+``seed_if_empty`` corren en segundo plano mientras Tk pinta el primer cuadro, y
+las ventanas secundarias (y openpyxl) se importan al abrirlas.
+
+``python src/app.py --profile-startup`` imprime cuánto tomó cada importación y
+cada fase hasta el primer dibujo y hasta tener la base lista.
+"""
 from __future__ import annotations
 
-import tkinter as tk
-from tkinter import messagebox
+import argparse
+import importlib
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, TextIO
+
+if TYPE_CHECKING:
+    import tkinter as tk
+
+# Desde aquí se mide el arranque. Las importaciones de arriba son de la
+# biblioteca estándar y baratas; tkinter y los módulos propios se importan en
+# ``main`` para que su costo entre en la medición.
+_STARTED = time.perf_counter()
+
+# Módulos en el orden en que el arranque los necesita; con --profile-startup
+# se importan uno a uno para medir cada uno por separado.
+STARTUP_MODULES = ("tkinter", "db", "models", "seed", "diagnostics", "ui_tasks", "ui_main")
+
+
+class StartupProfile:
+    """Marcas de tiempo del arranque, en ms desde que se empezó a cargar ``app``."""
+
+    def __init__(self, started: float = _STARTED) -> None:
+        self.started = started
+        self.imports: list[tuple[str, float]] = []
+        self.phases: list[tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+    def _ms(self, moment: float) -> float:
+        return (moment - self.started) * 1000
+
+    def import_module(self, name: str) -> Any:
+        began = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports.append((name, (time.perf_counter() - began) * 1000))
+        return module
+
+    def phase(self, name: str, began: float, ended: float | None = None) -> None:
+        """Registra una fase; puede llamarse desde el hilo que prepara la base."""
+        ended = time.perf_counter() if ended is None else ended
+        with self._lock:
+            self.phases.append((name, self._ms(began), (ended - began) * 1000))
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phase(name, now, now)
+
+    def elapsed_ms(self, name: str) -> float | None:
+        with self._lock:
+            for phase, at_ms, duration_ms in self.phases:
+                if phase == name:
+                    return at_ms + duration_ms
+        return None
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            phases = sorted(self.phases, key=lambda item: item[1])
+        return {
+            "imports": [{"modulo": name, "ms": round(ms, 2)} for name, ms in self.imports],
+            "fases": [
+                {"fase": name, "inicio_ms": round(at_ms, 2), "ms": round(duration_ms, 2)}
+                for name, at_ms, duration_ms in phases
+            ],
+        }
+
+    def print(self, output: TextIO = sys.stdout) -> None:
+        data = self.report()
+        print("Importaciones (ms):", file=output)
+        for row in data["imports"]:
+            print(f"  {row['modulo']:<14} {row['ms']:>9.2f}", file=output)
+        print("Fases (ms desde el inicio / duración):", file=output)
+        for row in data["fases"]:
+            print(f"  {row['fase']:<22} {row['inicio_ms']:>9.2f} {row['ms']:>9.2f}", file=output)
+        output.flush()
+
+
+def _prepare_database(profile: StartupProfile | None) -> None:
+    import db
+    import seed
+
+    began = time.perf_counter()
+    db.init_db()
+    if profile is not None:
+        profile.phase("init_db", began)
+    began = time.perf_counter()
+    seed.seed_if_empty()
+    if profile is not None:
+        profile.phase("seed_if_empty", began)
+
+
+def start(root: tk.Tk, profile: StartupProfile | None = None, on_ready: Any = None) -> Any:
+    """Construye la ventana principal y deja la preparación de la base en segundo plano.
+
+    ``on_ready`` se llama cuando la ventana ya se dibujó y la base está lista.
+    """
+    from ui_main import MainWindow
+
+    pending = {"paint", "ready"}
+
+    def done(step: str, phase: str) -> None:
+        if step not in pending:
+            return
+        pending.discard(step)
+        if profile is not None:
+            profile.mark(phase)
+        if not pending and on_ready is not None:
+            on_ready()
+
+    began = time.perf_counter()
+    window = MainWindow(root, prepare=lambda: _prepare_database(profile), on_ready=lambda: done("ready", "base lista"))
+    if profile is not None:
+        profile.phase("construir MainWindow", began)
+    window.bind("<Expose>", lambda _event: done("paint", "primer dibujo"), add="+")
+    return window
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Minutas por Jardín.")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="imprime el tiempo de importación y de cada fase del arranque",
+    )
+    args = parser.parse_args(argv)
+
+    profile = StartupProfile() if args.profile_startup else None
+    if profile is not None:
+        for name in STARTUP_MODULES:
+            profile.import_module(name)
 
-from db import init_db
-from seed import seed_if_empty
-from ui_main import MainWindow
+    import tkinter as tk
 
+    import diagnostics
 
-def main() -> None:
-    try:
-        init_db()
-        seed_if_empty()
-    except Exception as exc:
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("Error", f"No fue posible inicializar la base de datos.\n{exc}")
-        root.destroy()
-        return
+    diagnostics.install_from_env()
 
+    began = time.perf_counter()
     root = tk.Tk()
-    MainWindow(root)
+    if profile is not None:
+        profile.phase("crear Tk", began)
+    start(root, profile, on_ready=profile.print if profile is not None else None)
     root.mainloop()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
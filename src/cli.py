@@ -0,0 +1,309 @@
+"""Entrada de línea de comandos para operaciones por lotes, sin interfaz gráfica.
+
+Ejemplos::
+
+    python -m src.cli init
+    python -m src.cli importar-minutas minutas.xlsx
+    python -m src.cli importar-grupo pequenos.xlsx --minuta "Minuta 1" --grupo g1
+    python -m src.cli pedido --todos --ninos-csv ninos.csv --formato csv --salida pedido.csv
+    python -m src.cli pedido --todos --ninos 20 15 --formato xlsx --salida pedido.xlsx
+
+Los resultados se escriben en JSON (o CSV/Excel para pedidos) y el código de salida
+es distinto de 0 si la operación falla.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, TextIO
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import db
+import excel_minutas
+import excel_pedidos
+import models
+import seed
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+
+
+def _print_json(data: Any) -> None:
+    json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+def _jardin_keys(jardines: dict[int, str]) -> dict[str, int]:
+    """Nombre normalizado -> id, armado una vez por comando."""
+    keys: dict[str, int] = {}
+    for jardin_id, nombre in jardines.items():
+        keys.setdefault(models.normalize_food_name(nombre), jardin_id)
+    return keys
+
+
+def _resolve_jardin(value: str, jardines: dict[int, str], keys: dict[str, int]) -> int:
+    if value.isdigit() and int(value) in jardines:
+        return int(value)
+    jardin_id = keys.get(models.normalize_food_name(value))
+    if jardin_id is None:
+        raise ValueError(f"No existe el jardín '{value}'.")
+    return jardin_id
+
+
+def _resolve_minuta(value: str) -> int:
+    if value.isdigit() and models.get_minuta(int(value)):
+        return int(value)
+    minuta_id = models.find_minuta_id(value)
+    if minuta_id is None:
+        raise ValueError(f"No existe la minuta '{value}'.")
+    return minuta_id
+
+
+def _parse_non_negative_int(raw: str, label: str) -> int:
+    try:
+        value = int(raw)
+    except ValueError as exc:
+        raise ValueError(f"{label} debe ser un entero mayor o igual a 0.") from exc
+    if value < 0:
+        raise ValueError(f"{label} debe ser un entero mayor o igual a 0.")
+    return value
+
+
+def _load_ninos_csv(path: Path, jardines: dict[int, str], keys: dict[str, int]) -> dict[int, tuple[int, int]]:
+    """Lee un CSV con columnas ``jardin``, ``ninos_g1`` y ``ninos_g2`` (jardín por id o nombre)."""
+    ninos: dict[int, tuple[int, int]] = {}
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        missing = {"jardin", "ninos_g1", "ninos_g2"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"El CSV de niños no contiene las columnas: {', '.join(sorted(missing))}.")
+        for line, row in enumerate(reader, start=2):
+            jardin_id = _resolve_jardin(row["jardin"].strip(), jardines, keys)
+            ninos[jardin_id] = (
+                _parse_non_negative_int(row["ninos_g1"], f"Fila {line}: ninos_g1"),
+                _parse_non_negative_int(row["ninos_g2"], f"Fila {line}: ninos_g2"),
+            )
+    return ninos
+
+
+def _write_pedidos_json(rows: Any, output: TextIO) -> int:
+    count = 0
+    output.write("[")
+    for row in rows:
+        output.write(",\n" if count else "\n")
+        json.dump(row, output, ensure_ascii=False)
+        count += 1
+    output.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _iter_pedido_rows(
+    ninos: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None,
+    jardines: dict[int, str],
+) -> Any:
+    for jardin_id, resumen in models.iter_weekly_orders(ninos, jardin_ids):
+        for row in resumen:
+            yield {
+                "jardin_id": jardin_id,
+                "jardin": jardines.get(jardin_id, ""),
+                "alimento_id": row["alimento_id"],
+                "alimento": row["alimento_nombre"],
+                "suma_gramos_g1": row["suma_gramos_g1"],
+                "suma_gramos_g2": row["suma_gramos_g2"],
+                "ninos_grupo_1": row["ninos_grupo_1"],
+                "ninos_grupo_2": row["ninos_grupo_2"],
+                "total_g1": row["total_g1"],
+                "total_g2": row["total_g2"],
+                "total_general": row["total_general"],
+                "pedido_final": row["pedido_final"],
+            }
+
+
+def cmd_init(_args: argparse.Namespace) -> int:
+    inserted = seed.seed_if_empty()
+    _print_json({"schema_version": db.schema_version(), "alimentos_insertados": inserted})
+    return EXIT_OK
+
+
+def cmd_importar_minutas(args: argparse.Namespace) -> int:
+    summary = excel_minutas.import_minutas(args.archivo)
+    _print_json(asdict(summary))
+    return EXIT_ERROR if args.estricto and summary.unknown_foods else EXIT_OK
+
+
+def cmd_importar_grupo(args: argparse.Namespace) -> int:
+    minuta_id = _resolve_minuta(args.minuta)
+    summary = excel_minutas.import_minuta_group(args.archivo, minuta_id=minuta_id, grupo=args.grupo)
+    _print_json({"minuta_id": minuta_id, **asdict(summary)})
+    return EXIT_ERROR if args.estricto and summary.unknown_foods else EXIT_OK
+
+
+def cmd_importar_semilla(args: argparse.Namespace) -> int:
+    inserted = seed.load_seed_csv(args.archivo, catalogo=args.catalogo, version=args.version)
+    _print_json({"alimentos_insertados": inserted})
+    return EXIT_OK
+
+
+def cmd_importar_unidades(args: argparse.Namespace) -> int:
+    _print_json({"unidades_guardadas": excel_minutas.import_unidades_csv(args.archivo)})
+    return EXIT_OK
+
+
+def cmd_importar_alias(args: argparse.Namespace) -> int:
+    _print_json({"alias_guardados": excel_minutas.import_aliases_csv(args.archivo)})
+    return EXIT_OK
+
+
+def cmd_plantilla(args: argparse.Namespace) -> int:
+    if args.grupo:
+        path = excel_minutas.export_group_template(args.archivo)
+    else:
+        path = excel_minutas.export_template(args.archivo)
+    _print_json({"plantilla": str(path)})
+    return EXIT_OK
+
+
+def cmd_pedido(args: argparse.Namespace) -> int:
+    jardines = {int(row["id"]): row["nombre"] for row in models.list_jardines()}
+    keys = _jardin_keys(jardines)
+    jardin_ids = None if args.todos else [_resolve_jardin(value, jardines, keys) for value in args.jardin]
+
+    if not args.ninos and not args.ninos_csv:
+        raise ValueError("Indica los niños por grupo con --ninos o --ninos-csv.")
+
+    ninos: dict[int, tuple[int, int]] = {}
+    if args.ninos:
+        default = (
+            _parse_non_negative_int(args.ninos[0], "#Niños Grupo 1"),
+            _parse_non_negative_int(args.ninos[1], "#Niños Grupo 2"),
+        )
+        ninos = {jardin_id: default for jardin_id in (jardin_ids or jardines)}
+    if args.ninos_csv:
+        ninos.update(_load_ninos_csv(Path(args.ninos_csv), jardines, keys))
+    # Sin --ninos, cada jardín del pedido debe estar en el CSV: un pedido en cero
+    # por una fila olvidada no debe pasar como un resultado válido.
+    missing = [jardin_id for jardin_id in (jardin_ids or jardines) if jardin_id not in ninos]
+    if missing:
+        nombres = ", ".join(jardines.get(jardin_id, str(jardin_id)) for jardin_id in missing)
+        raise ValueError(f"El CSV de niños no incluye estos jardines: {nombres}. Agrégalos o usa --ninos.")
+
+    if args.formato == "xlsx":
+        if not args.salida:
+            raise ValueError("El formato xlsx requiere --salida.")
+        hojas = excel_pedidos.export_weekly_orders_xlsx(args.salida, ninos, jardin_ids)
+        print(json.dumps({"salida": args.salida, "hojas": hojas}, ensure_ascii=False), file=sys.stderr)
+        return EXIT_OK
+
+    def write(output: TextIO) -> int:
+        if args.formato == "csv":
+            return excel_pedidos.write_weekly_orders_csv(output, ninos, jardin_ids)
+        return _write_pedidos_json(_iter_pedido_rows(ninos, jardin_ids, jardines), output)
+
+    if args.salida:
+        with Path(args.salida).open("w", newline="", encoding="utf-8") as output:
+            count = write(output)
+        print(json.dumps({"salida": args.salida, "filas": count}, ensure_ascii=False), file=sys.stderr)
+    else:
+        write(sys.stdout)
+    return EXIT_OK
+
+
+def cmd_verificar_totales(args: argparse.Namespace) -> int:
+    if args.reparar:
+        mismatched = models.rebuild_weekly_totals()
+        _print_json({"celdas_inconsistentes": mismatched, "reconstruido": True})
+        return EXIT_OK
+    mismatched = models.check_weekly_totals()
+    _print_json({"celdas_inconsistentes": mismatched, "reconstruido": False})
+    return EXIT_ERROR if mismatched else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="minutas", description="Operaciones por lotes de Minutas por Jardín.")
+    parser.add_argument("--db", help="Ruta del archivo SQLite (por defecto data/minutas.db).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("init", help="Crea/migra la base y carga el catálogo inicial.")
+    p.set_defaults(func=cmd_init)
+
+    p = sub.add_parser("importar-minutas", help="Importa la plantilla general de minutas.")
+    p.add_argument("archivo")
+    p.add_argument("--estricto", action="store_true", help="Sale con error si quedan alimentos sin detectar.")
+    p.set_defaults(func=cmd_importar_minutas)
+
+    p = sub.add_parser("importar-grupo", help="Importa los gramos de un grupo etario para una minuta.")
+    p.add_argument("archivo")
+    p.add_argument("--minuta", required=True, help="Id o nombre de la minuta.")
+    p.add_argument("--grupo", required=True, choices=["g1", "g2"])
+    p.add_argument("--estricto", action="store_true", help="Sale con error si quedan alimentos sin detectar.")
+    p.set_defaults(func=cmd_importar_grupo)
+
+    p = sub.add_parser("importar-semilla", help="Carga un catálogo de alimentos desde un CSV (columna alimento).")
+    p.add_argument("archivo")
+    p.add_argument("--catalogo", help="Nombre con que se registra (por defecto csv:<archivo>).")
+    p.add_argument("--version", type=int, default=1, help="Versión del catálogo; subirla fuerza a reaplicarlo.")
+    p.set_defaults(func=cmd_importar_semilla)
+
+    p = sub.add_parser("importar-alias", help="Carga alias de alimentos desde un CSV (alias, alimento).")
+    p.add_argument("archivo")
+    p.set_defaults(func=cmd_importar_alias)
+
+    p = sub.add_parser(
+        "importar-unidades",
+        help="Carga unidades de pedido desde un CSV (alimento, unidad, gramos_por_unidad[, redondeo, tamano_paquete]).",
+    )
+    p.add_argument("archivo")
+    p.set_defaults(func=cmd_importar_unidades)
+
+    p = sub.add_parser("plantilla", help="Genera una plantilla Excel.")
+    p.add_argument("archivo")
+    p.add_argument("--grupo", action="store_true", help="Plantilla por grupo etario (alimento, gramos).")
+    p.set_defaults(func=cmd_plantilla)
+
+    p = sub.add_parser("pedido", help="Calcula el pedido semanal de uno o varios jardines.")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--jardin", action="append", help="Id o nombre del jardín (repetible).")
+    target.add_argument("--todos", action="store_true", help="Todos los jardines con minutas en la semana.")
+    p.add_argument(
+        "--ninos",
+        nargs=2,
+        metavar=("G1", "G2"),
+        help="Niños por grupo para todos los jardines (obligatorio sin --ninos-csv).",
+    )
+    p.add_argument(
+        "--ninos-csv",
+        help="CSV con columnas jardin, ninos_g1, ninos_g2; sin --ninos debe incluir todos los jardines del pedido.",
+    )
+    p.add_argument("--formato", choices=["csv", "json", "xlsx"], default="json")
+    p.add_argument("--salida", help="Archivo de salida (por defecto, salida estándar).")
+    p.set_defaults(func=cmd_pedido)
+
+    p = sub.add_parser("verificar-totales", help="Compara los totales semanales materializados con la fuente.")
+    p.add_argument("--reparar", action="store_true", help="Reconstruye la tabla desde cero.")
+    p.set_defaults(func=cmd_verificar_totales)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.DB_PATH = Path(args.db)
+        db.DATA_DIR = db.DB_PATH.parent
+    try:
+        db.init_db()
+        return args.func(args)
+    except (ValueError, RuntimeError, OSError, sqlite3.Error) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
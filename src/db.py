@@ -1,145 +1,487 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "minutas.db"
 
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16384
+MMAP_SIZE_BYTES = 64 * 1024 * 1024
 
-def get_connection() -> sqlite3.Connection:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+_local = threading.local()
+
+# Funciones que reciben cada conexión nueva (por ejemplo, la instrumentación de diagnostics.py).
+_connection_hooks: list[Callable[[sqlite3.Connection], None]] = []
+# Altas y bajas de hooks, en orden. Una conexión sólo puede tocarse desde el hilo
+# que la abrió, así que cada hilo aplica a la suya lo que le falte de este registro
+# la próxima vez que la pide (``_local.hook_pos`` marca hasta dónde llegó).
+_hook_log: list[Callable[[sqlite3.Connection], None]] = []
+_hooks_lock = threading.Lock()
+
+
+def add_connection_hook(hook: Callable[[sqlite3.Connection], None]) -> None:
+    """Registra ``hook`` para las conexiones nuevas y las ya abiertas.
+
+    La del hilo actual lo recibe ahora; las de otros hilos, cuando su hilo
+    vuelva a pedir la conexión.
+    """
+    with _hooks_lock:
+        if hook in _connection_hooks:
+            return
+        _connection_hooks.append(hook)
+        _hook_log.append(hook)
+    _sync_hooks()
+
+
+def remove_connection_hook(
+    hook: Callable[[sqlite3.Connection], None],
+    undo: Callable[[sqlite3.Connection], None] | None = None,
+) -> None:
+    """Quita ``hook``; ``undo`` revierte su efecto en las conexiones ya abiertas.
+
+    Igual que al registrar, la conexión del hilo actual se revierte ahora y las
+    demás cuando su hilo vuelva a pedirla.
+    """
+    with _hooks_lock:
+        if hook not in _connection_hooks:
+            return
+        _connection_hooks.remove(hook)
+        if undo is not None:
+            _hook_log.append(undo)
+    _sync_hooks()
+
+
+def _sync_hooks() -> None:
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    with _hooks_lock:
+        pending = _hook_log[_local.hook_pos :]
+        _local.hook_pos = len(_hook_log)
+    for hook in pending:
+        hook(conn)
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # isolation_level=None: las transacciones se manejan explícitamente con transaction().
+    conn = sqlite3.connect(path, isolation_level=None, timeout=BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    with _hooks_lock:
+        hooks = list(_connection_hooks)
+        _local.hook_pos = len(_hook_log)
+    for hook in hooks:
+        hook(conn)
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    """Devuelve la conexión persistente del hilo actual.
+
+    Cada hilo mantiene una única conexión abierta hacia ``DB_PATH``; si la ruta
+    cambia (por ejemplo en tests) la conexión anterior se cierra y se abre otra.
+    """
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    path = Path(DB_PATH)
+    if conn is not None and _local.path == path:
+        if _local.hook_pos != len(_hook_log):
+            _sync_hooks()
+        return conn
+    if conn is not None:
+        conn.close()
+    conn = _open_connection(path)
+    _local.conn = conn
+    _local.path = path
+    _local.depth = 0
     return conn
 
 
+def close_connection() -> None:
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    conn.close()
+    _local.conn = None
+    _local.path = None
+    _local.depth = 0
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Agrupa varias operaciones en un único commit.
+
+    Las transacciones anidadas se convierten en SAVEPOINT, de modo que un error
+    interno sólo deshace su propio bloque si el llamador lo captura.
+    """
+    conn = get_connection()
+    depth = _local.depth
+    savepoint = f"sp_{depth}"
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    _local.depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        if depth == 0:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        raise
+    else:
+        if depth == 0:
+            conn.execute("COMMIT")
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+    finally:
+        _local.depth = depth
+
+
 def _table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
     rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
     return {row["name"] for row in rows}
 
 
-def init_db() -> None:
-    with get_connection() as conn:
-        conn.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS alimentos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL UNIQUE COLLATE NOCASE
-            );
-
-            CREATE TABLE IF NOT EXISTS jardines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL UNIQUE COLLATE NOCASE
-            );
-            """
+_MINUTAS_SQL = """
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        fecha_creacion TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+_MINUTA_ITEMS_SQL = """
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        minuta_id INTEGER NOT NULL,
+        alimento_id INTEGER NOT NULL,
+        gramos_1_2 REAL CHECK (gramos_1_2 IS NULL OR gramos_1_2 > 0),
+        gramos_3_5 REAL CHECK (gramos_3_5 IS NULL OR gramos_3_5 > 0),
+        FOREIGN KEY (minuta_id) REFERENCES minutas(id) ON DELETE CASCADE,
+        FOREIGN KEY (alimento_id) REFERENCES alimentos(id),
+        UNIQUE (minuta_id, alimento_id)
+    )
+"""
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, create_sql: str, columns: str, select_expr: str) -> None:
+    conn.execute(create_sql.format(name=f"{table}_new"))
+    conn.execute(f"INSERT OR IGNORE INTO {table}_new({columns}) SELECT {select_expr} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _migration_001_base_schema(conn: sqlite3.Connection) -> None:
+    """Crea el esquema base o adapta las estructuras heredadas del MVP."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alimentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE COLLATE NOCASE
         )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jardines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+        """
+    )
 
-        minuta_cols = _table_columns(conn, "minutas")
-        if not minuta_cols:
-            conn.execute(
-                """
-                CREATE TABLE minutas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    fecha_creacion TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-        elif "jardin_id" in minuta_cols:
-            conn.execute("PRAGMA foreign_keys = OFF")
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS minutas_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    fecha_creacion TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO minutas_new(id, nombre, fecha_creacion)
-                SELECT id, nombre, fecha_creacion FROM minutas
-                """
-            )
-            conn.execute("DROP TABLE minutas")
-            conn.execute("ALTER TABLE minutas_new RENAME TO minutas")
-            conn.execute("PRAGMA foreign_keys = ON")
-
-        item_cols = _table_columns(conn, "minuta_items")
-        recreate_for_nullable = False
-        if item_cols:
-            item_meta = conn.execute("PRAGMA table_info(minuta_items)").fetchall()
-            meta_by_name = {row["name"]: row for row in item_meta}
-            g1 = meta_by_name.get("gramos_1_2")
-            g2 = meta_by_name.get("gramos_3_5")
-            if g1 and g2 and (g1["notnull"] == 1 or g2["notnull"] == 1):
-                recreate_for_nullable = True
-
-        if not item_cols:
-            conn.execute(
-                """
-                CREATE TABLE minuta_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    minuta_id INTEGER NOT NULL,
-                    alimento_id INTEGER NOT NULL,
-                    gramos_1_2 REAL CHECK (gramos_1_2 IS NULL OR gramos_1_2 > 0),
-                    gramos_3_5 REAL CHECK (gramos_3_5 IS NULL OR gramos_3_5 > 0),
-                    FOREIGN KEY (minuta_id) REFERENCES minutas(id) ON DELETE CASCADE,
-                    FOREIGN KEY (alimento_id) REFERENCES alimentos(id),
-                    UNIQUE (minuta_id, alimento_id)
-                )
-                """
-            )
-        elif "gramos" in item_cols or recreate_for_nullable:
-            conn.execute("PRAGMA foreign_keys = OFF")
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS minuta_items_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    minuta_id INTEGER NOT NULL,
-                    alimento_id INTEGER NOT NULL,
-                    gramos_1_2 REAL CHECK (gramos_1_2 IS NULL OR gramos_1_2 > 0),
-                    gramos_3_5 REAL CHECK (gramos_3_5 IS NULL OR gramos_3_5 > 0),
-                    FOREIGN KEY (minuta_id) REFERENCES minutas(id) ON DELETE CASCADE,
-                    FOREIGN KEY (alimento_id) REFERENCES alimentos(id),
-                    UNIQUE (minuta_id, alimento_id)
-                )
-                """
+    minuta_cols = _table_columns(conn, "minutas")
+    if not minuta_cols:
+        conn.execute(_MINUTAS_SQL.format(name="minutas"))
+    elif "jardin_id" in minuta_cols:
+        columns = "id, nombre, fecha_creacion"
+        _rebuild_table(conn, "minutas", _MINUTAS_SQL, columns, columns)
+
+    item_meta = {row["name"]: row for row in conn.execute("PRAGMA table_info(minuta_items)").fetchall()}
+    if not item_meta:
+        conn.execute(_MINUTA_ITEMS_SQL.format(name="minuta_items"))
+    else:
+        columns = "id, minuta_id, alimento_id, gramos_1_2, gramos_3_5"
+        g1 = item_meta.get("gramos_1_2")
+        g2 = item_meta.get("gramos_3_5")
+        if "gramos" in item_meta:
+            _rebuild_table(
+                conn, "minuta_items", _MINUTA_ITEMS_SQL, columns, "id, minuta_id, alimento_id, gramos, gramos"
             )
-            if "gramos" in item_cols:
-                conn.execute(
-                    """
-                    INSERT OR IGNORE INTO minuta_items_new(id, minuta_id, alimento_id, gramos_1_2, gramos_3_5)
-                    SELECT id, minuta_id, alimento_id, gramos, gramos FROM minuta_items
-                    """
-                )
-            else:
-                conn.execute(
-                    """
-                    INSERT OR IGNORE INTO minuta_items_new(id, minuta_id, alimento_id, gramos_1_2, gramos_3_5)
-                    SELECT id, minuta_id, alimento_id, gramos_1_2, gramos_3_5 FROM minuta_items
-                    """
-                )
-            conn.execute("DROP TABLE minuta_items")
-            conn.execute("ALTER TABLE minuta_items_new RENAME TO minuta_items")
-            conn.execute("PRAGMA foreign_keys = ON")
+        elif g1 and g2 and (g1["notnull"] == 1 or g2["notnull"] == 1):
+            _rebuild_table(conn, "minuta_items", _MINUTA_ITEMS_SQL, columns, columns)
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jardin_minutas_semana (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            jardin_id INTEGER NOT NULL,
+            minuta_id INTEGER NOT NULL,
+            orden INTEGER NOT NULL,
+            FOREIGN KEY (jardin_id) REFERENCES jardines(id) ON DELETE CASCADE,
+            FOREIGN KEY (minuta_id) REFERENCES minutas(id) ON DELETE CASCADE,
+            UNIQUE (jardin_id, minuta_id),
+            UNIQUE (jardin_id, orden)
+        )
+        """
+    )
+
+
+_TOTALES_SELECT = """
+    SELECT
+        jms.jardin_id,
+        mi.alimento_id,
+        COALESCE(SUM(mi.gramos_1_2), 0),
+        COALESCE(SUM(mi.gramos_3_5), 0)
+    FROM jardin_minutas_semana jms
+    INNER JOIN minuta_items mi ON mi.minuta_id = jms.minuta_id
+    {where}
+    GROUP BY jms.jardin_id, mi.alimento_id
+"""
+
 
+def _refresh_totales_sql(jardines: str, alimentos: str) -> str:
+    """Recalcula desde la fuente las celdas (jardín, alimento) afectadas por un cambio."""
+    where = f"WHERE jms.jardin_id IN ({jardines}) AND mi.alimento_id IN ({alimentos})"
+    return f"""
+        DELETE FROM jardin_semana_totales
+        WHERE jardin_id IN ({jardines}) AND alimento_id IN ({alimentos});
+        INSERT INTO jardin_semana_totales(jardin_id, alimento_id, suma_gramos_g1, suma_gramos_g2)
+        {_TOTALES_SELECT.format(where=where)};
+    """
+
+
+def rebuild_jardin_semana_totales(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM jardin_semana_totales")
+    conn.execute(
+        "INSERT INTO jardin_semana_totales(jardin_id, alimento_id, suma_gramos_g1, suma_gramos_g2)"
+        + _TOTALES_SELECT.format(where="")
+    )
+
+
+def _migration_002_jardin_semana_totales(conn: sqlite3.Connection) -> None:
+    """Totales semanales por jardín y alimento, mantenidos por triggers.
+
+    ``minuta_items`` ya es único por (minuta, alimento); lo que el pedido
+    re-agrega cada vez es la suma de las minutas de la semana de cada jardín.
+    """
+    conn.execute(
+        """
+        CREATE TABLE jardin_semana_totales (
+            jardin_id INTEGER NOT NULL,
+            alimento_id INTEGER NOT NULL,
+            suma_gramos_g1 REAL NOT NULL,
+            suma_gramos_g2 REAL NOT NULL,
+            PRIMARY KEY (jardin_id, alimento_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jardin_minutas_semana_minuta ON jardin_minutas_semana(minuta_id)"
+    )
+
+    jardines_de = "SELECT jardin_id FROM jardin_minutas_semana WHERE minuta_id = {row}.minuta_id"
+    alimentos_de = "SELECT alimento_id FROM minuta_items WHERE minuta_id = {row}.minuta_id"
+    triggers = {
+        "trg_minuta_items_totales_ai": (
+            "AFTER INSERT ON minuta_items",
+            _refresh_totales_sql(jardines_de.format(row="NEW"), "NEW.alimento_id"),
+        ),
+        "trg_minuta_items_totales_ad": (
+            "AFTER DELETE ON minuta_items",
+            _refresh_totales_sql(jardines_de.format(row="OLD"), "OLD.alimento_id"),
+        ),
+        "trg_minuta_items_totales_au": (
+            "AFTER UPDATE ON minuta_items",
+            _refresh_totales_sql(jardines_de.format(row="NEW"), "NEW.alimento_id"),
+        ),
+        "trg_minuta_items_totales_au_key": (
+            "AFTER UPDATE OF minuta_id, alimento_id ON minuta_items",
+            _refresh_totales_sql(jardines_de.format(row="OLD"), "OLD.alimento_id"),
+        ),
+        "trg_jardin_minutas_semana_totales_ai": (
+            "AFTER INSERT ON jardin_minutas_semana",
+            _refresh_totales_sql("NEW.jardin_id", alimentos_de.format(row="NEW")),
+        ),
+        "trg_jardin_minutas_semana_totales_ad": (
+            "AFTER DELETE ON jardin_minutas_semana",
+            _refresh_totales_sql("OLD.jardin_id", alimentos_de.format(row="OLD")),
+        ),
+        "trg_jardin_minutas_semana_totales_au": (
+            "AFTER UPDATE OF jardin_id, minuta_id ON jardin_minutas_semana",
+            _refresh_totales_sql("OLD.jardin_id", alimentos_de.format(row="OLD"))
+            + _refresh_totales_sql("NEW.jardin_id", alimentos_de.format(row="NEW")),
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
+
+    rebuild_jardin_semana_totales(conn)
+
+
+def _migration_003_nombre_normalizado(conn: sqlite3.Connection) -> None:
+    """Columna ``nombre_normalizado`` con índice único en alimentos y jardines.
+
+    Si dos nombres existentes normalizan igual, el de menor id conserva la clave
+    y los demás quedan en NULL (siguen accesibles por id y nombre).
+    """
+    from models import normalize_food_name  # import diferido: models importa db
+
+    for table in ("alimentos", "jardines"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN nombre_normalizado TEXT")
+        seen: set[str] = set()
+        updates: list[tuple[str | None, int]] = []
+        for row in conn.execute(f"SELECT id, nombre FROM {table} ORDER BY id").fetchall():
+            key = normalize_food_name(row["nombre"]) or None
+            if key is not None and key in seen:
+                key = None
+            elif key is not None:
+                seen.add(key)
+            updates.append((key, row["id"]))
+        conn.executemany(f"UPDATE {table} SET nombre_normalizado = ? WHERE id = ?", updates)
+        conn.execute(f"CREATE UNIQUE INDEX idx_{table}_nombre_normalizado ON {table}(nombre_normalizado)")
+
+
+def _migration_004_alimento_alias(conn: sqlite3.Connection) -> None:
+    """Nombres alternativos (ya normalizados) con los que llegan alimentos en las plantillas."""
+    conn.execute(
+        """
+        CREATE TABLE alimento_alias (
+            alias_normalizado TEXT PRIMARY KEY,
+            alimento_id INTEGER NOT NULL,
+            FOREIGN KEY (alimento_id) REFERENCES alimentos(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX idx_alimento_alias_alimento ON alimento_alias(alimento_id)")
+
+
+def _migration_005_seed_metadata(conn: sqlite3.Connection) -> None:
+    """Versión y checksum de cada catálogo semilla aplicado, para no repetirlo en cada arranque."""
+    conn.execute(
+        """
+        CREATE TABLE seed_metadata (
+            catalogo TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            checksum TEXT NOT NULL,
+            aplicado_en TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _migration_006_alimento_unidades(conn: sqlite3.Connection) -> None:
+    """Unidad de pedido por alimento y un contador de versión que los triggers mantienen.
+
+    ``tamano_paquete`` está expresado en unidades de pedido. Las unidades por
+    defecto del catálogo inicial las carga ``seed`` (versión 2 de la semilla).
+    """
+    conn.execute(
+        """
+        CREATE TABLE alimento_unidades (
+            alimento_id INTEGER PRIMARY KEY,
+            unidad TEXT NOT NULL,
+            gramos_por_unidad REAL NOT NULL CHECK (gramos_por_unidad > 0),
+            redondeo TEXT NOT NULL DEFAULT 'medio_arriba'
+                CHECK (redondeo IN ('medio_arriba', 'arriba', 'ninguno')),
+            tamano_paquete REAL CHECK (tamano_paquete IS NULL OR tamano_paquete > 0),
+            FOREIGN KEY (alimento_id) REFERENCES alimentos(id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute("CREATE TABLE unidades_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)")
+    conn.execute("INSERT INTO unidades_version(id, version) VALUES (1, 0)")
+    bump = "UPDATE unidades_version SET version = version + 1 WHERE id = 1;"
+    for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS jardin_minutas_semana (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                jardin_id INTEGER NOT NULL,
-                minuta_id INTEGER NOT NULL,
-                orden INTEGER NOT NULL,
-                FOREIGN KEY (jardin_id) REFERENCES jardines(id) ON DELETE CASCADE,
-                FOREIGN KEY (minuta_id) REFERENCES minutas(id) ON DELETE CASCADE,
-                UNIQUE (jardin_id, minuta_id),
-                UNIQUE (jardin_id, orden)
-            )
-            """
+            f"CREATE TRIGGER trg_alimento_unidades_version_{suffix} AFTER {event} ON alimento_unidades "
+            f"BEGIN {bump} END"
         )
-        conn.commit()
+
+
+def _migration_007_minutas_fecha_index(conn: sqlite3.Connection) -> None:
+    """Índice en el orden del listado de minutas: cada página es un rango del índice."""
+    conn.execute("CREATE INDEX idx_minutas_fecha_creacion ON minutas(fecha_creacion DESC, id DESC)")
+
+
+def _migration_008_minuta_items_alimento_index(conn: sqlite3.Connection) -> None:
+    """Índice de ``minuta_items`` por alimento.
+
+    Lo usan ``delete_alimento`` y la verificación de la FK al borrar un alimento,
+    que sin él recorren todos los ítems. Las búsquedas por minuta usan el único
+    (minuta_id, alimento_id) y las de la semana por jardín los únicos de
+    ``jardin_minutas_semana``; ``tests/test_query_plans.py`` fija esos planes.
+    """
+    conn.execute("CREATE INDEX idx_minuta_items_alimento ON minuta_items(alimento_id)")
+
+
+def _migration_009_minutas_nombre_clave(conn: sqlite3.Connection) -> None:
+    """Columna ``nombre_clave`` (ver ``models.minuta_key``) con índice en minutas.
+
+    Los nombres de minuta pueden repetirse, así que el índice no es único; las
+    búsquedas por nombre (importador, CLI) la usan en vez de recorrer la tabla.
+    """
+    from models import minuta_key  # import diferido: models importa db
+
+    conn.execute("ALTER TABLE minutas ADD COLUMN nombre_clave TEXT")
+    rows = conn.execute("SELECT id, nombre FROM minutas").fetchall()
+    conn.executemany(
+        "UPDATE minutas SET nombre_clave = ? WHERE id = ?",
+        [(minuta_key(row["nombre"]), row["id"]) for row in rows],
+    )
+    conn.execute("CREATE INDEX idx_minutas_nombre_clave ON minutas(nombre_clave)")
+
+
+# Migraciones numeradas: la posición en la lista (empezando en 1) es la versión
+# que queda registrada en PRAGMA user_version. Sólo se agregan al final.
+MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [
+    _migration_001_base_schema,
+    _migration_002_jardin_semana_totales,
+    _migration_003_nombre_normalizado,
+    _migration_004_alimento_alias,
+    _migration_005_seed_metadata,
+    _migration_006_alimento_unidades,
+    _migration_007_minutas_fecha_index,
+    _migration_008_minuta_items_alimento_index,
+    _migration_009_minutas_nombre_clave,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection | None = None) -> int:
+    conn = conn or get_connection()
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def init_db() -> None:
+    conn = get_connection()
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return
+
+    # Las reconstrucciones de tablas requieren desactivar las FK, y ese PRAGMA
+    # no tiene efecto dentro de una transacción.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        with transaction():
+            for version in range(schema_version(conn), SCHEMA_VERSION):
+                MIGRATIONS[version](conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
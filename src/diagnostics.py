@@ -0,0 +1,284 @@
+"""Instrumentación opcional de latencias: sentencias SQL y funciones públicas de ``models``.
+
+Se activa con la variable de entorno ``MINUTAS_DIAGNOSTICOS=1``. Apagada no
+instala nada, así que no tiene costo. Encendida:
+
+- cada conexión recibe un ``set_trace_callback`` que marca el inicio de cada
+  sentencia; la sentencia se da por terminada cuando empieza la siguiente o
+  cuando vuelve la función de ``models`` que la ejecutó (incluye el fetch);
+- cada función pública de ``models`` se reemplaza por un envoltorio que mide
+  su duración (en los generadores, o en las funciones que devuelven uno, sólo
+  el tiempo entre cada ``next()`` y su ``yield``; lo que tarda el consumidor no
+  cuenta).
+
+Las muestras se agrupan por SQL normalizado (literales como ``?``) o por
+nombre de función, en ventanas móviles de las últimas ``WINDOW`` muestras.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Generator, Iterator
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import db
+
+ENV_VAR = "MINUTAS_DIAGNOSTICOS"
+WINDOW = 1000
+SQL_KEY_MAX = 240
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def enabled_from_env() -> bool:
+    return os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def normalize_sql(sql: str) -> str:
+    """Agrupa sentencias que sólo difieren en los valores enlazados."""
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?, ...)", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text[:SQL_KEY_MAX]
+
+
+class LatencyHistogram:
+    """Contador total, máximo histórico y percentiles sobre las últimas ``window`` muestras."""
+
+    __slots__ = ("count", "total_ms", "max_ms", "_samples")
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def add(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self._samples.append(elapsed_ms)
+
+    def percentile(self, fraction: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self) -> dict[str, float | int]:
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "total_ms": self.total_ms,
+        }
+
+
+class LatencyRecorder:
+    """Histogramas por clave, seguros entre hilos."""
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self._window = window
+        self._lock = threading.Lock()
+        self._histograms: dict[str, LatencyHistogram] = {}
+
+    def record(self, key: str, elapsed_ms: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(self._window)
+            histogram.add(elapsed_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self, sort_by: str = "p95_ms", limit: int | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = [{"name": key, **histogram.summary()} for key, histogram in self._histograms.items()]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows if limit is None else rows[:limit]
+
+
+queries = LatencyRecorder()
+functions = LatencyRecorder()
+
+_state = threading.local()
+_originals: dict[str, Callable[..., Any]] = {}
+_installed_module: ModuleType | None = None
+
+
+def _finish_statement(now: float | None = None) -> None:
+    pending = getattr(_state, "pending", None)
+    if pending is None:
+        return
+    sql, started, carried_ms = pending
+    _state.pending = None
+    queries.record(normalize_sql(sql), carried_ms + ((now or time.perf_counter()) - started) * 1000)
+
+
+def _pause_statement(now: float) -> tuple[str, float] | None:
+    """Saca del hilo la sentencia en curso y devuelve su SQL con lo ya medido."""
+    pending = getattr(_state, "pending", None)
+    if pending is None:
+        return None
+    sql, started, carried_ms = pending
+    _state.pending = None
+    return sql, carried_ms + (now - started) * 1000
+
+
+def _trace(sql: str) -> None:
+    # Conexiones de otros hilos pueden seguir con el callback hasta que su hilo
+    # vuelva a pedirlas tras uninstall(); mientras tanto no se mide nada.
+    if _installed_module is None:
+        return
+    now = time.perf_counter()
+    pending = getattr(_state, "pending", None)
+    # Los subprogramas de triggers se reportan con el mismo texto de la sentencia que los disparó.
+    if pending is not None and pending[0] == sql:
+        return
+    _finish_statement(now)
+    _state.pending = (sql, now, 0.0)
+
+
+def _attach(conn: sqlite3.Connection) -> None:
+    conn.set_trace_callback(_trace)
+
+
+def _detach(conn: sqlite3.Connection) -> None:
+    conn.set_trace_callback(None)
+
+
+def _timed_generator(name: str, generator: Generator[Any, None, None], elapsed: float) -> Iterator[Any]:
+    """Mide ``generator`` sumando a ``elapsed`` (segundos ya gastados al crearlo).
+
+    Sólo cuenta el tiempo dentro del generador: entre un ``yield`` y el
+    siguiente ``next()`` corre el consumidor, y la sentencia que el generador
+    va leyendo queda en pausa para no sumarle ese tiempo.
+    """
+    paused: tuple[str, float] | None = None
+    try:
+        while True:
+            started = time.perf_counter()
+            if paused is not None:
+                _finish_statement(started)
+                _state.pending = (paused[0], started, paused[1])
+                paused = None
+            try:
+                value = next(generator)
+            except StopIteration:
+                return
+            finally:
+                now = time.perf_counter()
+                elapsed += now - started
+            paused = _pause_statement(now)
+            yield value
+    finally:
+        generator.close()
+        if paused is not None:
+            queries.record(normalize_sql(paused[0]), paused[1])
+        _finish_statement()
+        functions.record(name, elapsed * 1000)
+
+
+def _timed(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+            yield from _timed_generator(name, fn(*args, **kwargs), 0.0)
+
+        return generator_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            _finish_statement()
+            functions.record(name, (time.perf_counter() - started) * 1000)
+            raise
+        if inspect.isgenerator(result):
+            # Funciones que validan y devuelven un generador: se miden hasta agotarlo.
+            return _timed_generator(name, result, time.perf_counter() - started)
+        _finish_statement()
+        functions.record(name, (time.perf_counter() - started) * 1000)
+        return result
+
+    return wrapper
+
+
+def is_installed() -> bool:
+    return _installed_module is not None
+
+
+def install(module: ModuleType | None = None) -> None:
+    """Activa el trazado SQL y envuelve las funciones públicas de ``models``."""
+    global _installed_module
+    if _installed_module is not None:
+        return
+    if module is None:
+        import models as module
+
+    for name, value in list(vars(module).items()):
+        if name.startswith("_") or not inspect.isfunction(value) or value.__module__ != module.__name__:
+            continue
+        _originals[name] = value
+        setattr(module, name, _timed(name, value))
+    db.add_connection_hook(_attach)
+    _installed_module = module
+
+
+def uninstall() -> None:
+    global _installed_module
+    if _installed_module is None:
+        return
+    for name, original in _originals.items():
+        setattr(_installed_module, name, original)
+    _originals.clear()
+    _installed_module = None
+    # La conexión de este hilo se limpia ya; las de otros hilos, cuando su hilo
+    # la pida otra vez (sqlite3 no permite tocarlas desde aquí).
+    db.remove_connection_hook(_attach, undo=_detach)
+    _state.pending = None
+
+
+def install_from_env() -> bool:
+    if enabled_from_env():
+        install()
+    return is_installed()
+
+
+def reset() -> None:
+    queries.reset()
+    functions.reset()
+
+
+def report(limit: int | None = None) -> dict[str, Any]:
+    return {
+        "enabled": is_installed(),
+        "queries": queries.snapshot(limit=limit),
+        "functions": functions.snapshot(limit=limit),
+    }
+
+
+def dump(path: str | Path) -> Path:
+    output = Path(path)
+    output.write_text(json.dumps(report(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return output
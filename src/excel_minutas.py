@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import csv
 import logging
-from dataclasses import dataclass
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import db
 import models
+import unidades
 
 HEADERS = [
     "minuta",
@@ -15,8 +21,60 @@ HEADERS = [
 
 GROUP_HEADERS = ["alimento", "gramos"]
 
+ALIAS_HEADERS = ["alias", "alimento"]
+UNIDADES_HEADERS = ["alimento", "unidad", "gramos_por_unidad"]
+UNIDADES_OPTIONAL_HEADERS = ["redondeo", "tamano_paquete"]
+
 LOGGER = logging.getLogger(__name__)
 
+# Cada cuántas filas se revisa la cancelación y se informa el avance.
+PROGRESS_EVERY_ROWS = 500
+# Tamaño de los lotes de escritura; entre lotes también se revisa la cancelación.
+WRITE_BATCH_SIZE = 5000
+
+PHASE_READING = "leyendo"
+PHASE_WRITING = "guardando"
+
+# (filas procesadas, total estimado o None si la hoja no lo declara, fase)
+ProgressCallback = Callable[[int, "int | None", str], None]
+
+
+class ImportCancelled(Exception):
+    """La importación se canceló; la base queda como estaba antes de empezar."""
+
+
+class CancelToken:
+    """Bandera que la interfaz activa desde su hilo y el importador consulta entre lotes."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class _Progress:
+    """Informa el avance y revisa la cancelación cada ``PROGRESS_EVERY_ROWS`` filas."""
+
+    def __init__(self, callback: ProgressCallback | None, cancel: CancelToken | None, total: int | None = None):
+        self.callback = callback
+        self.cancel = cancel
+        self.total = total
+
+    def row(self, processed: int) -> None:
+        if processed % PROGRESS_EVERY_ROWS == 0:
+            self.report(processed, PHASE_READING)
+
+    def report(self, processed: int, phase: str, total: int | None = None) -> None:
+        if self.cancel is not None and self.cancel.cancelled:
+            raise ImportCancelled("Importación cancelada.")
+        if self.callback is not None:
+            self.callback(processed, total if total is not None else self.total, phase)
+
 
 @dataclass
 class ImportSummary:
@@ -53,8 +111,7 @@ def _normalize_header(value: object) -> str:
     return models.normalize_food_name(str(value or ""))
 
 
-def _validate_headers(ws: object) -> None:
-    header_values = [cell.value for cell in ws[1]]
+def _validate_headers(header_values: tuple[object, ...]) -> None:
     normalized_headers = [_normalize_header(value) for value in header_values if value is not None]
     expected = {models.normalize_food_name(header) for header in HEADERS}
     missing = [header for header in HEADERS if models.normalize_food_name(header) not in normalized_headers]
@@ -66,8 +123,7 @@ def _validate_headers(ws: object) -> None:
         )
 
 
-def _validate_group_headers(ws: object) -> None:
-    header_values = [cell.value for cell in ws[1]]
+def _validate_group_headers(header_values: tuple[object, ...]) -> None:
     normalized_headers = [_normalize_header(value) for value in header_values if value is not None]
     expected = {models.normalize_food_name(header) for header in GROUP_HEADERS}
     missing = [header for header in GROUP_HEADERS if models.normalize_food_name(header) not in normalized_headers]
@@ -78,6 +134,33 @@ def _validate_group_headers(ws: object) -> None:
         )
 
 
+@contextmanager
+def _read_sheet(path: str | Path, sheet_name: str) -> Iterator[tuple[Iterator[tuple[object, ...]], int | None]]:
+    """Abre el libro en modo de sólo lectura y entrega ``(filas, total_estimado)``.
+
+    Las filas se leen en streaming (la primera es el encabezado), por lo que la
+    memoria no crece con el tamaño de la hoja. ``total_estimado`` es la cantidad
+    de filas de datos que declara la hoja (``None`` si no la declara). El libro
+    se cierra al salir.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("Falta la dependencia 'openpyxl'. Instala requirements.txt") from exc
+
+    wb = load_workbook(filename=Path(path), read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
+        declared = ws.max_row
+        total = declared - 1 if declared and declared > 1 else None
+        # Algunos generadores de Excel declaran dimensiones incorrectas; sin
+        # ellas openpyxl lee hasta la última fila real.
+        ws.reset_dimensions()
+        yield ws.iter_rows(values_only=True), total
+    finally:
+        wb.close()
+
+
 def export_template(path: str | Path) -> Path:
     try:
         from openpyxl import Workbook
@@ -144,138 +227,306 @@ def export_group_template(path: str | Path) -> Path:
     return output_path
 
 
-def import_minuta_group(
-    path: str | Path,
-    minuta_id: int,
-    grupo: str,
-    food_mapping: dict[str, str] | None = None,
-) -> GroupImportSummary:
-    try:
-        from openpyxl import load_workbook
-    except ModuleNotFoundError as exc:
-        raise RuntimeError("Falta la dependencia 'openpyxl'. Instala requirements.txt") from exc
-
-    if grupo not in {"g1", "g2"}:
-        raise ValueError("Grupo inválido. Usa 'g1' (pequeños) o 'g2' (grandes).")
-
-    wb = load_workbook(filename=Path(path), data_only=True)
-    ws = wb["MinutaGrupo"] if "MinutaGrupo" in wb.sheetnames else wb.active
-    _validate_group_headers(ws)
-
-    summary = GroupImportSummary()
-    mapping_normalized = {
-        models.normalize_food_name(k): models.normalize_food_name(v)
-        for k, v in (food_mapping or {}).items()
-        if models.normalize_food_name(v)
-    }
-
-    alimentos_rows = models.list_alimentos()
-    alimentos = {models.normalize_food_name(a["nombre"]): a["id"] for a in alimentos_rows}
-
-    for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        alimento_raw, gramos_raw = (row + (None,) * 2)[:2]
-        if not any([alimento_raw, gramos_raw]):
-            continue
-
-        summary.rows_processed += 1
-        alimento_name = models.normalize_name(str(alimento_raw or ""))
-        if not alimento_name:
-            summary.empty_food_rows += 1
-            continue
-
-        if gramos_raw in (None, ""):
-            continue
-
-        try:
-            gramos = float(str(gramos_raw).replace(",", "."))
-        except Exception as exc:
-            raise ValueError(f"Fila {idx}: gramos inválidos para '{alimento_name}'.") from exc
-        if gramos <= 0:
-            continue
-
-        original_key = models.normalize_food_name(alimento_name)
-        alimento_key = mapping_normalized.get(original_key, original_key)
-        alimento_id = alimentos.get(alimento_key)
-        if alimento_id is None:
-            summary.unknown_food_rows += 1
-            if alimento_name not in summary.unknown_foods:
-                summary.unknown_foods.append(alimento_name)
-            continue
+def import_aliases_csv(path: str | Path) -> int:
+    """Carga alias desde un CSV con columnas ``alias`` y ``alimento`` (nombre del catálogo)."""
+    with Path(path).open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = [_normalize_header(value) for value in next(reader, [])]
+        missing = [name for name in ALIAS_HEADERS if name not in header]
+        if missing:
+            raise ValueError(f"El CSV de alias no contiene las columnas requeridas. Faltan: {', '.join(missing)}.")
+        alias_col, alimento_col = (header.index(name) for name in ALIAS_HEADERS)
+        aliases = {
+            row[alias_col]: row[alimento_col]
+            for row in reader
+            if len(row) > max(alias_col, alimento_col)
+        }
+    return models.save_food_aliases(aliases)
+
+
+def import_unidades_csv(path: str | Path) -> int:
+    """Carga unidades de pedido desde un CSV ``alimento, unidad, gramos_por_unidad[, redondeo, tamano_paquete]``.
+
+    Los alimentos que no están en el catálogo se ignoran; devuelve cuántas unidades se guardaron.
+    """
+    with Path(path).open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = [_normalize_header(value) for value in next(reader, [])]
+        columns = {
+            name: header.index(_normalize_header(name))
+            for name in UNIDADES_HEADERS + UNIDADES_OPTIONAL_HEADERS
+            if _normalize_header(name) in header
+        }
+        missing = [name for name in UNIDADES_HEADERS if name not in columns]
+        if missing:
+            raise ValueError(f"El CSV de unidades no contiene las columnas requeridas. Faltan: {', '.join(missing)}.")
+        alimento_col, unidad_col, gramos_col = (columns[name] for name in UNIDADES_HEADERS)
+        redondeo_col = columns.get("redondeo")
+        paquete_col = columns.get("tamano_paquete")
+
+        def cell(row: list[str], column: int | None) -> str:
+            return row[column].strip() if column is not None and column < len(row) else ""
+
+        parsed: dict[str, tuple[str, float, str, float | None]] = {}
+        for line, row in enumerate(reader, start=2):
+            alimento = models.normalize_food_name(cell(row, alimento_col))
+            if not alimento:
+                continue
+            try:
+                gramos = float(cell(row, gramos_col).replace(",", "."))
+                paquete_raw = cell(row, paquete_col).replace(",", ".")
+                paquete = float(paquete_raw) if paquete_raw else None
+            except ValueError as exc:
+                raise ValueError(f"Fila {line}: gramos_por_unidad y tamano_paquete deben ser números.") from exc
+            redondeo = cell(row, redondeo_col) or unidades.REDONDEO_MEDIO_ARRIBA
+            parsed[alimento] = (cell(row, unidad_col), gramos, redondeo, paquete)
+
+    found = models.find_alimento_ids(parsed)
+    return models.save_alimento_unidades(
+        (found[alimento], *values) for alimento, values in parsed.items() if alimento in found
+    )
 
-        summary.foods_detected += 1
-        models.add_or_update_item_by_group(minuta_id, alimento_id, grupo, gramos)
-        summary.rows_imported += 1
 
-    return summary
+@dataclass
+class StagedFood:
+    alimento_key: str
+    gramos: float
+    rows: int
+    last_row: int
 
 
-def import_minutas(path: str | Path) -> ImportSummary:
-    try:
-        from openpyxl import load_workbook
-    except ModuleNotFoundError as exc:
-        raise RuntimeError("Falta la dependencia 'openpyxl'. Instala requirements.txt") from exc
+@dataclass
+class StagedGroupImport:
+    """Resultado de leer una plantilla de grupo, sin escribir en la base.
 
-    wb = load_workbook(filename=Path(path), data_only=True)
-    ws = wb["Minutas"] if "Minutas" in wb.sheetnames else wb.active
-    _validate_headers(ws)
+    ``foods`` agrupa las filas válidas por el nombre escrito en la hoja (en
+    orden de primera aparición); ``catalog`` guarda los ids ya consultados por
+    nombre normalizado para resolverlas. Se puede aplicar varias veces con distintos mapeos sin volver
+    a leer el archivo.
+    """
 
-    summary = ImportSummary()
+    grupo: str
+    rows_processed: int = 0
+    empty_food_rows: int = 0
+    foods: dict[str, StagedFood] = field(default_factory=dict)
+    catalog: dict[str, int] = field(default_factory=dict)
+
+    def resolve(self, food_mapping: dict[str, str] | None = None) -> tuple[GroupImportSummary, list[tuple[int, float]]]:
+        mapping_normalized = {
+            models.normalize_food_name(k): models.normalize_food_name(v)
+            for k, v in (food_mapping or {}).items()
+            if models.normalize_food_name(v)
+        }
+        missing = [key for key in mapping_normalized.values() if key not in self.catalog]
+        if missing:
+            self.catalog.update(models.find_alimento_ids(missing))
+
+        summary = GroupImportSummary(rows_processed=self.rows_processed, empty_food_rows=self.empty_food_rows)
+        resolved: dict[int, tuple[int, float]] = {}
+        for alimento_name, food in self.foods.items():
+            alimento_key = mapping_normalized.get(food.alimento_key, food.alimento_key)
+            alimento_id = self.catalog.get(alimento_key)
+            if alimento_id is None:
+                summary.unknown_food_rows += food.rows
+                summary.unknown_foods.append(alimento_name)
+                continue
+            summary.foods_detected += food.rows
+            summary.rows_imported += food.rows
+            current = resolved.get(alimento_id)
+            if current is None or current[0] < food.last_row:
+                resolved[alimento_id] = (food.last_row, food.gramos)
+        items = [(alimento_id, gramos) for alimento_id, (_, gramos) in resolved.items()]
+        return summary, items
 
-    alimentos = {models.normalize_food_name(a["nombre"]): a["id"] for a in models.list_alimentos()}
-    minutas = {models.normalize_name(m["nombre"]).lower(): m["id"] for m in models.list_minutas()}
+    def unknown_foods(self, food_mapping: dict[str, str] | None = None) -> list[str]:
+        return self.resolve(food_mapping)[0].unknown_foods
 
-    for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        minuta_raw, alimento_raw, gramos1_raw, gramos2_raw = (row + (None,) * 4)[:4]
 
-        if not any([minuta_raw, alimento_raw, gramos1_raw, gramos2_raw]):
-            continue
+def stage_minuta_group(
+    path: str | Path,
+    grupo: str,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+) -> StagedGroupImport:
+    """Fase de lectura: valida la plantilla y agrupa sus filas en memoria.
 
-        summary.rows_processed += 1
+    Sin escrituras en la base, por lo que cancelar sólo descarta lo leído.
+    """
+    if grupo not in {"g1", "g2"}:
+        raise ValueError("Grupo inválido. Usa 'g1' (pequeños) o 'g2' (grandes).")
 
-        minuta_name = models.normalize_name(str(minuta_raw or ""))
-        alimento_name = models.normalize_name(str(alimento_raw or ""))
-        if not minuta_name:
-            raise ValueError(f"Fila {idx}: 'minuta' es obligatoria.")
+    staged = StagedGroupImport(grupo=grupo)
+
+    with _read_sheet(path, "MinutaGrupo") as (rows, total):
+        tracker = _Progress(progress, cancel, total)
+        tracker.report(0, PHASE_READING)
+        _validate_group_headers(next(rows, ()))
+        for idx, row in enumerate(rows, start=2):
+            tracker.row(idx - 1)
+            alimento_raw, gramos_raw = (row + (None,) * 2)[:2]
+            if not any([alimento_raw, gramos_raw]):
+                continue
+
+            staged.rows_processed += 1
+            alimento_name = models.normalize_name(str(alimento_raw or ""))
+            if not alimento_name:
+                staged.empty_food_rows += 1
+                continue
+
+            if gramos_raw in (None, ""):
+                continue
+
+            try:
+                gramos = float(str(gramos_raw).replace(",", "."))
+            except Exception as exc:
+                raise ValueError(f"Fila {idx}: gramos inválidos para '{alimento_name}'.") from exc
+            if gramos <= 0:
+                continue
+
+            food = staged.foods.get(alimento_name)
+            if food is None:
+                staged.foods[alimento_name] = StagedFood(
+                    alimento_key=models.normalize_food_name(alimento_name),
+                    gramos=gramos,
+                    rows=1,
+                    last_row=idx,
+                )
+            else:
+                food.gramos = gramos
+                food.rows += 1
+                food.last_row = idx
+        tracker.report(staged.rows_processed, PHASE_READING, staged.rows_processed)
+
+    keys = [food.alimento_key for food in staged.foods.values()]
+    staged.catalog = models.find_alimento_ids(keys)
+    aliases = models.load_alias_map()
+    staged.catalog.update((key, aliases[key]) for key in keys if key not in staged.catalog and key in aliases)
+    return staged
+
+
+def apply_minuta_group(
+    staged: StagedGroupImport,
+    minuta_id: int,
+    food_mapping: dict[str, str] | None = None,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+) -> GroupImportSummary:
+    """Fase de escritura: resuelve los alimentos con ``food_mapping`` y guarda el lote.
+
+    Los mapeos manuales quedan guardados como alias para próximas importaciones.
+    """
+    summary, items = staged.resolve(food_mapping)
+    _Progress(progress, cancel).report(0, PHASE_WRITING, len(items))
+    with db.transaction():
+        models.bulk_upsert_items_by_group(minuta_id, staged.grupo, items)
+        if food_mapping:
+            models.save_food_aliases(food_mapping)
+    return summary
 
-        if not alimento_name:
-            summary.empty_food_rows += 1
-            LOGGER.warning("Fila %s ignorada por alimento vacío.", idx)
-            continue
 
-        if gramos1_raw in (None, "") or gramos2_raw in (None, ""):
-            continue
+def import_minuta_group(
+    path: str | Path,
+    minuta_id: int,
+    grupo: str,
+    food_mapping: dict[str, str] | None = None,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+) -> GroupImportSummary:
+    staged = stage_minuta_group(path, grupo, progress=progress, cancel=cancel)
+    return apply_minuta_group(staged, minuta_id, food_mapping, progress=progress, cancel=cancel)
 
-        try:
-            gramos_1 = float(str(gramos1_raw).replace(",", "."))
-            gramos_2 = float(str(gramos2_raw).replace(",", "."))
-        except Exception as exc:
-            raise ValueError(f"Fila {idx}: gramos inválidos para '{alimento_name}'.") from exc
 
-        if gramos_1 <= 0 or gramos_2 <= 0:
-            continue
+def import_minutas(
+    path: str | Path,
+    progress: ProgressCallback | None = None,
+    cancel: CancelToken | None = None,
+) -> ImportSummary:
+    """Importa la plantilla general en una sola transacción.
+
+    ``progress`` recibe el avance cada ``PROGRESS_EVERY_ROWS`` filas leídas y
+    cada lote escrito; si ``cancel`` se activa se lanza ``ImportCancelled`` y la
+    transacción se deshace, sin minutas nuevas ni ítems a medio cargar.
+    """
+    summary = ImportSummary()
 
-        alimento_key = models.normalize_food_name(alimento_name)
-        alimento_id = alimentos.get(alimento_key)
-        if alimento_id is None:
-            summary.unknown_food_rows += 1
-            if alimento_name not in summary.unknown_foods:
-                summary.unknown_foods.append(alimento_name)
-            LOGGER.warning("Alimento no encontrado en fila %s: %s", idx, alimento_name)
-            continue
-
-        summary.foods_detected += 1
-
-        minuta_key = minuta_name.lower()
-        if minuta_key not in minutas:
-            minuta_id = models.create_minuta(minuta_name)
-            minutas[minuta_key] = minuta_id
-            summary.minutas_created += 1
-        else:
-            minuta_id = minutas[minuta_key]
-            summary.minutas_updated += 1
-
-        models.add_or_update_item(minuta_id, alimento_id, gramos_1, gramos_2)
-        summary.items_upserted += 1
-        summary.rows_imported += 1
+    alimentos: dict[str, int | None] = {}
+    aliases = models.load_alias_map()
+    # Minutas de la hoja (clave -> nombre y filas); se buscan en la base al terminar de leer.
+    sheet_minutas: dict[str, str] = {}
+    minuta_rows: dict[str, int] = {}
+    pending: dict[tuple[str, int], tuple[float, float]] = {}
+
+    with _read_sheet(path, "Minutas") as (rows, total):
+        tracker = _Progress(progress, cancel, total)
+        tracker.report(0, PHASE_READING)
+        _validate_headers(next(rows, ()))
+        for idx, row in enumerate(rows, start=2):
+            tracker.row(idx - 1)
+            minuta_raw, alimento_raw, gramos1_raw, gramos2_raw = (row + (None,) * 4)[:4]
+
+            if not any([minuta_raw, alimento_raw, gramos1_raw, gramos2_raw]):
+                continue
+
+            summary.rows_processed += 1
+
+            minuta_name = models.normalize_name(str(minuta_raw or ""))
+            alimento_name = models.normalize_name(str(alimento_raw or ""))
+            if not minuta_name:
+                raise ValueError(f"Fila {idx}: 'minuta' es obligatoria.")
+
+            if not alimento_name:
+                summary.empty_food_rows += 1
+                LOGGER.warning("Fila %s ignorada por alimento vacío.", idx)
+                continue
+
+            if gramos1_raw in (None, "") or gramos2_raw in (None, ""):
+                continue
+
+            try:
+                gramos_1 = float(str(gramos1_raw).replace(",", "."))
+                gramos_2 = float(str(gramos2_raw).replace(",", "."))
+            except Exception as exc:
+                raise ValueError(f"Fila {idx}: gramos inválidos para '{alimento_name}'.") from exc
+
+            if gramos_1 <= 0 or gramos_2 <= 0:
+                continue
+
+            alimento_key = models.normalize_food_name(alimento_name)
+            if alimento_key not in alimentos:
+                alimentos[alimento_key] = models.find_alimento_id(alimento_key) or aliases.get(alimento_key)
+            alimento_id = alimentos[alimento_key]
+            if alimento_id is None:
+                summary.unknown_food_rows += 1
+                if alimento_name not in summary.unknown_foods:
+                    summary.unknown_foods.append(alimento_name)
+                LOGGER.warning("Alimento no encontrado en fila %s: %s", idx, alimento_name)
+                continue
+
+            summary.foods_detected += 1
+
+            minuta_key = models.minuta_key(minuta_name)
+            sheet_minutas.setdefault(minuta_key, minuta_name)
+            minuta_rows[minuta_key] = minuta_rows.get(minuta_key, 0) + 1
+
+            pending[(minuta_key, alimento_id)] = (gramos_1, gramos_2)
+            summary.items_upserted += 1
+            summary.rows_imported += 1
+
+    tracker.report(summary.rows_processed, PHASE_READING, summary.rows_processed)
+    with db.transaction():
+        minutas = models.find_minuta_ids(sheet_minutas)
+        for minuta_key, minuta_name in sheet_minutas.items():
+            # La primera fila de una minuta nueva la crea; las demás la actualizan.
+            if minuta_key not in minutas:
+                minutas[minuta_key] = models.create_minuta(minuta_name)
+                summary.minutas_created += 1
+                summary.minutas_updated += minuta_rows[minuta_key] - 1
+            else:
+                summary.minutas_updated += minuta_rows[minuta_key]
+        items = [(minutas[minuta_key], alimento_id, g1, g2) for (minuta_key, alimento_id), (g1, g2) in pending.items()]
+        for start in range(0, len(items), WRITE_BATCH_SIZE):
+            tracker.report(start, PHASE_WRITING, len(items))
+            models.bulk_upsert_items(items[start : start + WRITE_BATCH_SIZE])
+        tracker.report(len(items), PHASE_WRITING, len(items))
 
     return summary
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import csv
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import models
+
+PEDIDO_HEADERS = [
+    "alimento",
+    "suma_gramos_g1",
+    "suma_gramos_g2",
+    "ninos_grupo_1",
+    "ninos_grupo_2",
+    "total_g1",
+    "total_g2",
+    "total_general",
+    "pedido_final",
+]
+
+CSV_HEADERS = ["jardin_id", "jardin", *PEDIDO_HEADERS]
+
+_SHEET_TITLE_MAX = 31
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _pedido_values(row: dict[str, Any]) -> list[Any]:
+    return [
+        row["alimento_nombre"],
+        row["suma_gramos_g1"],
+        row["suma_gramos_g2"],
+        row["ninos_grupo_1"],
+        row["ninos_grupo_2"],
+        row["total_g1"],
+        row["total_g2"],
+        row["total_general"],
+        row["pedido_final"],
+    ]
+
+
+def _sheet_title(nombre: str, used: set[str]) -> str:
+    """Título de hoja válido para Excel (31 caracteres, sin ``[]:*?/\\``) y único en el libro."""
+    base = _INVALID_SHEET_CHARS.sub("_", nombre).strip("' ") or "Jardín"
+    title = base[:_SHEET_TITLE_MAX]
+    suffix = 2
+    while title.casefold() in used:
+        tag = f" ({suffix})"
+        title = base[: _SHEET_TITLE_MAX - len(tag)] + tag
+        suffix += 1
+    used.add(title.casefold())
+    return title
+
+
+def iter_pedido_rows(
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None = None,
+) -> Iterator[tuple[int, str, Iterator[list[Any]]]]:
+    """Entrega ``(jardin_id, nombre, filas)`` por jardín, con la columna ``pedido_final``.
+
+    Se apoya en ``models.iter_weekly_orders``: sólo un jardín está en memoria a la vez.
+    """
+    jardines = {int(row["id"]): row["nombre"] for row in models.list_jardines()}
+    for jardin_id, resumen in models.iter_weekly_orders(ninos_por_jardin, jardin_ids):
+        yield jardin_id, jardines.get(jardin_id, str(jardin_id)), (_pedido_values(row) for row in resumen)
+
+
+def export_weekly_orders_xlsx(
+    path: str | Path,
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None = None,
+) -> int:
+    """Escribe los pedidos semanales en un libro con una hoja por jardín.
+
+    Usa el modo de sólo escritura de openpyxl, que vuelca cada fila al disco
+    al agregarla. Devuelve la cantidad de hojas escritas.
+    """
+    try:
+        from openpyxl import Workbook
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("Falta la dependencia 'openpyxl'. Instala requirements.txt") from exc
+
+    wb = Workbook(write_only=True)
+    used: set[str] = set()
+    sheets = 0
+    for _jardin_id, nombre, filas in iter_pedido_rows(ninos_por_jardin, jardin_ids):
+        ws = wb.create_sheet(title=_sheet_title(nombre, used))
+        ws.freeze_panes = "A2"
+        ws.column_dimensions["A"].width = 42
+        ws.append(PEDIDO_HEADERS)
+        for values in filas:
+            ws.append(values)
+        sheets += 1
+
+    if not sheets:
+        ws = wb.create_sheet(title="Pedido")
+        ws.append(PEDIDO_HEADERS)
+    wb.save(Path(path))
+    return sheets
+
+
+def write_weekly_orders_csv(
+    output: Any,
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None = None,
+) -> int:
+    """Escribe los pedidos como CSV en un archivo ya abierto. Devuelve las filas escritas."""
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADERS)
+    count = 0
+    for jardin_id, nombre, filas in iter_pedido_rows(ninos_por_jardin, jardin_ids):
+        for values in filas:
+            writer.writerow([jardin_id, nombre, *values])
+            count += 1
+    return count
+
+
+def export_weekly_orders_csv(
+    path: str | Path,
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None = None,
+) -> int:
+    """Escribe los pedidos en un CSV (una fila por jardín y alimento). Devuelve las filas escritas."""
+    with Path(path).open("w", newline="", encoding="utf-8-sig") as handle:
+        return write_weekly_orders_csv(handle, ninos_por_jardin, jardin_ids)
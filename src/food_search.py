@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import models
+
+DEFAULT_LIMIT = 50
+# Carácter mayor que cualquier letra o dígito normalizado: cierra el rango de un prefijo.
+_PREFIX_END = "\U0010ffff"
+
+
+@dataclass(frozen=True)
+class FoodHit:
+    alimento_id: int
+    nombre: str
+
+
+class FoodSearchIndex:
+    """Búsqueda por prefijo sobre los nombres normalizados del catálogo.
+
+    Cada palabra de la consulta debe ser prefijo de alguna palabra del nombre,
+    sin importar tildes ni mayúsculas (``"arr bla"`` encuentra "Arroz blanco").
+    Primero van los nombres que empiezan por la consulta completa y luego el
+    resto, ambos en orden alfabético.
+
+    Los alimentos se guardan ordenados por nombre normalizado, así que la
+    posición es también el orden alfabético. Hay dos listas ordenadas para
+    buscar rangos con ``bisect``: los nombres completos y las palabras (con la
+    posición del alimento al que pertenecen).
+    """
+
+    def __init__(self, alimentos: Iterable[tuple[int, str]], keys: Iterable[str | None] | None = None):
+        """``keys`` permite pasar los nombres ya normalizados (p. ej. ``nombre_normalizado``)."""
+        alimentos = list(alimentos)
+        known = list(keys) if keys is not None else [None] * len(alimentos)
+        entries = sorted(
+            (key or models.normalize_food_name(nombre), nombre, alimento_id)
+            for (alimento_id, nombre), key in zip(alimentos, known)
+        )
+        self._keys: list[str] = [key for key, _, _ in entries]
+        self._nombres: list[str] = [nombre for _, nombre, _ in entries]
+        self._ids: list[int] = [alimento_id for _, _, alimento_id in entries]
+        self._by_key: dict[str, int] = {}
+        for position, key in enumerate(self._keys):
+            self._by_key.setdefault(key, position)
+
+        tokens = sorted(
+            (word, position) for position, key in enumerate(self._keys) for word in set(key.split())
+        )
+        self._tokens: list[str] = [word for word, _ in tokens]
+        self._token_positions: list[int] = [position for _, position in tokens]
+
+    @classmethod
+    def from_catalog(cls) -> FoodSearchIndex:
+        rows = models.list_alimentos()
+        return cls(((row["id"], row["nombre"]) for row in rows), (row["nombre_normalizado"] for row in rows))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _hit(self, position: int) -> FoodHit:
+        return FoodHit(self._ids[position], self._nombres[position])
+
+    def _prefix_range(self, values: list[str], prefix: str) -> tuple[int, int]:
+        return bisect_left(values, prefix), bisect_left(values, prefix + _PREFIX_END)
+
+    def find_exact(self, nombre: str) -> FoodHit | None:
+        position = self._by_key.get(models.normalize_food_name(nombre))
+        return None if position is None else self._hit(position)
+
+    def first(self, limit: int = DEFAULT_LIMIT) -> list[FoodHit]:
+        return [self._hit(position) for position in range(min(limit, len(self._ids)))]
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list[FoodHit]:
+        key = models.normalize_food_name(query)
+        if limit <= 0:
+            return []
+        if not key:
+            return self.first(limit)
+
+        start, end = self._prefix_range(self._keys, key)
+        leading = list(range(start, min(end, start + limit)))
+        if len(leading) == limit:
+            return [self._hit(position) for position in leading]
+
+        # Alimentos con alguna palabra que empieza por cada término: intersección
+        # de los rangos de palabras, empezando por el más chico.
+        ranges = sorted(
+            (self._prefix_range(self._tokens, term) for term in set(key.split())),
+            key=lambda bounds: bounds[1] - bounds[0],
+        )
+        low, high = ranges[0]
+        candidates = set(self._token_positions[low:high])
+        for low, high in ranges[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(self._token_positions[low:high])
+        rest = heapq.nsmallest(
+            limit - len(leading),
+            (position for position in candidates if not start <= position < end),
+        )
+        return [self._hit(position) for position in leading + rest]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import chain
+
+import models
+
+AUTO_SELECT_THRESHOLD = 0.6
+MIN_SCORE = 0.3
+
+
+@dataclass(frozen=True)
+class FoodMatch:
+    alimento_id: int
+    nombre: str
+    score: float
+
+
+def _trigrams(key: str) -> frozenset[str]:
+    padded = f" {key} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class FoodMatcher:
+    """Índice invertido de trigramas sobre los nombres normalizados del catálogo.
+
+    La similitud es el coeficiente de Dice entre los conjuntos de trigramas de
+    la consulta y de cada alimento; sólo se puntúan los alimentos que comparten
+    al menos un trigrama con la consulta.
+    """
+
+    def __init__(self, alimentos: Iterable[tuple[int, str]], keys: Iterable[str | None] | None = None):
+        """``keys`` permite pasar los nombres ya normalizados (p. ej. ``nombre_normalizado``)."""
+        alimentos = list(alimentos)
+        known = list(keys) if keys is not None else [None] * len(alimentos)
+        self._ids: list[int] = []
+        self._nombres: list[str] = []
+        self._sizes: list[int] = []
+        self._index: dict[str, list[int]] = {}
+        for (alimento_id, nombre), key in zip(alimentos, known):
+            grams = _trigrams(key or models.normalize_food_name(nombre))
+            position = len(self._ids)
+            self._ids.append(alimento_id)
+            self._nombres.append(nombre)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._index.setdefault(gram, []).append(position)
+
+    @classmethod
+    def from_catalog(cls) -> FoodMatcher:
+        rows = models.list_alimentos()
+        return cls(((row["id"], row["nombre"]) for row in rows), (row["nombre_normalizado"] for row in rows))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def match(self, nombre: str, limit: int = 5, min_score: float = MIN_SCORE) -> list[FoodMatch]:
+        key = models.normalize_food_name(nombre)
+        if not key or limit <= 0:
+            return []
+        grams = _trigrams(key)
+        size = len(grams)
+        index = self._index
+        shared = Counter(chain.from_iterable(index[gram] for gram in grams if gram in index))
+        # Un alimento con ``count`` trigramas en común tiene al menos ``count``
+        # trigramas, así que su puntaje no supera 2*count/(size+count): los que
+        # no alcanzan ``min_score`` ni con esa cota se descartan sin puntuarlos.
+        min_count = min_score * size / (2 - min_score)
+        sizes = self._sizes
+        best = heapq.nlargest(
+            limit,
+            (
+                (2 * count / (size + sizes[position]), -position)
+                for position, count in shared.items()
+                if count >= min_count
+            ),
+        )
+        # Con puntajes iguales gana la posición menor: por eso se guarda negada.
+        return [
+            FoodMatch(self._ids[-neg_position], self._nombres[-neg_position], score)
+            for score, neg_position in best
+            if score >= min_score
+        ]
+
+    def best_match(self, nombre: str, threshold: float = AUTO_SELECT_THRESHOLD) -> FoodMatch | None:
+        matches = self.match(nombre, limit=1)
+        if matches and matches[0].score >= threshold:
+            return matches[0]
+        return None
@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import sqlite3
 import unicodedata
+from collections.abc import Iterable, Iterator
+from itertools import groupby
 from typing import Any
 
-from db import get_connection
+import unidades
+from db import get_connection, rebuild_jardin_semana_totales, transaction
 
-MAX_MINUTAS = 25
+# Límite opcional de minutas en la base; None = sin límite.
+MAX_MINUTAS: int | None = None
+MINUTAS_PAGE_SIZE = 100
+_LOOKUP_CHUNK = 500
 
 
 def normalize_name(nombre: str) -> str:
@@ -29,20 +35,51 @@ def normalize_food_name(nombre: str) -> str:
     return " ".join("".join(normalized_chars).split())
 
 
+def minuta_key(nombre: str) -> str:
+    """Clave con la que se buscan minutas por nombre (columna ``nombre_clave``)."""
+    return normalize_name(nombre).lower()
+
+
 def _exists_by_name(table: str, nombre: str, current_id: int | None = None) -> bool:
-    query = f"SELECT id FROM {table} WHERE lower(nombre) = lower(?)"
-    params: list[Any] = [nombre]
+    key = normalize_food_name(nombre)
+    if key:
+        query = f"SELECT id FROM {table} WHERE nombre_normalizado = ?"
+        params: list[Any] = [key]
+    else:
+        query = f"SELECT id FROM {table} WHERE nombre = ?"
+        params = [nombre]
     if current_id is not None:
         query += " AND id != ?"
         params.append(current_id)
-    with get_connection() as conn:
-        row = conn.execute(query, params).fetchone()
+    conn = get_connection()
+    row = conn.execute(query, params).fetchone()
     return row is not None
 
 
+def find_alimento_ids(keys: Iterable[str]) -> dict[str, int]:
+    """Busca por ``nombre_normalizado`` (claves ya normalizadas) usando el índice único."""
+    pending = list(dict.fromkeys(key for key in keys if key))
+    found: dict[str, int] = {}
+    conn = get_connection()
+    for start in range(0, len(pending), _LOOKUP_CHUNK):
+        chunk = pending[start : start + _LOOKUP_CHUNK]
+        placeholders = ", ".join(["?"] * len(chunk))
+        rows = conn.execute(
+            f"SELECT nombre_normalizado, id FROM alimentos WHERE nombre_normalizado IN ({placeholders})",
+            chunk,
+        )
+        found.update((row["nombre_normalizado"], row["id"]) for row in rows)
+    return found
+
+
+def find_alimento_id(nombre: str) -> int | None:
+    key = normalize_food_name(nombre)
+    return find_alimento_ids([key]).get(key)
+
+
 def list_alimentos() -> list[sqlite3.Row]:
-    with get_connection() as conn:
-        return conn.execute("SELECT id, nombre FROM alimentos ORDER BY nombre").fetchall()
+    conn = get_connection()
+    return conn.execute("SELECT id, nombre, nombre_normalizado FROM alimentos ORDER BY nombre").fetchall()
 
 
 def create_alimento(nombre: str) -> int:
@@ -51,27 +88,130 @@ def create_alimento(nombre: str) -> int:
         raise ValueError("El nombre del alimento es obligatorio.")
     if _exists_by_name("alimentos", nombre):
         raise ValueError("Ya existe un alimento con ese nombre.")
-    with get_connection() as conn:
-        cursor = conn.execute("INSERT INTO alimentos(nombre) VALUES (?)", (nombre,))
-        conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO alimentos(nombre, nombre_normalizado) VALUES (?, ?)",
+            (nombre, normalize_food_name(nombre) or None),
+        )
         return int(cursor.lastrowid)
 
 
 def delete_alimento(alimento_id: int) -> None:
-    with get_connection() as conn:
+    with transaction() as conn:
         conn.execute("DELETE FROM minuta_items WHERE alimento_id = ?", (alimento_id,))
         conn.execute("DELETE FROM alimentos WHERE id = ?", (alimento_id,))
-        conn.commit()
+
+
+def load_alias_map() -> dict[str, int]:
+    """Todos los alias en un diccionario ``{alias_normalizado: alimento_id}``."""
+    conn = get_connection()
+    return dict(conn.execute("SELECT alias_normalizado, alimento_id FROM alimento_alias").fetchall())
+
+
+def save_food_aliases(aliases: dict[str, str]) -> int:
+    """Guarda alias ``{nombre en plantilla: nombre del catálogo}``.
+
+    Los destinos que no existen en el catálogo y los alias que ya son el nombre
+    de un alimento se ignoran; un alias existente se reasigna al nuevo destino.
+    """
+    normalized = {
+        normalize_food_name(alias): normalize_food_name(target)
+        for alias, target in aliases.items()
+        if normalize_food_name(alias) and normalize_food_name(target)
+    }
+    found = find_alimento_ids([*normalized.keys(), *normalized.values()])
+    rows = [
+        (alias, found[target])
+        for alias, target in normalized.items()
+        if target in found and alias not in found
+    ]
+    if not rows:
+        return 0
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO alimento_alias(alias_normalizado, alimento_id) VALUES (?, ?)
+            ON CONFLICT(alias_normalizado) DO UPDATE SET alimento_id = excluded.alimento_id
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+def _validate_unidad(unidad: str, gramos_por_unidad: float, redondeo: str, tamano_paquete: float | None) -> str:
+    unidad = normalize_name(unidad)
+    if not unidad:
+        raise ValueError("La unidad de pedido es obligatoria.")
+    if gramos_por_unidad <= 0:
+        raise ValueError("Los gramos por unidad deben ser mayores a 0.")
+    if redondeo not in unidades.REDONDEOS:
+        raise ValueError(f"Redondeo inválido. Usa uno de: {', '.join(unidades.REDONDEOS)}.")
+    if tamano_paquete is not None and tamano_paquete <= 0:
+        raise ValueError("El tamaño de paquete debe ser mayor a 0.")
+    return unidad
+
+
+def save_alimento_unidades(rows: Iterable[tuple[int, str, float, str, float | None]]) -> int:
+    """Guarda ``(alimento_id, unidad, gramos_por_unidad, redondeo, tamano_paquete)`` en un solo lote."""
+    validated = [
+        (alimento_id, _validate_unidad(unidad, gramos, redondeo, paquete), float(gramos), redondeo, paquete)
+        for alimento_id, unidad, gramos, redondeo, paquete in rows
+    ]
+    if not validated:
+        return 0
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO alimento_unidades(alimento_id, unidad, gramos_por_unidad, redondeo, tamano_paquete)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(alimento_id) DO UPDATE SET
+                unidad = excluded.unidad,
+                gramos_por_unidad = excluded.gramos_por_unidad,
+                redondeo = excluded.redondeo,
+                tamano_paquete = excluded.tamano_paquete
+            """,
+            validated,
+        )
+    return len(validated)
+
+
+def set_alimento_unidad(
+    alimento_id: int,
+    unidad: str,
+    gramos_por_unidad: float,
+    redondeo: str = unidades.REDONDEO_MEDIO_ARRIBA,
+    tamano_paquete: float | None = None,
+) -> None:
+    save_alimento_unidades([(alimento_id, unidad, gramos_por_unidad, redondeo, tamano_paquete)])
+
+
+def clear_alimento_unidad(alimento_id: int) -> None:
+    """Vuelve a pedir el alimento en gramos."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM alimento_unidades WHERE alimento_id = ?", (alimento_id,))
+
+
+def list_alimento_unidades() -> list[sqlite3.Row]:
+    conn = get_connection()
+    return conn.execute(
+        """
+        SELECT a.id AS alimento_id, a.nombre AS alimento_nombre, u.unidad, u.gramos_por_unidad,
+               u.redondeo, u.tamano_paquete
+        FROM alimento_unidades u
+        INNER JOIN alimentos a ON a.id = u.alimento_id
+        ORDER BY a.nombre
+        """
+    ).fetchall()
 
 
 def count_alimentos() -> int:
-    with get_connection() as conn:
-        return int(conn.execute("SELECT COUNT(*) FROM alimentos").fetchone()[0])
+    conn = get_connection()
+    return int(conn.execute("SELECT COUNT(*) FROM alimentos").fetchone()[0])
 
 
 def list_jardines() -> list[sqlite3.Row]:
-    with get_connection() as conn:
-        return conn.execute("SELECT id, nombre FROM jardines ORDER BY nombre").fetchall()
+    conn = get_connection()
+    return conn.execute("SELECT id, nombre FROM jardines ORDER BY nombre").fetchall()
 
 
 def create_jardin(nombre: str) -> int:
@@ -80,9 +220,11 @@ def create_jardin(nombre: str) -> int:
         raise ValueError("El nombre del jardín es obligatorio.")
     if _exists_by_name("jardines", nombre):
         raise ValueError("Ya existe un jardín con ese nombre.")
-    with get_connection() as conn:
-        cursor = conn.execute("INSERT INTO jardines(nombre) VALUES (?)", (nombre,))
-        conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO jardines(nombre, nombre_normalizado) VALUES (?, ?)",
+            (nombre, normalize_food_name(nombre) or None),
+        )
         return int(cursor.lastrowid)
 
 
@@ -92,85 +234,200 @@ def rename_jardin(jardin_id: int, nuevo_nombre: str) -> None:
         raise ValueError("El nombre del jardín es obligatorio.")
     if _exists_by_name("jardines", nuevo_nombre, jardin_id):
         raise ValueError("Ya existe un jardín con ese nombre.")
-    with get_connection() as conn:
-        conn.execute("UPDATE jardines SET nombre = ? WHERE id = ?", (nuevo_nombre, jardin_id))
-        conn.commit()
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE jardines SET nombre = ?, nombre_normalizado = ? WHERE id = ?",
+            (nuevo_nombre, normalize_food_name(nuevo_nombre) or None, jardin_id),
+        )
 
 
 def delete_jardin(jardin_id: int) -> None:
-    with get_connection() as conn:
+    with transaction() as conn:
         conn.execute("DELETE FROM jardines WHERE id = ?", (jardin_id,))
-        conn.commit()
 
 
 def list_minutas() -> list[sqlite3.Row]:
-    with get_connection() as conn:
+    conn = get_connection()
+    return conn.execute(
+        """
+        SELECT id, nombre, fecha_creacion
+        FROM minutas
+        ORDER BY fecha_creacion DESC, id DESC
+        """
+    ).fetchall()
+
+
+def list_minutas_page(
+    limit: int = MINUTAS_PAGE_SIZE, after: tuple[str, int] | None = None
+) -> list[sqlite3.Row]:
+    """Una página de minutas, de la más reciente a la más antigua.
+
+    ``after`` es el cursor de la última fila de la página anterior
+    (``minuta_cursor``); cada página es un rango de ``idx_minutas_fecha_creacion``,
+    así que cuesta lo mismo sin importar cuántas minutas haya antes.
+    """
+    conn = get_connection()
+    if after is None:
         return conn.execute(
             """
             SELECT id, nombre, fecha_creacion
             FROM minutas
             ORDER BY fecha_creacion DESC, id DESC
-            """
+            LIMIT ?
+            """,
+            (limit,),
         ).fetchall()
+    return conn.execute(
+        """
+        SELECT id, nombre, fecha_creacion
+        FROM minutas
+        WHERE (fecha_creacion, id) < (?, ?)
+        ORDER BY fecha_creacion DESC, id DESC
+        LIMIT ?
+        """,
+        (after[0], after[1], limit),
+    ).fetchall()
+
+
+def minuta_cursor(row: sqlite3.Row) -> tuple[str, int]:
+    return row["fecha_creacion"], row["id"]
+
+
+def find_minuta_ids(keys: Iterable[str]) -> dict[str, int]:
+    """Busca por ``nombre_clave`` (claves de ``minuta_key``) usando su índice.
+
+    Si hay varias minutas con el mismo nombre gana la más antigua (menor id).
+    """
+    pending = list(dict.fromkeys(key for key in keys if key))
+    found: dict[str, int] = {}
+    conn = get_connection()
+    for start in range(0, len(pending), _LOOKUP_CHUNK):
+        chunk = pending[start : start + _LOOKUP_CHUNK]
+        placeholders = ", ".join(["?"] * len(chunk))
+        rows = conn.execute(
+            f"SELECT nombre_clave, MIN(id) AS id FROM minutas WHERE nombre_clave IN ({placeholders}) "
+            "GROUP BY nombre_clave",
+            chunk,
+        )
+        found.update((row["nombre_clave"], row["id"]) for row in rows)
+    return found
+
+
+def find_minuta_id(nombre: str) -> int | None:
+    key = minuta_key(nombre)
+    return find_minuta_ids([key]).get(key)
 
 
 def create_minuta(nombre: str) -> int:
     nombre = normalize_name(nombre)
     if not nombre:
         raise ValueError("El nombre de la minuta es obligatorio.")
-    if count_minutas() >= MAX_MINUTAS:
-        raise ValueError(f"Solo se permiten {MAX_MINUTAS} minutas en total.")
-    with get_connection() as conn:
-        cursor = conn.execute("INSERT INTO minutas(nombre) VALUES (?)", (nombre,))
-        conn.commit()
+    with transaction() as conn:
+        if MAX_MINUTAS is not None:
+            total = conn.execute("SELECT COUNT(*) FROM minutas").fetchone()[0]
+            if total >= MAX_MINUTAS:
+                raise ValueError(f"Solo se permiten {MAX_MINUTAS} minutas en total.")
+        cursor = conn.execute(
+            "INSERT INTO minutas(nombre, nombre_clave) VALUES (?, ?)", (nombre, minuta_key(nombre))
+        )
         return int(cursor.lastrowid)
 
 
 def count_minutas() -> int:
-    with get_connection() as conn:
-        return int(conn.execute("SELECT COUNT(*) FROM minutas").fetchone()[0])
+    conn = get_connection()
+    return int(conn.execute("SELECT COUNT(*) FROM minutas").fetchone()[0])
+
+
+def has_minutas(exclude: Iterable[int] = ()) -> bool:
+    """Si hay alguna minuta fuera de ``exclude``, sin contar la tabla.
+
+    Corta en la primera fila que sirve; sólo recorre más que ``exclude`` filas
+    cuando no queda ninguna (``exclude`` son, p. ej., las minutas de una semana).
+    """
+    ids = [int(minuta_id) for minuta_id in dict.fromkeys(exclude)]
+    conn = get_connection()
+    if not ids:
+        return bool(conn.execute("SELECT EXISTS(SELECT 1 FROM minutas)").fetchone()[0])
+    placeholders = ", ".join(["?"] * len(ids))
+    return bool(conn.execute(f"SELECT EXISTS(SELECT 1 FROM minutas WHERE id NOT IN ({placeholders}))", ids).fetchone()[0])
 
 
 def get_minuta(minuta_id: int) -> sqlite3.Row | None:
-    with get_connection() as conn:
-        return conn.execute(
-            "SELECT id, nombre, fecha_creacion FROM minutas WHERE id = ?",
-            (minuta_id,),
-        ).fetchone()
+    conn = get_connection()
+    return conn.execute(
+        "SELECT id, nombre, fecha_creacion FROM minutas WHERE id = ?",
+        (minuta_id,),
+    ).fetchone()
 
 
 def update_minuta_nombre(minuta_id: int, nombre: str) -> None:
     nombre = normalize_name(nombre)
     if not nombre:
         raise ValueError("El nombre de la minuta es obligatorio.")
-    with get_connection() as conn:
-        conn.execute("UPDATE minutas SET nombre = ? WHERE id = ?", (nombre, minuta_id))
-        conn.commit()
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE minutas SET nombre = ?, nombre_clave = ? WHERE id = ?", (nombre, minuta_key(nombre), minuta_id)
+        )
 
 
 def delete_minuta(minuta_id: int) -> None:
-    with get_connection() as conn:
+    with transaction() as conn:
         conn.execute("DELETE FROM minutas WHERE id = ?", (minuta_id,))
-        conn.commit()
 
 
 def list_minuta_items(minuta_id: int) -> list[sqlite3.Row]:
-    with get_connection() as conn:
-        return conn.execute(
-            """
-            SELECT
-                mi.id,
-                mi.gramos_1_2,
-                mi.gramos_3_5,
-                a.id AS alimento_id,
-                a.nombre AS alimento_nombre
-            FROM minuta_items mi
-            INNER JOIN alimentos a ON a.id = mi.alimento_id
-            WHERE mi.minuta_id = ?
-            ORDER BY a.nombre
-            """,
-            (minuta_id,),
-        ).fetchall()
+    conn = get_connection()
+    return conn.execute(
+        """
+        SELECT
+            mi.id,
+            mi.gramos_1_2,
+            mi.gramos_3_5,
+            a.id AS alimento_id,
+            a.nombre AS alimento_nombre
+        FROM minuta_items mi
+        INNER JOIN alimentos a ON a.id = mi.alimento_id
+        WHERE mi.minuta_id = ?
+        ORDER BY a.nombre
+        """,
+        (minuta_id,),
+    ).fetchall()
+
+
+def list_minuta_items_page(
+    minuta_id: int, limit: int = MINUTAS_PAGE_SIZE, after: tuple[str, int] | None = None
+) -> list[sqlite3.Row]:
+    """Una página de ítems de la minuta en el orden de ``list_minuta_items``.
+
+    ``after`` es ``(alimento_nombre, id)`` de la última fila de la página anterior
+    (``minuta_item_cursor``).
+    """
+    conn = get_connection()
+    where = "mi.minuta_id = ?"
+    params: list[Any] = [minuta_id]
+    if after is not None:
+        where += " AND (a.nombre, mi.id) > (?, ?)"
+        params.extend(after)
+    return conn.execute(
+        f"""
+        SELECT
+            mi.id,
+            mi.gramos_1_2,
+            mi.gramos_3_5,
+            a.id AS alimento_id,
+            a.nombre AS alimento_nombre
+        FROM minuta_items mi
+        INNER JOIN alimentos a ON a.id = mi.alimento_id
+        WHERE {where}
+        ORDER BY a.nombre, mi.id
+        LIMIT ?
+        """,
+        (*params, limit),
+    ).fetchall()
+
+
+def minuta_item_cursor(row: sqlite3.Row) -> tuple[str, int]:
+    return row["alimento_nombre"], row["id"]
 
 
 def _validate_gramos(gramos_1_2: float, gramos_3_5: float) -> None:
@@ -186,126 +443,326 @@ def _validate_optional_gramos(value: float | None) -> None:
 
 
 def add_or_update_item(minuta_id: int, alimento_id: int, gramos_1_2: float, gramos_3_5: float) -> None:
-    _validate_gramos(gramos_1_2, gramos_3_5)
-    with get_connection() as conn:
-        existing = conn.execute(
-            "SELECT id FROM minuta_items WHERE minuta_id = ? AND alimento_id = ?",
-            (minuta_id, alimento_id),
-        ).fetchone()
-        if existing:
-            conn.execute(
-                "UPDATE minuta_items SET gramos_1_2 = ?, gramos_3_5 = ? WHERE id = ?",
-                (gramos_1_2, gramos_3_5, existing["id"]),
-            )
-        else:
-            conn.execute(
-                """
-                INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5)
-                VALUES (?, ?, ?, ?)
-                """,
-                (minuta_id, alimento_id, gramos_1_2, gramos_3_5),
-            )
-        conn.commit()
+    bulk_upsert_items([(minuta_id, alimento_id, gramos_1_2, gramos_3_5)])
+
+
+def bulk_upsert_items(items: list[tuple[int, int, float, float]]) -> int:
+    """Inserta o actualiza filas ``(minuta_id, alimento_id, gramos_1_2, gramos_3_5)``.
+
+    Valida todas las filas antes de escribir y aplica el lote en una sola
+    transacción: si alguna es inválida no se guarda ninguna.
+    """
+    for _, _, gramos_1_2, gramos_3_5 in items:
+        _validate_gramos(gramos_1_2, gramos_3_5)
+    if not items:
+        return 0
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(minuta_id, alimento_id) DO UPDATE SET
+                gramos_1_2 = excluded.gramos_1_2,
+                gramos_3_5 = excluded.gramos_3_5
+            """,
+            items,
+        )
+    return len(items)
 
 
 def update_item_gramos(item_id: int, gramos_1_2: float, gramos_3_5: float) -> None:
     _validate_gramos(gramos_1_2, gramos_3_5)
-    with get_connection() as conn:
+    with transaction() as conn:
         conn.execute(
             "UPDATE minuta_items SET gramos_1_2 = ?, gramos_3_5 = ? WHERE id = ?",
             (gramos_1_2, gramos_3_5, item_id),
         )
-        conn.commit()
 
 
 def add_or_update_item_by_group(minuta_id: int, alimento_id: int, grupo: str, gramos: float) -> None:
+    bulk_upsert_items_by_group(minuta_id, grupo, [(alimento_id, gramos)])
+
+
+def bulk_upsert_items_by_group(minuta_id: int, grupo: str, items: list[tuple[int, float]]) -> int:
+    """Carga los gramos de un solo grupo etario para varias filas ``(alimento_id, gramos)``.
+
+    La columna del otro grupo se conserva en las filas existentes y queda en
+    NULL en las nuevas. Todo el lote se aplica en una transacción.
+    """
     if grupo not in {"g1", "g2"}:
         raise ValueError("Grupo inválido. Usa 'g1' o 'g2'.")
-    _validate_optional_gramos(gramos)
+    for _, gramos in items:
+        _validate_optional_gramos(gramos)
+    if not items:
+        return 0
     column = "gramos_1_2" if grupo == "g1" else "gramos_3_5"
 
-    with get_connection() as conn:
-        existing = conn.execute(
-            "SELECT id, gramos_1_2, gramos_3_5 FROM minuta_items WHERE minuta_id = ? AND alimento_id = ?",
-            (minuta_id, alimento_id),
-        ).fetchone()
-
-        if existing:
-            conn.execute(
-                f"UPDATE minuta_items SET {column} = ? WHERE id = ?",
-                (gramos, existing["id"]),
-            )
-        else:
-            gramos_1_2 = gramos if grupo == "g1" else None
-            gramos_3_5 = gramos if grupo == "g2" else None
-            conn.execute(
-                """
-                INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5)
-                VALUES (?, ?, ?, ?)
-                """,
-                (minuta_id, alimento_id, gramos_1_2, gramos_3_5),
-            )
-        conn.commit()
+    with transaction() as conn:
+        conn.executemany(
+            f"""
+            INSERT INTO minuta_items(minuta_id, alimento_id, {column})
+            VALUES (?, ?, ?)
+            ON CONFLICT(minuta_id, alimento_id) DO UPDATE SET {column} = excluded.{column}
+            """,
+            [(minuta_id, alimento_id, gramos) for alimento_id, gramos in items],
+        )
+    return len(items)
 
 
 def remove_item(item_id: int) -> None:
-    with get_connection() as conn:
+    with transaction() as conn:
         conn.execute("DELETE FROM minuta_items WHERE id = ?", (item_id,))
-        conn.commit()
 
 
 def list_jardin_minutas_semana(jardin_id: int) -> list[sqlite3.Row]:
-    with get_connection() as conn:
-        return conn.execute(
+    conn = get_connection()
+    return conn.execute(
+        """
+        SELECT jms.id, jms.orden, m.id AS minuta_id, m.nombre AS minuta_nombre, m.fecha_creacion
+        FROM jardin_minutas_semana jms
+        INNER JOIN minutas m ON m.id = jms.minuta_id
+        WHERE jms.jardin_id = ?
+        ORDER BY jms.orden ASC
+        """,
+        (jardin_id,),
+    ).fetchall()
+
+
+def add_minuta_a_semana(jardin_id: int, minuta_id: int) -> None:
+    """Agrega la minuta al final de la semana; si ya está, no hace nada."""
+    with transaction() as conn:
+        conn.execute(
             """
-            SELECT jms.id, jms.orden, m.id AS minuta_id, m.nombre AS minuta_nombre, m.fecha_creacion
-            FROM jardin_minutas_semana jms
-            INNER JOIN minutas m ON m.id = jms.minuta_id
-            WHERE jms.jardin_id = ?
-            ORDER BY jms.orden ASC
+            INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden)
+            SELECT ?, ?, COALESCE(MAX(orden), 0) + 1
+            FROM jardin_minutas_semana
+            WHERE jardin_id = ?
+            ON CONFLICT(jardin_id, minuta_id) DO NOTHING
             """,
-            (jardin_id,),
-        ).fetchall()
+            (jardin_id, minuta_id, jardin_id),
+        )
 
 
-def add_minuta_a_semana(jardin_id: int, minuta_id: int) -> None:
-    with get_connection() as conn:
-        existing = conn.execute(
-            "SELECT id FROM jardin_minutas_semana WHERE jardin_id = ? AND minuta_id = ?",
+# ``orden`` va de 1 a n sin huecos. Cada cambio de orden escribe primero las
+# posiciones nuevas en negativo y luego les da vuelta el signo: así ninguna fila
+# choca con UNIQUE (jardin_id, orden) a mitad de la sentencia, y mover, quitar o
+# reordenar cuesta las mismas sentencias sin importar el largo de la semana.
+
+
+def _settle_orden(conn: sqlite3.Connection, jardin_id: int) -> None:
+    conn.execute(
+        "UPDATE jardin_minutas_semana SET orden = -orden WHERE jardin_id = ? AND orden < 0",
+        (jardin_id,),
+    )
+
+
+def remove_minuta_de_semana(jardin_id: int, minuta_id: int) -> None:
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT orden FROM jardin_minutas_semana WHERE jardin_id = ? AND minuta_id = ?",
             (jardin_id, minuta_id),
         ).fetchone()
-        if existing:
+        if row is None:
             return
-        max_orden = conn.execute(
-            "SELECT COALESCE(MAX(orden), 0) FROM jardin_minutas_semana WHERE jardin_id = ?",
-            (jardin_id,),
-        ).fetchone()[0]
         conn.execute(
-            "INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden) VALUES (?, ?, ?)",
-            (jardin_id, minuta_id, int(max_orden) + 1),
+            "DELETE FROM jardin_minutas_semana WHERE jardin_id = ? AND minuta_id = ?",
+            (jardin_id, minuta_id),
+        )
+        conn.execute(
+            "UPDATE jardin_minutas_semana SET orden = -(orden - 1) WHERE jardin_id = ? AND orden > ?",
+            (jardin_id, row["orden"]),
         )
-        conn.commit()
+        _settle_orden(conn, jardin_id)
 
 
-def remove_minuta_de_semana(jardin_id: int, minuta_id: int) -> None:
-    with get_connection() as conn:
+def _move_in_semana(jardin_id: int, minuta_id: int, posicion: int | None, delta: int) -> int:
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT orden, (SELECT MAX(orden) FROM jardin_minutas_semana WHERE jardin_id = ?) AS total
+            FROM jardin_minutas_semana
+            WHERE jardin_id = ? AND minuta_id = ?
+            """,
+            (jardin_id, jardin_id, minuta_id),
+        ).fetchone()
+        if row is None:
+            raise ValueError("La minuta no está en la semana del jardín.")
+        actual = int(row["orden"])
+        destino = min(max(1, (actual if posicion is None else int(posicion)) + delta), int(row["total"]))
+        if destino == actual:
+            return actual
+        # Las minutas entre las dos posiciones se corren un lugar hacia la que quedó libre.
+        paso = -1 if destino > actual else 1
         conn.execute(
-            "DELETE FROM jardin_minutas_semana WHERE jardin_id = ? AND minuta_id = ?",
-            (jardin_id, minuta_id),
+            """
+            UPDATE jardin_minutas_semana
+            SET orden = -(CASE WHEN minuta_id = ? THEN ? ELSE orden + ? END)
+            WHERE jardin_id = ? AND orden BETWEEN ? AND ?
+            """,
+            (minuta_id, destino, paso, jardin_id, min(actual, destino), max(actual, destino)),
         )
-        remaining = conn.execute(
-            "SELECT id FROM jardin_minutas_semana WHERE jardin_id = ? ORDER BY orden",
-            (jardin_id,),
-        ).fetchall()
-        for idx, row in enumerate(remaining, start=1):
-            conn.execute("UPDATE jardin_minutas_semana SET orden = ? WHERE id = ?", (idx, row["id"]))
-        conn.commit()
+        _settle_orden(conn, jardin_id)
+        return destino
 
 
-def calculate_weekly_order(minuta_ids: list[int], ninos_grupo_1: int, ninos_grupo_2: int) -> list[dict[str, Any]]:
+def move_minuta_en_semana(jardin_id: int, minuta_id: int, posicion: int) -> int:
+    """Lleva la minuta a ``posicion`` (desde 1, acotada a la semana); devuelve la posición final."""
+    return _move_in_semana(jardin_id, minuta_id, posicion, 0)
+
+
+def shift_minuta_en_semana(jardin_id: int, minuta_id: int, delta: int) -> int:
+    """Corre la minuta ``delta`` lugares (-1 la sube, 1 la baja); devuelve la posición final."""
+    return _move_in_semana(jardin_id, minuta_id, None, delta)
+
+
+def reorder_semana(jardin_id: int, minuta_ids: list[int]) -> None:
+    """Deja la semana en el orden de ``minuta_ids``, que debe traer cada minuta una vez."""
+    ordered = [int(minuta_id) for minuta_id in minuta_ids]
+    with transaction() as conn:
+        actuales = {
+            row[0]
+            for row in conn.execute("SELECT minuta_id FROM jardin_minutas_semana WHERE jardin_id = ?", (jardin_id,))
+        }
+        if len(ordered) != len(actuales) or set(ordered) != actuales:
+            raise ValueError("El nuevo orden debe incluir cada minuta de la semana exactamente una vez.")
+        if not ordered:
+            return
+        values = ", ".join(["(?, ?)"] * len(ordered))
+        params = [value for orden, minuta_id in enumerate(ordered, start=1) for value in (minuta_id, orden)]
+        conn.execute(
+            f"""
+            WITH nuevo(minuta_id, orden) AS (
+                VALUES {values}
+            )
+            UPDATE jardin_minutas_semana
+            SET orden = -(SELECT nuevo.orden FROM nuevo WHERE nuevo.minuta_id = jardin_minutas_semana.minuta_id)
+            WHERE jardin_id = ?
+            """,
+            [*params, jardin_id],
+        )
+        _settle_orden(conn, jardin_id)
+
+
+def _values_rows(count: int, width: int = 1) -> str:
+    row = "(" + ", ".join(["?"] * width) + ")"
+    return ", ".join([row] * count)
+
+
+def assign_minutas_a_jardines(jardin_ids: Iterable[int], minuta_ids: Iterable[int]) -> int:
+    """Agrega las minutas, en ese orden, al final de la semana de cada jardín.
+
+    Las minutas que el jardín ya tiene se saltan y los ids que no existen se
+    ignoran. Es un solo ``INSERT ... SELECT`` para todos los jardines; devuelve
+    cuántas filas se agregaron.
+    """
+    jardines = list(dict.fromkeys(int(jardin_id) for jardin_id in jardin_ids))
+    minutas = list(dict.fromkeys(int(minuta_id) for minuta_id in minuta_ids))
+    if not jardines or not minutas:
+        return 0
+    params = [*jardines, *(value for posicion, minuta_id in enumerate(minutas) for value in (minuta_id, posicion))]
+    with transaction() as conn:
+        cursor = conn.execute(
+            f"""
+            INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden)
+            WITH
+                destino(jardin_id) AS (VALUES {_values_rows(len(jardines))}),
+                nueva(minuta_id, posicion) AS (VALUES {_values_rows(len(minutas), 2)})
+            SELECT
+                j.id,
+                m.id,
+                COALESCE((SELECT MAX(orden) FROM jardin_minutas_semana WHERE jardin_id = j.id), 0)
+                    + ROW_NUMBER() OVER (PARTITION BY j.id ORDER BY n.posicion)
+            FROM destino d
+            INNER JOIN jardines j ON j.id = d.jardin_id
+            CROSS JOIN nueva n
+            INNER JOIN minutas m ON m.id = n.minuta_id
+            WHERE NOT EXISTS (
+                SELECT 1 FROM jardin_minutas_semana
+                WHERE jardin_id = j.id AND minuta_id = m.id
+            )
+            """,
+            params,
+        )
+        return cursor.rowcount
+
+
+def copy_semana(origen_jardin_id: int, destino_jardin_ids: Iterable[int]) -> int:
+    """Reemplaza la semana de cada jardín destino por una copia de la del origen (mismo orden).
+
+    Borra las semanas destino y las vuelve a llenar con un solo ``INSERT ... SELECT``,
+    en una transacción; devuelve cuántas filas se copiaron. Si la semana del origen
+    está vacía, las semanas destino quedan vacías (es una copia, no una unión). El
+    origen nunca es destino de sí mismo y debe existir; si no, no se borra nada.
+    """
+    origen_jardin_id = int(origen_jardin_id)
+    destinos = [
+        jardin_id
+        for jardin_id in dict.fromkeys(int(jardin_id) for jardin_id in destino_jardin_ids)
+        if jardin_id != origen_jardin_id
+    ]
+    if not destinos:
+        return 0
+    placeholders = _values_rows(len(destinos))
+    with transaction() as conn:
+        if conn.execute("SELECT 1 FROM jardines WHERE id = ?", (origen_jardin_id,)).fetchone() is None:
+            raise ValueError("El jardín de origen no existe.")
+        conn.execute(
+            f"""
+            DELETE FROM jardin_minutas_semana
+            WHERE jardin_id IN ({", ".join(["?"] * len(destinos))})
+            """,
+            destinos,
+        )
+        cursor = conn.execute(
+            f"""
+            INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden)
+            WITH destino(jardin_id) AS (VALUES {placeholders})
+            SELECT j.id, s.minuta_id, s.orden
+            FROM destino d
+            INNER JOIN jardines j ON j.id = d.jardin_id
+            CROSS JOIN jardin_minutas_semana s
+            WHERE s.jardin_id = ?
+            """,
+            [*destinos, origen_jardin_id],
+        )
+        return cursor.rowcount
+
+
+def _validate_ninos(ninos_grupo_1: int, ninos_grupo_2: int) -> None:
     if ninos_grupo_1 < 0 or ninos_grupo_2 < 0:
         raise ValueError("La cantidad de niños por grupo debe ser mayor o igual a 0.")
 
+
+def _order_row(
+    row: sqlite3.Row,
+    ninos_grupo_1: int,
+    ninos_grupo_2: int,
+    tabla_unidades: dict[int, unidades.Unidad],
+) -> dict[str, Any]:
+    suma_g1 = float(row["suma_gramos_g1"] or 0)
+    suma_g2 = float(row["suma_gramos_g2"] or 0)
+    total_g1 = suma_g1 * ninos_grupo_1
+    total_g2 = suma_g2 * ninos_grupo_2
+    cantidad, unidad = unidades.convertir(total_g1 + total_g2, tabla_unidades.get(row["alimento_id"]))
+    return {
+        "alimento_id": row["alimento_id"],
+        "alimento_nombre": row["alimento_nombre"],
+        "suma_gramos_g1": suma_g1,
+        "ninos_grupo_1": ninos_grupo_1,
+        "total_g1": total_g1,
+        "suma_gramos_g2": suma_g2,
+        "ninos_grupo_2": ninos_grupo_2,
+        "total_g2": total_g2,
+        "total_general": total_g1 + total_g2,
+        "pedido_cantidad": cantidad,
+        "pedido_unidad": unidad,
+        "pedido_final": unidades.format_pedido(cantidad, unidad),
+    }
+
+
+def calculate_weekly_order(minuta_ids: list[int], ninos_grupo_1: int, ninos_grupo_2: int) -> list[dict[str, Any]]:
+    _validate_ninos(ninos_grupo_1, ninos_grupo_2)
+
     selected_minuta_ids = [int(minuta_id) for minuta_id in minuta_ids]
     if not selected_minuta_ids:
         return []
@@ -327,27 +784,129 @@ def calculate_weekly_order(minuta_ids: list[int], ninos_grupo_1: int, ninos_grup
         ORDER BY lower(a.nombre) ASC
     """
 
-    with get_connection() as conn:
-        rows = conn.execute(query, selected_minuta_ids).fetchall()
-
-    resumen: list[dict[str, Any]] = []
-    for row in rows:
-        suma_g1 = float(row["suma_gramos_g1"] or 0)
-        suma_g2 = float(row["suma_gramos_g2"] or 0)
-        total_g1 = suma_g1 * ninos_grupo_1
-        total_g2 = suma_g2 * ninos_grupo_2
-        resumen.append(
-            {
-                "alimento_id": row["alimento_id"],
-                "alimento_nombre": row["alimento_nombre"],
-                "suma_gramos_g1": suma_g1,
-                "ninos_grupo_1": ninos_grupo_1,
-                "total_g1": total_g1,
-                "suma_gramos_g2": suma_g2,
-                "ninos_grupo_2": ninos_grupo_2,
-                "total_g2": total_g2,
-                "total_general": total_g1 + total_g2,
-            }
-        )
+    conn = get_connection()
+    rows = conn.execute(query, selected_minuta_ids).fetchall()
+    tabla_unidades = unidades.load_unidades()
+    return [_order_row(row, ninos_grupo_1, ninos_grupo_2, tabla_unidades) for row in rows]
+
+
+def calculate_weekly_order_for_jardin(jardin_id: int, ninos_grupo_1: int, ninos_grupo_2: int) -> list[dict[str, Any]]:
+    """Pedido de la semana completa de un jardín, leído de ``jardin_semana_totales``."""
+    _validate_ninos(ninos_grupo_1, ninos_grupo_2)
+    return next(
+        (resumen for _, resumen in iter_weekly_orders({jardin_id: (ninos_grupo_1, ninos_grupo_2)}, [jardin_id])),
+        [],
+    )
+
+
+def iter_weekly_orders(
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None = None,
+    default_ninos: tuple[int, int] | None = None,
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """Calcula el pedido semanal de varios jardines con una sola consulta.
+
+    Lee los totales ya agregados de ``jardin_semana_totales`` y recorre el
+    cursor agrupando por jardín, entregando ``(jardin_id, resumen)`` de a uno
+    para que la memoria no crezca con la cantidad de jardines. Con
+    ``jardin_ids=None`` se incluyen todos los jardines con minutas en la
+    semana; los jardines sin alimentos no se entregan.
+
+    Cada jardín usa sus propios niños de ``ninos_por_jardin``; los que no
+    aparecen usan ``default_ninos`` y, sin él, son un error. Las validaciones
+    corren al llamar (no al primer ``next()``): un jardín pedido en
+    ``jardin_ids`` sin niños lanza ``ValueError`` de inmediato, y con
+    ``jardin_ids=None`` el error llega al encontrar ese jardín en el recorrido.
+    """
+    for ninos_grupo_1, ninos_grupo_2 in ninos_por_jardin.values():
+        _validate_ninos(ninos_grupo_1, ninos_grupo_2)
+    if default_ninos is not None:
+        _validate_ninos(*default_ninos)
+
+    params: list[int] | None = None
+    if jardin_ids is not None:
+        params = [int(jardin_id) for jardin_id in jardin_ids]
+        if default_ninos is None:
+            missing = [jardin_id for jardin_id in dict.fromkeys(params) if jardin_id not in ninos_por_jardin]
+            if missing:
+                raise ValueError(_missing_ninos_message(missing))
+    return _iter_weekly_orders(ninos_por_jardin, params, default_ninos)
+
+
+def _missing_ninos_message(jardin_ids: list[int]) -> str:
+    return f"Faltan los niños por grupo de los jardines: {', '.join(str(jardin_id) for jardin_id in jardin_ids)}."
+
+
+def _iter_weekly_orders(
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None,
+    default_ninos: tuple[int, int] | None,
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    params: list[int] = []
+    jardin_filter = ""
+    if jardin_ids is not None:
+        params = jardin_ids
+        if not params:
+            return
+        jardin_filter = f"WHERE t.jardin_id IN ({', '.join(['?'] * len(params))})"
+
+    query = f"""
+        SELECT
+            t.jardin_id,
+            a.id AS alimento_id,
+            a.nombre AS alimento_nombre,
+            t.suma_gramos_g1,
+            t.suma_gramos_g2
+        FROM jardin_semana_totales t
+        INNER JOIN alimentos a ON a.id = t.alimento_id
+        {jardin_filter}
+        ORDER BY t.jardin_id ASC, lower(a.nombre) ASC
+    """
+
+    tabla_unidades = unidades.load_unidades()
+    cursor = get_connection().execute(query, params)
+    for jardin_id, rows in groupby(cursor, key=lambda row: row["jardin_id"]):
+        ninos = ninos_por_jardin.get(jardin_id, default_ninos)
+        if ninos is None:
+            raise ValueError(_missing_ninos_message([jardin_id]))
+        yield jardin_id, [_order_row(row, ninos[0], ninos[1], tabla_unidades) for row in rows]
+
+
+def calculate_weekly_orders_bulk(
+    ninos_por_jardin: dict[int, tuple[int, int]],
+    jardin_ids: list[int] | None = None,
+    default_ninos: tuple[int, int] | None = None,
+) -> dict[int, list[dict[str, Any]]]:
+    return dict(iter_weekly_orders(ninos_por_jardin, jardin_ids, default_ninos))
+
+
+def check_weekly_totals() -> int:
+    """Cuenta las celdas de ``jardin_semana_totales`` que difieren de recalcularlas."""
+    conn = get_connection()
+    recalculated = """
+        SELECT jms.jardin_id, mi.alimento_id,
+               COALESCE(SUM(mi.gramos_1_2), 0) AS g1, COALESCE(SUM(mi.gramos_3_5), 0) AS g2
+        FROM jardin_minutas_semana jms
+        INNER JOIN minuta_items mi ON mi.minuta_id = jms.minuta_id
+        GROUP BY jms.jardin_id, mi.alimento_id
+    """
+    stored = "SELECT jardin_id, alimento_id, suma_gramos_g1, suma_gramos_g2 FROM jardin_semana_totales"
+    return int(
+        conn.execute(
+            f"""
+            SELECT COUNT(*) FROM (
+                SELECT * FROM ({recalculated} EXCEPT {stored})
+                UNION ALL
+                SELECT * FROM ({stored} EXCEPT {recalculated})
+            )
+            """
+        ).fetchone()[0]
+    )
+
 
-    return resumen
+def rebuild_weekly_totals() -> int:
+    """Reconstruye ``jardin_semana_totales`` desde cero; devuelve las celdas que estaban mal."""
+    mismatched = check_weekly_totals()
+    with transaction() as conn:
+        rebuild_jardin_semana_totales(conn)
+    return mismatched
@@ -1,8 +1,26 @@
+"""Catálogo inicial de alimentos y carga de catálogos semilla.
+
+Cada catálogo aplicado queda registrado en ``seed_metadata`` con su versión y un
+checksum de su contenido. En el arranque, ``seed_if_empty`` sólo lee esa fila:
+si coincide no hace nada más; si cambió, inserta lo que falte en un único lote.
+"""
 from __future__ import annotations
 
-from db import get_connection
+import csv
+import hashlib
+from collections.abc import Iterable
+from pathlib import Path
+
+from db import get_connection, transaction
 from models import normalize_food_name, normalize_name
 
+INITIAL_CATALOG = "inicial"
+# Subir al cambiar INITIAL_FOODS o INITIAL_UNITS; el checksum detecta además cambios sin subirla.
+# Versión 2: unidades de pedido por alimento. Antes eran nombres fijos en POUNDS_FOODS
+# (definido en ui_weekly_order.py y luego movido a unidades.py).
+SEED_VERSION = 2
+SEED_CSV_HEADER = "alimento"
+
 INITIAL_FOODS = [
     "Aceite, de soya",
     "Ahuyama",
@@ -96,23 +114,159 @@ INITIAL_FOODS = [
     "Zanahoria",
 ]
 
+# Alimentos del catálogo inicial que se piden en libras (500 g, redondeo a la libra
+# más cercana). Reemplaza la antigua lista por nombre, cuyas variantes ("Mango
+# PORCION", "Tomate chonto o río"...) no coincidían con el catálogo.
+POUND = ("lb", 500.0)
+INITIAL_UNITS: dict[str, tuple[str, float]] = {
+    name: POUND
+    for name in (
+        "Ahuyama",
+        "Apio",
+        "Arroz",
+        "Arveja verde",
+        "Azúcar, blanco",
+        "Banano bocadillo",
+        "Banano común",
+        "Carne de Cerdo, magra",
+        "Carne de res",
+        "Carne de res molida",
+        "Cebolla cabezona",
+        "Cebolla junca",
+        "Chocolate",
+        "Crema de leche",
+        "Durazno maduro, pulpa",
+        "Espinaca",
+        "Fresa",
+        "Frijol rojo",
+        "Guayaba",
+        "Habichuela",
+        "Harina de maíz blanco",
+        "Harina de trigo",
+        "Lechuga",
+        "Lenteja",
+        "Mandarina",
+        "Mango, maduro pulpa",
+        "Manzana, maduro pulpa",
+        "Mora",
+        "Naranja",
+        "Papa común",
+        "Papaya, maduro pulpa",
+        "Pechuga de pollo",
+        "Pepino Cohombro",
+        "Pepino común",
+        "Pera, maduro pulpa",
+        "Piña",
+        "Plátano hartón maduro",
+        "Plátano hartón verde",
+        "Queso doble crema",
+        "Remolacha",
+        "Repollo, hojas frescas",
+        "Sal",
+        "Tomate de árbol",
+        "Tomate, pulpa",
+        "Zanahoria",
+    )
+}
+
+
+def seed_checksum(names: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def seed_state(catalogo: str = INITIAL_CATALOG) -> tuple[int, str] | None:
+    """Versión y checksum registrados para ``catalogo``, o None si nunca se aplicó."""
+    row = get_connection().execute(
+        "SELECT version, checksum FROM seed_metadata WHERE catalogo = ?", (catalogo,)
+    ).fetchone()
+    return None if row is None else (int(row["version"]), row["checksum"])
+
+
+def initial_checksum() -> str:
+    units = (f"{name}={unidad}:{gramos}" for name, (unidad, gramos) in sorted(INITIAL_UNITS.items()))
+    return seed_checksum([*INITIAL_FOODS, *units])
+
+
+def _apply_seed(
+    catalogo: str,
+    version: int,
+    checksum: str,
+    names: Iterable[str],
+    units: dict[str, tuple[str, float]] | None = None,
+) -> int:
+    rows: dict[str, str] = {}
+    for name in names:
+        display_name = normalize_name(name)
+        normalized = normalize_food_name(display_name)
+        if display_name and normalized:
+            rows.setdefault(normalized, display_name)
+
+    # Los índices únicos sobre nombre y nombre_normalizado descartan lo que ya existe,
+    # así que el lote completo inserta sólo la diferencia.
+    with transaction() as conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO alimentos(nombre, nombre_normalizado) VALUES (?, ?)",
+            [(display_name, normalized) for normalized, display_name in rows.items()],
+        )
+        inserted = conn.total_changes - before
+        if units:
+            # Las unidades que el usuario ya configuró no se pisan.
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO alimento_unidades(alimento_id, unidad, gramos_por_unidad)
+                SELECT id, ?, ? FROM alimentos WHERE nombre_normalizado = ?
+                """,
+                [(unidad, gramos, normalize_food_name(name)) for name, (unidad, gramos) in units.items()],
+            )
+        conn.execute(
+            """
+            INSERT INTO seed_metadata(catalogo, version, checksum) VALUES (?, ?, ?)
+            ON CONFLICT(catalogo) DO UPDATE SET
+                version = excluded.version,
+                checksum = excluded.checksum,
+                aplicado_en = CURRENT_TIMESTAMP
+            """,
+            (catalogo, version, checksum),
+        )
+    return inserted
+
 
 def seed_if_empty() -> int:
-    with get_connection() as conn:
-        existing = conn.execute("SELECT nombre FROM alimentos").fetchall()
-        existing_normalized = {normalize_food_name(row["nombre"]) for row in existing}
-
-        inserted = 0
-        for name in INITIAL_FOODS:
-            display_name = normalize_name(name)
-            normalized = normalize_food_name(display_name)
-            if not display_name or not normalized or normalized in existing_normalized:
-                continue
-            conn.execute("INSERT OR IGNORE INTO alimentos(nombre) VALUES (?)", (display_name,))
-            existing_normalized.add(normalized)
-            inserted += 1
-        conn.commit()
-        return inserted
+    """Aplica ``INITIAL_FOODS`` (y sus unidades) si su versión o checksum no coinciden con lo registrado.
+
+    Devuelve la cantidad de alimentos insertados (0 si el catálogo ya estaba al día).
+    """
+    checksum = initial_checksum()
+    if seed_state(INITIAL_CATALOG) == (SEED_VERSION, checksum):
+        return 0
+    return _apply_seed(INITIAL_CATALOG, SEED_VERSION, checksum, INITIAL_FOODS, INITIAL_UNITS)
+
+
+def load_seed_csv(path: str | Path, catalogo: str | None = None, version: int = 1) -> int:
+    """Carga un catálogo semilla desde un CSV con la columna ``alimento``.
+
+    Se registra bajo ``catalogo`` (por defecto ``csv:<nombre del archivo>``); si la
+    versión y el checksum del archivo ya están aplicados no se vuelve a procesar.
+    """
+    path = Path(path)
+    catalogo = catalogo or f"csv:{path.name}"
+    data = path.read_bytes()
+    checksum = hashlib.sha256(data).hexdigest()
+    if seed_state(catalogo) == (version, checksum):
+        return 0
+
+    reader = csv.reader(data.decode("utf-8-sig").splitlines())
+    header = [normalize_food_name(value) for value in next(reader, [])]
+    if SEED_CSV_HEADER not in header:
+        raise ValueError(f"El CSV semilla no contiene la columna requerida: {SEED_CSV_HEADER}.")
+    column = header.index(SEED_CSV_HEADER)
+    names = (row[column] for row in reader if len(row) > column)
+    return _apply_seed(catalogo, version, checksum, names)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,8 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 
 import models
+from food_search import FoodHit, FoodSearchIndex
+from ui_food_search import IncrementalSearch
 
 
 class CatalogoWindow(tk.Toplevel):
@@ -24,7 +26,12 @@ class CatalogoWindow(tk.Toplevel):
 
         ttk.Button(frame, text="Agregar", command=self.add_alimento).pack(anchor="w")
 
-        ttk.Label(frame, text="Alimentos registrados:").pack(anchor="w", pady=(12, 4))
+        ttk.Label(frame, text="Buscar alimento:").pack(anchor="w", pady=(12, 4))
+        self.buscar_var = tk.StringVar()
+        buscar = ttk.Entry(frame, textvariable=self.buscar_var)
+        buscar.pack(fill="x")
+        self.resultado_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.resultado_var).pack(anchor="w", pady=(4, 4))
         self.listbox = tk.Listbox(frame)
         self.listbox.pack(fill="both", expand=True)
 
@@ -33,14 +40,18 @@ class CatalogoWindow(tk.Toplevel):
         ttk.Button(actions, text="Eliminar alimento", command=self.remove_alimento).pack(side="left")
 
         self._alimentos = []
+        self._search = IncrementalSearch(self, self.buscar_var.get, self._show_results)
+        buscar.bind("<KeyRelease>", self._search.schedule)
         self.refresh()
 
     def refresh(self) -> None:
-        self._alimentos = models.list_alimentos()
-        self.listbox.delete(0, tk.END)
-        for row in self._alimentos:
-            self.listbox.insert(tk.END, row["nombre"])
+        self._search.set_index(FoodSearchIndex.from_catalog())
 
+    def _show_results(self, hits: list[FoodHit]) -> None:
+        self._alimentos = hits
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *(hit.nombre for hit in hits))
+        self.resultado_var.set(f"Mostrando {len(hits)} de {len(self._search.index)} alimentos")
 
     def _selected_alimento(self):
         selected = self.listbox.curselection()
@@ -56,13 +67,13 @@ class CatalogoWindow(tk.Toplevel):
 
         if not messagebox.askyesno(
             "Confirmar",
-            f"¿Eliminar el alimento '{alimento['nombre']}'? También se quitará de todas las minutas.",
+            f"¿Eliminar el alimento '{alimento.nombre}'? También se quitará de todas las minutas.",
             parent=self,
         ):
             return
 
         try:
-            models.delete_alimento(alimento["id"])
+            models.delete_alimento(alimento.alimento_id)
             self.refresh()
             if self.on_change:
                 self.on_change()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+import diagnostics
+
+TOP_N = 50
+
+
+class DiagnosticosWindow(tk.Toplevel):
+    def __init__(self, master: tk.Misc):
+        super().__init__(master)
+        self.title("Diagnósticos")
+        self.geometry("980x560")
+
+        root = ttk.Frame(self, padding=12)
+        root.pack(fill="both", expand=True)
+
+        if diagnostics.is_installed():
+            estado = "Instrumentación activa. Se muestran las más lentas por p95 (ms)."
+        else:
+            estado = (
+                f"Instrumentación desactivada. Inicia la aplicación con {diagnostics.ENV_VAR}=1 "
+                "para medir consultas y funciones."
+            )
+        ttk.Label(root, text=estado, wraplength=900, justify="left").pack(anchor="w")
+
+        actions = ttk.Frame(root)
+        actions.pack(fill="x", pady=(8, 8))
+        ttk.Button(actions, text="Actualizar", command=self.refresh).pack(side="left")
+        ttk.Button(actions, text="Reiniciar contadores", command=self.reset).pack(side="left", padx=(8, 0))
+        ttk.Button(actions, text="Guardar en archivo", command=self.save).pack(side="left", padx=(8, 0))
+
+        notebook = ttk.Notebook(root)
+        notebook.pack(fill="both", expand=True)
+        self.queries_tree = self._build_tree(notebook, "Consulta SQL", 520)
+        self.functions_tree = self._build_tree(notebook, "Función", 320)
+        notebook.add(self.queries_tree.master, text="Consultas")
+        notebook.add(self.functions_tree.master, text="Funciones")
+
+        self.refresh()
+
+    def _build_tree(self, notebook: ttk.Notebook, label: str, width: int) -> ttk.Treeview:
+        frame = ttk.Frame(notebook)
+        columns = ("name", "count", "p50", "p95", "max", "total")
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        headings = {
+            "name": label,
+            "count": "Llamadas",
+            "p50": "p50 ms",
+            "p95": "p95 ms",
+            "max": "Máx. ms",
+            "total": "Total ms",
+        }
+        for column, text in headings.items():
+            tree.heading(column, text=text)
+            tree.column(column, width=90, anchor="e")
+        tree.column("name", width=width, anchor="w")
+
+        yscroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=yscroll.set)
+        tree.pack(side="left", fill="both", expand=True)
+        yscroll.pack(side="left", fill="y")
+        return tree
+
+    def _fill(self, tree: ttk.Treeview, rows: list[dict]) -> None:
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert(
+                "",
+                "end",
+                values=(
+                    row["name"],
+                    row["count"],
+                    f"{row['p50_ms']:.3f}",
+                    f"{row['p95_ms']:.3f}",
+                    f"{row['max_ms']:.3f}",
+                    f"{row['total_ms']:.1f}",
+                ),
+            )
+
+    def refresh(self) -> None:
+        data = diagnostics.report(limit=TOP_N)
+        self._fill(self.queries_tree, data["queries"])
+        self._fill(self.functions_tree, data["functions"])
+
+    def reset(self) -> None:
+        diagnostics.reset()
+        self.refresh()
+
+    def save(self) -> None:
+        file_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Guardar diagnósticos",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="diagnosticos.json",
+        )
+        if not file_path:
+            return
+        try:
+            diagnostics.dump(file_path)
+            messagebox.showinfo("Diagnósticos", f"Guardado en:\n{file_path}", parent=self)
+        except OSError:
+            messagebox.showerror("Error", "No fue posible guardar el archivo.", parent=self)
@@ -0,0 +1,57 @@
+"""Búsqueda mientras se escribe sobre el catálogo de alimentos.
+
+Cada tecla reprograma la búsqueda; sólo corre cuando el usuario deja de
+escribir ``DEBOUNCE_MS`` y devuelve como mucho ``limit`` resultados del
+``FoodSearchIndex`` en memoria.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from food_search import DEFAULT_LIMIT, FoodHit, FoodSearchIndex
+
+DEBOUNCE_MS = 120
+
+
+class IncrementalSearch:
+    """Une una fuente de texto, un índice y un callback con los resultados.
+
+    ``scheduler`` es cualquier objeto con ``after``/``after_cancel`` (el widget
+    dueño); ``get_query`` devuelve el texto actual.
+    """
+
+    def __init__(
+        self,
+        scheduler: Any,
+        get_query: Callable[[], str],
+        on_results: Callable[[list[FoodHit]], None],
+        index: FoodSearchIndex | None = None,
+        limit: int = DEFAULT_LIMIT,
+        delay_ms: int = DEBOUNCE_MS,
+    ):
+        self._scheduler = scheduler
+        self._get_query = get_query
+        self._on_results = on_results
+        self._limit = limit
+        self._delay_ms = delay_ms
+        self._pending: str | None = None
+        self.index = index or FoodSearchIndex(())
+
+    def schedule(self, _event: Any = None) -> None:
+        if self._pending is not None:
+            self._scheduler.after_cancel(self._pending)
+        self._pending = self._scheduler.after(self._delay_ms, self.run)
+
+    def run(self) -> list[FoodHit]:
+        if self._pending is not None:
+            self._scheduler.after_cancel(self._pending)
+            self._pending = None
+        hits = self.index.search(self._get_query(), self._limit)
+        self._on_results(hits)
+        return hits
+
+    def set_index(self, index: FoodSearchIndex) -> None:
+        """Reemplaza el índice (tras cambios en el catálogo) y vuelve a buscar."""
+        self.index = index
+        self.run()
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 import tkinter as tk
+from collections.abc import Callable
 from tkinter import messagebox, ttk
+from typing import Any
 
 import models
-from ui_catalogo import CatalogoWindow
-from ui_jardines import JardinesWindow
-from ui_minutas import MinutasWindow
-from ui_weekly_order import WeeklyOrderWindow
+from ui_minuta_picker import pick_minuta, pick_minutas
+from ui_tasks import BusyIndicator, TaskRunner
+
+# Las ventanas secundarias (y con ellas excel_minutas/excel_pedidos) se importan
+# al abrirlas por primera vez, para no pagar ese costo en el arranque.
 
 
 class MainWindow(ttk.Frame):
-    def __init__(self, master: tk.Tk):
+    """Pantalla principal.
+
+    Si se pasa ``prepare`` (p. ej. ``init_db`` + ``seed_if_empty``), la ventana se
+    dibuja de inmediato con los botones deshabilitados, ``prepare`` corre en
+    segundo plano y al terminar se cargan los jardines y se llama ``on_ready``.
+    """
+
+    def __init__(
+        self,
+        master: tk.Tk,
+        prepare: Callable[[], Any] | None = None,
+        on_ready: Callable[[], None] | None = None,
+    ):
         super().__init__(master, padding=12)
         self.master = master
         self.pack(fill="both", expand=True)
@@ -22,10 +37,17 @@ class MainWindow(ttk.Frame):
         top = ttk.Frame(self)
         top.pack(fill="x")
 
-        ttk.Button(top, text="Gestionar Jardines", command=self.open_jardines).pack(side="left")
-        ttk.Button(top, text="Gestionar Alimentos", command=self.open_catalogo).pack(side="left", padx=(8, 0))
-        ttk.Button(top, text="Gestionar Minutas", command=self.open_minutas).pack(side="left", padx=(8, 0))
-        ttk.Button(top, text="Pedido semanal", command=self.open_weekly_order).pack(side="left", padx=(8, 0))
+        buttons = [
+            ttk.Button(top, text="Gestionar Jardines", command=self.open_jardines),
+            ttk.Button(top, text="Gestionar Alimentos", command=self.open_catalogo),
+            ttk.Button(top, text="Gestionar Minutas", command=self.open_minutas),
+            ttk.Button(top, text="Pedido semanal", command=self.open_weekly_order),
+        ]
+        for index, button in enumerate(buttons):
+            button.pack(side="left", padx=(8 if index else 0, 0))
+        diagnosticos = ttk.Button(top, text="Diagnósticos", command=self.open_diagnosticos)
+        diagnosticos.pack(side="right")
+        buttons.append(diagnosticos)
 
         selection = ttk.LabelFrame(self, text="Jardín seleccionado", padding=8)
         selection.pack(fill="x", pady=(12, 8))
@@ -35,14 +57,30 @@ class MainWindow(ttk.Frame):
         self.jardin_combo.pack(side="left", fill="x", expand=True)
         self.jardin_combo.bind("<<ComboboxSelected>>", lambda _e: self.refresh_semana())
 
-        ttk.Button(selection, text="Actualizar", command=self.refresh_jardines).pack(side="left", padx=(8, 0))
+        actualizar = ttk.Button(selection, text="Actualizar", command=self.refresh_jardines)
+        actualizar.pack(side="left", padx=(8, 0))
 
         semana_actions = ttk.Frame(self)
         semana_actions.pack(fill="x", pady=(2, 8))
-        ttk.Button(semana_actions, text="Agregar minuta a la semana", command=self.agregar_minuta_semana).pack(side="left")
-        ttk.Button(semana_actions, text="Quitar minuta de la semana", command=self.quitar_minuta_semana).pack(
-            side="left", padx=(8, 0)
+        agregar = ttk.Button(semana_actions, text="Agregar minuta a la semana", command=self.agregar_minuta_semana)
+        agregar.pack(side="left")
+        quitar = ttk.Button(semana_actions, text="Quitar minuta de la semana", command=self.quitar_minuta_semana)
+        quitar.pack(side="left", padx=(8, 0))
+        bajar = ttk.Button(semana_actions, text="Bajar", command=lambda: self.mover_minuta_semana(1))
+        bajar.pack(side="right")
+        subir = ttk.Button(semana_actions, text="Subir", command=lambda: self.mover_minuta_semana(-1))
+        subir.pack(side="right", padx=(0, 8))
+        buttons.extend([actualizar, agregar, quitar, subir, bajar])
+
+        semana_bulk = ttk.Frame(self)
+        semana_bulk.pack(fill="x", pady=(0, 8))
+        asignar = ttk.Button(
+            semana_bulk, text="Asignar minutas a varios jardines…", command=self.asignar_minutas_a_jardines
         )
+        asignar.pack(side="left")
+        copiar = ttk.Button(semana_bulk, text="Copiar semana a otros jardines…", command=self.copiar_semana)
+        copiar.pack(side="left", padx=(8, 0))
+        buttons.extend([asignar, copiar])
 
         self.tree = ttk.Treeview(self, columns=("orden", "nombre", "fecha"), show="headings")
         self.tree.heading("orden", text="#")
@@ -55,20 +93,58 @@ class MainWindow(ttk.Frame):
 
         self._jardines = []
         self._semana = []
+        self._tasks = TaskRunner(self)
+        self._semana_request = 0
+        self._busy = BusyIndicator(master, self, buttons)
+        self._busy.frame.pack(fill="x", pady=(8, 0))
+
+        if prepare is None:
+            self.refresh_jardines()
+            if on_ready is not None:
+                on_ready()
+            return
+        self._busy.run(
+            self._tasks,
+            "Preparando base de datos…",
+            prepare,
+            on_success=lambda _result: self._prepared(on_ready),
+            on_error=self._prepare_failed,
+        )
+
+    def _prepared(self, on_ready: Callable[[], None] | None) -> None:
         self.refresh_jardines()
+        if on_ready is not None:
+            on_ready()
+
+    def _prepare_failed(self, exc: BaseException) -> None:
+        messagebox.showerror("Error", f"No fue posible inicializar la base de datos.\n{exc}", parent=self.master)
+        self.master.destroy()
 
     def open_jardines(self) -> None:
+        from ui_jardines import JardinesWindow
+
         JardinesWindow(self.master, on_change=self.refresh_jardines)
 
     def open_catalogo(self) -> None:
+        from ui_catalogo import CatalogoWindow
+
         CatalogoWindow(self.master, on_change=self.refresh_semana)
 
     def open_minutas(self) -> None:
+        from ui_minutas import MinutasWindow
+
         MinutasWindow(self.master, on_change=self.refresh_semana)
 
     def open_weekly_order(self) -> None:
+        from ui_weekly_order import WeeklyOrderWindow
+
         WeeklyOrderWindow(self.master)
 
+    def open_diagnosticos(self) -> None:
+        from ui_diagnosticos import DiagnosticosWindow
+
+        DiagnosticosWindow(self.master)
+
     def refresh_jardines(self) -> None:
         selected_name = self.jardin_var.get()
         self._jardines = models.list_jardines()
@@ -90,16 +166,30 @@ class MainWindow(ttk.Frame):
         name = self.jardin_var.get()
         return next((j for j in self._jardines if j["nombre"] == name), None)
 
-    def refresh_semana(self) -> None:
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+    def refresh_semana(self, select: int | None = None) -> None:
+        # Cada refresco invalida los anteriores que sigan en curso.
+        self._semana_request += 1
+        request = self._semana_request
 
         jardin = self._selected_jardin()
         if not jardin:
-            self._semana = []
+            self._fill_semana(request, [])
             return
+        self._tasks.submit(
+            models.list_jardin_minutas_semana,
+            jardin["id"],
+            on_success=lambda rows: self._fill_semana(request, rows, select),
+            on_error=lambda _exc: messagebox.showerror(
+                "Error", "No fue posible cargar las minutas de la semana.", parent=self.master
+            ),
+        )
 
-        self._semana = models.list_jardin_minutas_semana(jardin["id"])
+    def _fill_semana(self, request: int, rows: list, select: int | None = None) -> None:
+        if request != self._semana_request:
+            return
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        self._semana = rows
         for row in self._semana:
             self.tree.insert(
                 "",
@@ -107,6 +197,9 @@ class MainWindow(ttk.Frame):
                 iid=str(row["minuta_id"]),
                 values=(row["orden"], row["minuta_nombre"], row["fecha_creacion"]),
             )
+        if select is not None and self.tree.exists(str(select)):
+            self.tree.selection_set(str(select))
+            self.tree.see(str(select))
 
     def agregar_minuta_semana(self) -> None:
         jardin = self._selected_jardin()
@@ -114,18 +207,16 @@ class MainWindow(ttk.Frame):
             messagebox.showwarning("Atención", "Primero crea o selecciona un jardín.", parent=self.master)
             return
 
-        minutas = models.list_minutas()
-        if not minutas:
+        if not models.has_minutas():
             messagebox.showwarning("Atención", "No hay minutas creadas. Crea una primero.", parent=self.master)
             return
 
         already = {row["minuta_id"] for row in self._semana}
-        candidates = [m for m in minutas if m["id"] not in already]
-        if not candidates:
+        if not models.has_minutas(exclude=already):
             messagebox.showinfo("Información", "Este jardín ya tiene todas las minutas asignadas.", parent=self.master)
             return
 
-        selected = self._pick_minuta(candidates)
+        selected = pick_minuta(self.master, "Selecciona la minuta para el pedido semanal:", already)
         if not selected:
             return
         try:
@@ -134,56 +225,131 @@ class MainWindow(ttk.Frame):
         except Exception:
             messagebox.showerror("Error", "No fue posible agregar la minuta a la semana.", parent=self.master)
 
-    def _pick_minuta(self, minutas: list) -> dict | None:
+    def quitar_minuta_semana(self) -> None:
+        jardin = self._selected_jardin()
+        if not jardin:
+            messagebox.showwarning("Atención", "Selecciona un jardín.", parent=self.master)
+            return
+
+        selected = self.tree.selection()
+        if not selected:
+            messagebox.showwarning("Atención", "Selecciona una minuta de la semana.", parent=self.master)
+            return
+
+        minuta_id = int(selected[0])
+        if not messagebox.askyesno("Confirmar", "¿Quitar esta minuta del pedido semanal?", parent=self.master):
+            return
+
+        try:
+            models.remove_minuta_de_semana(jardin["id"], minuta_id)
+            self.refresh_semana()
+        except Exception:
+            messagebox.showerror("Error", "No fue posible quitar la minuta de la semana.", parent=self.master)
+
+    def mover_minuta_semana(self, delta: int) -> None:
+        jardin = self._selected_jardin()
+        selected = self.tree.selection()
+        if not jardin or not selected:
+            messagebox.showwarning("Atención", "Selecciona una minuta de la semana.", parent=self.master)
+            return
+
+        minuta_id = int(selected[0])
+        try:
+            models.shift_minuta_en_semana(jardin["id"], minuta_id, delta)
+            self.refresh_semana(select=minuta_id)
+        except Exception:
+            messagebox.showerror("Error", "No fue posible cambiar el orden de la semana.", parent=self.master)
+
+    def _pick_many(self, title: str, label: str, rows: list) -> list:
+        """Lista con selección múltiple; devuelve las filas elegidas (vacía si se cancela)."""
         picker = tk.Toplevel(self.master)
-        picker.title("Seleccionar minuta")
-        picker.geometry("420x360")
+        picker.title(title)
+        picker.geometry("420x420")
         picker.transient(self.master)
         picker.grab_set()
 
         frame = ttk.Frame(picker, padding=12)
         frame.pack(fill="both", expand=True)
-        ttk.Label(frame, text="Selecciona la minuta para el pedido semanal:").pack(anchor="w")
+        ttk.Label(frame, text=label).pack(anchor="w")
 
-        listbox = tk.Listbox(frame)
+        listbox = tk.Listbox(frame, selectmode="extended")
         listbox.pack(fill="both", expand=True, pady=(8, 8))
-        for m in minutas:
-            listbox.insert(tk.END, m["nombre"])
+        for row in rows:
+            listbox.insert(tk.END, row["nombre"])
 
-        chosen = {"row": None}
+        chosen: list = []
 
         def accept() -> None:
-            idx = listbox.curselection()
-            if not idx:
-                return
-            chosen["row"] = minutas[idx[0]]
+            chosen.extend(rows[index] for index in listbox.curselection())
             picker.destroy()
 
         buttons = ttk.Frame(frame)
         buttons.pack(fill="x")
+        ttk.Button(buttons, text="Todos", command=lambda: listbox.selection_set(0, tk.END)).pack(side="left")
         ttk.Button(buttons, text="Cancelar", command=picker.destroy).pack(side="right")
-        ttk.Button(buttons, text="Seleccionar", command=accept).pack(side="right", padx=(0, 8))
+        ttk.Button(buttons, text="Aceptar", command=accept).pack(side="right", padx=(0, 8))
 
         picker.wait_window()
-        return chosen["row"]
+        return chosen
 
-    def quitar_minuta_semana(self) -> None:
-        jardin = self._selected_jardin()
-        if not jardin:
-            messagebox.showwarning("Atención", "Selecciona un jardín.", parent=self.master)
+    def _semanas_actualizadas(self, mensaje: str) -> None:
+        messagebox.showinfo("Semanas actualizadas", mensaje, parent=self.master)
+        self.refresh_semana()
+
+    def asignar_minutas_a_jardines(self) -> None:
+        if not self._jardines or not models.has_minutas():
+            messagebox.showwarning("Atención", "Se necesitan minutas y jardines creados.", parent=self.master)
             return
 
-        selected = self.tree.selection()
-        if not selected:
-            messagebox.showwarning("Atención", "Selecciona una minuta de la semana.", parent=self.master)
+        elegidas = pick_minutas(
+            self.master,
+            "Minutas a agregar al final de cada semana, en el orden en que las elijas (Ctrl + clic para varias):",
+        )
+        if not elegidas:
+            return
+        jardines = self._pick_many("Seleccionar jardines", "Jardines que reciben las minutas:", self._jardines)
+        if not jardines:
             return
 
-        minuta_id = int(selected[0])
-        if not messagebox.askyesno("Confirmar", "¿Quitar esta minuta del pedido semanal?", parent=self.master):
+        self._busy.run(
+            self._tasks,
+            "Asignando minutas…",
+            models.assign_minutas_a_jardines,
+            [j["id"] for j in jardines],
+            [m["id"] for m in elegidas],
+            on_success=lambda count: self._semanas_actualizadas(f"Minutas agregadas a las semanas: {count}"),
+            on_error=lambda _exc: messagebox.showerror(
+                "Error", "No fue posible asignar las minutas.", parent=self.master
+            ),
+        )
+
+    def copiar_semana(self) -> None:
+        origen = self._selected_jardin()
+        if not origen:
+            messagebox.showwarning("Atención", "Selecciona el jardín cuya semana quieres copiar.", parent=self.master)
             return
 
-        try:
-            models.remove_minuta_de_semana(jardin["id"], minuta_id)
-            self.refresh_semana()
-        except Exception:
-            messagebox.showerror("Error", "No fue posible quitar la minuta de la semana.", parent=self.master)
+        otros = [j for j in self._jardines if j["id"] != origen["id"]]
+        destinos = self._pick_many(
+            "Copiar semana", f"Jardines que recibirán la semana de {origen['nombre']}:", otros
+        )
+        if not destinos:
+            return
+        if not messagebox.askyesno(
+            "Confirmar",
+            f"Se reemplazará la semana de {len(destinos)} jardín(es) por la de {origen['nombre']}. ¿Continuar?",
+            parent=self.master,
+        ):
+            return
+
+        self._busy.run(
+            self._tasks,
+            "Copiando semana…",
+            models.copy_semana,
+            origen["id"],
+            [j["id"] for j in destinos],
+            on_success=lambda _count: self._semanas_actualizadas(
+                f"Semana copiada a {len(destinos)} jardín(es)."
+            ),
+            on_error=lambda _exc: messagebox.showerror("Error", "No fue posible copiar la semana.", parent=self.master),
+        )
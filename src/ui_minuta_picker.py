@@ -0,0 +1,139 @@
+"""Selector de minutas por páginas.
+
+Igual que la ventana de minutas, pide ``models.MINUTAS_PAGE_SIZE`` filas a la
+vez con ``list_minutas_page`` y carga la siguiente página al llegar al final de
+la lista (o con "Cargar más"), en vez de leer la tabla completa al abrirse.
+Con ``multiple=True`` se eligen varias (Ctrl/Mayús + clic) y se devuelven en el
+orden en que se fueron marcando, no en el del listado.
+"""
+from __future__ import annotations
+
+import sqlite3
+import tkinter as tk
+from collections.abc import Iterable
+from tkinter import ttk
+
+import models
+
+
+def selection_order(previous: list[int], selected: Iterable[int]) -> list[int]:
+    """Índices seleccionados en el orden en que se marcaron.
+
+    Conserva el orden de ``previous`` para los que siguen seleccionados y agrega
+    al final los nuevos; los de un rango con Mayús entran en el orden del listado.
+    """
+    current = set(selected)
+    order = [index for index in previous if index in current]
+    order.extend(sorted(current.difference(order)))
+    return order
+
+
+class MinutaPicker(tk.Toplevel):
+    """Diálogo modal; al cerrarse ``chosen`` tiene la minuta elegida o ``None``.
+
+    Con ``multiple=True`` las elegidas quedan en ``chosen_many``, en orden de selección.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        label: str,
+        exclude: Iterable[int] = (),
+        title: str = "Seleccionar minuta",
+        multiple: bool = False,
+    ):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("420x420" if multiple else "420x360")
+        self.transient(master)
+        self.grab_set()
+
+        self.chosen: sqlite3.Row | None = None
+        self.chosen_many: list[sqlite3.Row] = []
+        self._multiple = multiple
+        # Índices de ``_rows`` en el orden en que se marcaron.
+        self._order: list[int] = []
+        self._exclude = set(exclude)
+        self._rows: list[sqlite3.Row] = []
+        self._cursor: tuple[str, int] | None = None
+        self._has_more = True
+        self._load_pending = False
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        ttk.Label(frame, text=label).pack(anchor="w")
+
+        table = ttk.Frame(frame)
+        table.pack(fill="both", expand=True, pady=(8, 8))
+        self.listbox = tk.Listbox(table, selectmode="extended" if multiple else "browse")
+        scrollbar = ttk.Scrollbar(table, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="left", fill="y")
+        if multiple:
+            self.order_var = tk.StringVar()
+            self.listbox.bind("<<ListboxSelect>>", self._track_order)
+            ttk.Label(frame, textvariable=self.order_var, wraplength=390).pack(anchor="w", pady=(0, 8))
+        else:
+            self.listbox.bind("<Double-1>", lambda _e: self.accept())
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill="x")
+        self.more_button = ttk.Button(buttons, text="Cargar más", command=self.cargar_mas)
+        self.more_button.pack(side="left")
+        ttk.Button(buttons, text="Cancelar", command=self.destroy).pack(side="right")
+        ttk.Button(buttons, text="Seleccionar", command=self.accept).pack(side="right", padx=(0, 8))
+
+        self.cargar_mas()
+
+    def cargar_mas(self) -> None:
+        self._load_pending = False
+        shown = len(self._rows)
+        # Las minutas excluidas no se muestran: se piden páginas hasta que aparezca alguna nueva.
+        while self._has_more and len(self._rows) == shown:
+            rows = models.list_minutas_page(models.MINUTAS_PAGE_SIZE, self._cursor)
+            if rows:
+                self._cursor = models.minuta_cursor(rows[-1])
+            self._has_more = len(rows) == models.MINUTAS_PAGE_SIZE
+            for row in rows:
+                if row["id"] not in self._exclude:
+                    self._rows.append(row)
+                    self.listbox.insert(tk.END, row["nombre"])
+        self.more_button.configure(state="normal" if self._has_more else "disabled")
+
+    def _on_scroll(self, scrollbar: ttk.Scrollbar, first: str, last: str) -> None:
+        scrollbar.set(first, last)
+        if self._has_more and not self._load_pending and float(last) >= 1.0 and self._rows:
+            self._load_pending = True
+            self.after_idle(self.cargar_mas)
+
+    def _track_order(self, _event: tk.Event | None = None) -> None:
+        self._order = selection_order(self._order, self.listbox.curselection())
+        nombres = [f"{pos}. {self._rows[index]['nombre']}" for pos, index in enumerate(self._order, start=1)]
+        self.order_var.set("Orden: " + ", ".join(nombres) if nombres else "")
+
+    def accept(self) -> None:
+        if self._multiple:
+            if not self._order:
+                return
+            self.chosen_many = [self._rows[index] for index in self._order]
+            self.destroy()
+            return
+        idx = self.listbox.curselection()
+        if not idx:
+            return
+        self.chosen = self._rows[idx[0]]
+        self.destroy()
+
+
+def pick_minuta(master: tk.Misc, label: str, exclude: Iterable[int] = ()) -> sqlite3.Row | None:
+    picker = MinutaPicker(master, label, exclude)
+    picker.wait_window()
+    return picker.chosen
+
+
+def pick_minutas(master: tk.Misc, label: str, title: str = "Seleccionar minutas") -> list[sqlite3.Row]:
+    """Varias minutas en el orden en que se eligieron (vacía si se cancela)."""
+    picker = MinutaPicker(master, label, title=title, multiple=True)
+    picker.wait_window()
+    return picker.chosen_many
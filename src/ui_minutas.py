@@ -5,6 +5,11 @@ from tkinter import filedialog, messagebox, simpledialog, ttk
 
 import excel_minutas
 import models
+from food_search import FoodHit, FoodSearchIndex
+from fuzzy_match import FoodMatch, FoodMatcher
+from ui_food_search import IncrementalSearch
+from ui_tasks import BusyIndicator, ProgressState, TaskRunner
+from ui_virtual_table import VirtualTable
 
 
 class MinutaEditorWindow(tk.Toplevel):
@@ -14,8 +19,7 @@ class MinutaEditorWindow(tk.Toplevel):
         self.title("Editor de minuta")
         self.geometry("760x520")
 
-        self._alimentos = models.list_alimentos()
-        self._items = []
+        self._items: dict[int, dict] = {}
 
         root = ttk.Frame(self, padding=12)
         root.pack(fill="both", expand=True)
@@ -36,13 +40,11 @@ class MinutaEditorWindow(tk.Toplevel):
 
         ttk.Label(add_frame, text="Alimento:").grid(row=0, column=0, sticky="w")
         self.alimento_var = tk.StringVar()
-        self.combo = ttk.Combobox(
-            add_frame,
-            textvariable=self.alimento_var,
-            values=[a["nombre"] for a in self._alimentos],
-            width=30,
-        )
+        self.combo = ttk.Combobox(add_frame, textvariable=self.alimento_var, width=30)
         self.combo.grid(row=0, column=1, sticky="we", padx=(6, 8))
+        # La lista desplegable muestra sólo los resultados de lo que se va escribiendo.
+        self._search = IncrementalSearch(self, self.alimento_var.get, self._show_food_results)
+        self.combo.bind("<KeyRelease>", self._on_food_key)
         ttk.Button(add_frame, text="Nuevo alimento", command=self.add_new_alimento).grid(row=0, column=2)
 
         ttk.Label(add_frame, text="Gramos 1-2 años:").grid(row=0, column=3, sticky="w")
@@ -56,14 +58,17 @@ class MinutaEditorWindow(tk.Toplevel):
         ttk.Button(add_frame, text="Agregar/Actualizar", command=self.add_item).grid(row=0, column=7)
         add_frame.grid_columnconfigure(1, weight=1)
 
-        self.tree = ttk.Treeview(root, columns=("alimento", "g12", "g35"), show="headings", height=12)
-        self.tree.heading("alimento", text="Alimento")
-        self.tree.heading("g12", text="Gramos 1-2")
-        self.tree.heading("g35", text="Gramos 3-5")
-        self.tree.column("alimento", width=390)
-        self.tree.column("g12", width=120, anchor="e")
-        self.tree.column("g35", width=120, anchor="e")
-        self.tree.pack(fill="both", expand=True)
+        self.table = VirtualTable(
+            root,
+            columns=[
+                ("alimento", "Alimento", 390, "w"),
+                ("g12", "Gramos 1-2", 120, "e"),
+                ("g35", "Gramos 3-5", 120, "e"),
+            ],
+            height=12,
+            on_activate=lambda _key: self.edit_gramos(),
+        )
+        self.table.pack(fill="both", expand=True)
 
         actions = ttk.Frame(root)
         actions.pack(fill="x", pady=(8, 0))
@@ -71,8 +76,20 @@ class MinutaEditorWindow(tk.Toplevel):
         ttk.Button(actions, text="Quitar alimento", command=self.remove_item).pack(side="left", padx=(8, 0))
         ttk.Button(actions, text="Eliminar del catálogo", command=self.remove_alimento_catalogo).pack(side="left", padx=(8, 0))
 
+        self.refresh_catalog()
         self.refresh_items()
 
+    def refresh_catalog(self) -> None:
+        self._search.set_index(FoodSearchIndex.from_catalog())
+
+    def _show_food_results(self, hits: list[FoodHit]) -> None:
+        self.combo["values"] = [hit.nombre for hit in hits]
+
+    def _on_food_key(self, event: tk.Event) -> None:
+        # Las flechas y Enter navegan la lista; no deben relanzar la búsqueda.
+        if event.keysym not in ("Up", "Down", "Return", "Escape", "Tab"):
+            self._search.schedule()
+
     def _parse_gramos(self, raw: str) -> float:
         value = float(str(raw).replace(",", "."))
         if value <= 0:
@@ -111,32 +128,29 @@ class MinutaEditorWindow(tk.Toplevel):
             messagebox.showerror("Error", "No fue posible eliminar la minuta.", parent=self)
 
     def refresh_items(self) -> None:
-        self._alimentos = models.list_alimentos()
-        self.combo["values"] = [a["nombre"] for a in self._alimentos]
-
-        self._items = models.list_minuta_items(self.minuta_id)
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for row in self._items:
-            g1 = "" if row["gramos_1_2"] is None else row["gramos_1_2"]
-            g2 = "" if row["gramos_3_5"] is None else row["gramos_3_5"]
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(row["id"]),
-                values=(row["alimento_nombre"], g1, g2),
+        self._items = {row["id"]: row for row in models.list_minuta_items(self.minuta_id)}
+        # Sólo cambian en la tabla las filas que difieren de lo que ya muestra.
+        self.table.set_rows(
+            (
+                item_id,
+                (
+                    row["alimento_nombre"],
+                    "" if row["gramos_1_2"] is None else row["gramos_1_2"],
+                    "" if row["gramos_3_5"] is None else row["gramos_3_5"],
+                ),
             )
+            for item_id, row in self._items.items()
+        )
 
     def add_item(self) -> None:
-        selected_name = models.normalize_name(self.alimento_var.get())
-        alimento = next((a for a in self._alimentos if a["nombre"].lower() == selected_name.lower()), None)
+        alimento = self._search.index.find_exact(self.alimento_var.get())
         if not alimento:
             messagebox.showerror("Validación", "Selecciona un alimento válido del catálogo.", parent=self)
             return
         try:
             gramos_1_2 = self._parse_gramos(self.gramos_1_2_var.get())
             gramos_3_5 = self._parse_gramos(self.gramos_3_5_var.get())
-            models.add_or_update_item(self.minuta_id, alimento["id"], gramos_1_2, gramos_3_5)
+            models.add_or_update_item(self.minuta_id, alimento.alimento_id, gramos_1_2, gramos_3_5)
             self.gramos_1_2_var.set("")
             self.gramos_3_5_var.set("")
             self.refresh_items()
@@ -155,8 +169,8 @@ class MinutaEditorWindow(tk.Toplevel):
             return
         try:
             models.create_alimento(nombre)
-            self.refresh_items()
             self.alimento_var.set(models.normalize_name(nombre))
+            self.refresh_catalog()
             self.combo.focus_set()
         except ValueError as exc:
             messagebox.showerror("Validación", str(exc), parent=self)
@@ -164,12 +178,11 @@ class MinutaEditorWindow(tk.Toplevel):
             messagebox.showerror("Error", "No fue posible crear el alimento.", parent=self)
 
     def _selected_item(self):
-        selected = self.tree.selection()
-        if not selected:
+        item_id = self.table.selected_key()
+        if item_id is None:
             messagebox.showwarning("Atención", "Selecciona un alimento.", parent=self)
             return None
-        item_id = int(selected[0])
-        return next((x for x in self._items if x["id"] == item_id), None)
+        return self._items.get(item_id)
 
     def edit_gramos(self) -> None:
         item = self._selected_item()
@@ -222,6 +235,7 @@ class MinutaEditorWindow(tk.Toplevel):
 
         try:
             models.delete_alimento(item["alimento_id"])
+            self.refresh_catalog()
             self.refresh_items()
         except Exception:
             messagebox.showerror("Error", "No fue posible eliminar el alimento del catálogo.", parent=self)
@@ -243,6 +257,13 @@ class MinutaEditorWindow(tk.Toplevel):
             messagebox.showerror("Error", "No fue posible quitar el alimento.", parent=self)
 
 
+def _sugerir_alimentos(unknown_foods: list[str]) -> tuple[list[str], dict[str, FoodMatch | None]]:
+    """Nombres del catálogo y mejor coincidencia de cada alimento no detectado (corre en segundo plano)."""
+    rows = models.list_alimentos()
+    matcher = FoodMatcher(((row["id"], row["nombre"]) for row in rows), (row["nombre_normalizado"] for row in rows))
+    return [row["nombre"] for row in rows], {unknown: matcher.best_match(unknown) for unknown in unknown_foods}
+
+
 class MinutasWindow(tk.Toplevel):
     def __init__(self, master: tk.Misc, on_change=None):
         super().__init__(master)
@@ -255,41 +276,80 @@ class MinutasWindow(tk.Toplevel):
 
         top = ttk.Frame(root)
         top.pack(fill="x", pady=(0, 8))
-        ttk.Button(top, text="Nueva minuta", command=self.nueva_minuta).pack(side="left")
-        ttk.Button(top, text="Abrir minuta", command=self.abrir_minuta).pack(side="left", padx=(8, 0))
-        ttk.Button(top, text="Eliminar minuta", command=self.eliminar_minuta).pack(side="left", padx=(8, 0))
-        ttk.Button(top, text="Plantilla grupo", command=self.descargar_plantilla_grupo).pack(side="left", padx=(8, 0))
-        ttk.Button(top, text="Importar pequeños", command=lambda: self.importar_excel_por_grupo("g1")).pack(
-            side="left", padx=(8, 0)
-        )
-        ttk.Button(top, text="Importar grandes", command=lambda: self.importar_excel_por_grupo("g2")).pack(
-            side="left", padx=(8, 0)
-        )
+        buttons = [
+            ttk.Button(top, text="Nueva minuta", command=self.nueva_minuta),
+            ttk.Button(top, text="Abrir minuta", command=self.abrir_minuta),
+            ttk.Button(top, text="Eliminar minuta", command=self.eliminar_minuta),
+            ttk.Button(top, text="Plantilla grupo", command=self.descargar_plantilla_grupo),
+            ttk.Button(top, text="Importar pequeños", command=lambda: self.importar_excel_por_grupo("g1")),
+            ttk.Button(top, text="Importar grandes", command=lambda: self.importar_excel_por_grupo("g2")),
+            ttk.Button(top, text="Importar alias", command=self.importar_alias_csv),
+        ]
+        for idx, button in enumerate(buttons):
+            button.pack(side="left", padx=(0 if idx == 0 else 8, 0))
 
         self.counter_var = tk.StringVar()
         ttk.Label(top, textvariable=self.counter_var).pack(side="right")
 
-        self.tree = ttk.Treeview(root, columns=("nombre", "fecha"), show="headings")
+        table = ttk.Frame(root)
+        table.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(table, columns=("nombre", "fecha"), show="headings")
         self.tree.heading("nombre", text="Minuta")
         self.tree.heading("fecha", text="Fecha creación")
         self.tree.column("nombre", width=420)
         self.tree.column("fecha", width=180)
-        self.tree.pack(fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self._on_tree_scroll(scrollbar, first, last))
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="left", fill="y")
         self.tree.bind("<Double-1>", lambda _e: self.abrir_minuta())
 
-        self._minutas = []
+        self.more_button = ttk.Button(root, text="Cargar más", command=self.cargar_mas)
+        self.more_button.pack(anchor="e", pady=(6, 0))
+
+        self._tasks = TaskRunner(self)
+        self._busy = BusyIndicator(self, root, buttons)
+        self._busy.frame.pack(fill="x", pady=(8, 0))
+
+        # Las minutas se cargan por páginas: la primera al abrir y las siguientes
+        # al llegar al final de la lista (o con "Cargar más").
+        self._cursor: tuple[str, int] | None = None
+        self._has_more = False
+        self._load_pending = False
         self.refresh()
 
     def refresh(self) -> None:
-        self._minutas = models.list_minutas()
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for row in self._minutas:
-            self.tree.insert("", "end", iid=str(row["id"]), values=(row["nombre"], row["fecha_creacion"]))
-        self.counter_var.set(f"Minutas: {len(self._minutas)}/{models.MAX_MINUTAS}")
+        self.tree.delete(*self.tree.get_children())
+        self._cursor = None
+        self._has_more = True
+        self.cargar_mas()
         if self.on_change:
             self.on_change()
 
+    def cargar_mas(self) -> None:
+        self._load_pending = False
+        if not self._has_more:
+            return
+        rows = models.list_minutas_page(models.MINUTAS_PAGE_SIZE, self._cursor)
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row["id"]), values=(row["nombre"], row["fecha_creacion"]))
+        if rows:
+            self._cursor = models.minuta_cursor(rows[-1])
+        self._has_more = len(rows) == models.MINUTAS_PAGE_SIZE
+        self._update_counter()
+
+    def _on_tree_scroll(self, scrollbar: ttk.Scrollbar, first: str, last: str) -> None:
+        scrollbar.set(first, last)
+        if self._has_more and not self._load_pending and float(last) >= 1.0 and self.tree.get_children():
+            self._load_pending = True
+            self.after_idle(self.cargar_mas)
+
+    def _update_counter(self) -> None:
+        shown = len(self.tree.get_children())
+        # Sin COUNT(*): el total sólo se conoce al cargar la última página.
+        self.counter_var.set(f"Minutas: {shown} (hay más)" if self._has_more else f"Minutas: {shown}")
+        self.more_button.configure(state="normal" if self._has_more else "disabled")
+
     def nueva_minuta(self) -> None:
         nombre = simpledialog.askstring("Nueva minuta", "Nombre de la minuta:", parent=self)
         if nombre is None:
@@ -324,10 +384,23 @@ class MinutasWindow(tk.Toplevel):
             return
         try:
             models.delete_minuta(minuta_id)
-            self.refresh()
+            self.tree.delete(str(minuta_id))
+            self._update_counter()
+            if self.on_change:
+                self.on_change()
         except Exception:
             messagebox.showerror("Error", "No fue posible eliminar la minuta.", parent=self)
 
+    def _mostrar_error(self, exc: BaseException, mensaje: str) -> None:
+        if isinstance(exc, excel_minutas.ImportCancelled):
+            messagebox.showinfo("Importación cancelada", "No se guardó ningún cambio.", parent=self)
+        elif isinstance(exc, RuntimeError):
+            messagebox.showerror("Dependencia faltante", str(exc), parent=self)
+        elif isinstance(exc, ValueError):
+            messagebox.showerror("Validación", str(exc), parent=self)
+        else:
+            messagebox.showerror("Error", mensaje, parent=self)
+
     def descargar_plantilla_grupo(self) -> None:
         file_path = filedialog.asksaveasfilename(
             parent=self,
@@ -338,17 +411,37 @@ class MinutasWindow(tk.Toplevel):
         )
         if not file_path:
             return
-        try:
-            excel_minutas.export_group_template(file_path)
-            messagebox.showinfo("Plantilla creada", f"Plantilla guardada en:\n{file_path}", parent=self)
-        except RuntimeError as exc:
-            messagebox.showerror("Dependencia faltante", str(exc), parent=self)
-        except Exception:
-            messagebox.showerror("Error", "No fue posible generar la plantilla Excel.", parent=self)
+        self._busy.run(
+            self._tasks,
+            "Generando plantilla…",
+            excel_minutas.export_group_template,
+            file_path,
+            on_success=lambda _path: messagebox.showinfo(
+                "Plantilla creada", f"Plantilla guardada en:\n{file_path}", parent=self
+            ),
+            on_error=lambda exc: self._mostrar_error(exc, "No fue posible generar la plantilla Excel."),
+        )
 
-    def _resolver_alimentos_no_detectados(self, unknown_foods: list[str]) -> dict[str, str]:
-        alimentos = models.list_alimentos()
-        nombres = [a["nombre"] for a in alimentos]
+    def importar_alias_csv(self) -> None:
+        file_path = filedialog.askopenfilename(
+            parent=self,
+            title="Seleccionar CSV de alias",
+            filetypes=[("CSV", "*.csv")],
+        )
+        if not file_path:
+            return
+        self._busy.run(
+            self._tasks,
+            "Importando alias…",
+            excel_minutas.import_aliases_csv,
+            file_path,
+            on_success=lambda count: messagebox.showinfo("Alias importados", f"Alias guardados: {count}", parent=self),
+            on_error=lambda exc: self._mostrar_error(exc, "No fue posible importar los alias."),
+        )
+
+    def _resolver_alimentos_no_detectados(
+        self, unknown_foods: list[str], nombres: list[str], sugerencias: dict[str, FoodMatch | None]
+    ) -> dict[str, str]:
 
         dialog = tk.Toplevel(self)
         dialog.title("Relacionar alimentos no detectados")
@@ -362,7 +455,8 @@ class MinutasWindow(tk.Toplevel):
             root,
             text=(
                 "No se detectaron algunos alimentos. "
-                "Selecciona el alimento equivalente del catálogo o deja vacío para omitirlo."
+                "Selecciona el alimento equivalente del catálogo o deja vacío para omitirlo. "
+                "Las coincidencias más probables vienen preseleccionadas."
             ),
             wraplength=720,
         ).pack(anchor="w")
@@ -373,7 +467,8 @@ class MinutasWindow(tk.Toplevel):
         variables: dict[str, tk.StringVar] = {}
         for row_idx, unknown in enumerate(unknown_foods):
             ttk.Label(container, text=unknown).grid(row=row_idx, column=0, sticky="w", pady=2)
-            var = tk.StringVar(value="")
+            best = sugerencias.get(unknown)
+            var = tk.StringVar(value=best.nombre if best else "")
             ttk.Combobox(container, textvariable=var, values=nombres, state="readonly", width=50).grid(
                 row=row_idx,
                 column=1,
@@ -381,6 +476,8 @@ class MinutasWindow(tk.Toplevel):
                 padx=(8, 0),
                 pady=2,
             )
+            if best:
+                ttk.Label(container, text=f"{best.score:.0%}").grid(row=row_idx, column=2, sticky="e", padx=(8, 0))
             variables[unknown] = var
 
         container.grid_columnconfigure(1, weight=1)
@@ -412,38 +509,70 @@ class MinutasWindow(tk.Toplevel):
             return
 
         grupo_label = "niños pequeños (1-2 años)" if grupo == "g1" else "niños grandes (3-5 años)"
+        progress = ProgressState()
+        token = excel_minutas.CancelToken()
+        self._busy.run(
+            self._tasks,
+            "Leyendo archivo…",
+            excel_minutas.stage_minuta_group,
+            file_path,
+            grupo=grupo,
+            progress=progress,
+            cancel=token,
+            progress_state=progress,
+            on_cancel=token.cancel,
+            on_success=lambda staged: self._aplicar_grupo(staged, minuta_id, grupo_label),
+            on_error=lambda exc: self._mostrar_error(exc, "No fue posible importar el archivo Excel."),
+        )
 
-        try:
-            summary = excel_minutas.import_minuta_group(file_path, minuta_id=minuta_id, grupo=grupo)
-            if summary.unknown_foods:
-                mapping = self._resolver_alimentos_no_detectados(summary.unknown_foods)
-                if mapping:
-                    summary = excel_minutas.import_minuta_group(
-                        file_path,
-                        minuta_id=minuta_id,
-                        grupo=grupo,
-                        food_mapping=mapping,
-                    )
+    def _aplicar_grupo(self, staged: excel_minutas.StagedGroupImport, minuta_id: int, grupo_label: str) -> None:
+        unknown_foods = staged.unknown_foods()
+        if not unknown_foods:
+            self._guardar_grupo(staged, minuta_id, grupo_label, {})
+            return
 
-            self.refresh()
-            message = (
-                f"Grupo importado: {grupo_label}\n\n"
-                f"Filas leídas no vacías: {summary.rows_processed}\n"
-                f"Filas importadas: {summary.rows_imported}\n"
-                f"Alimentos detectados: {summary.foods_detected}\n"
-                f"Alimentos cargados/actualizados: {summary.rows_imported}"
+        def resolver(sugeridas: tuple[list[str], dict[str, FoodMatch | None]]) -> None:
+            mapping = self._resolver_alimentos_no_detectados(unknown_foods, *sugeridas)
+            self._guardar_grupo(staged, minuta_id, grupo_label, mapping)
+
+        # El índice de trigramas se arma fuera del hilo de Tk: con catálogos grandes tarda.
+        self._busy.run(
+            self._tasks,
+            "Buscando coincidencias…",
+            _sugerir_alimentos,
+            unknown_foods,
+            on_success=resolver,
+            on_error=lambda exc: self._mostrar_error(exc, "No fue posible leer el catálogo de alimentos."),
+        )
+
+    def _guardar_grupo(
+        self, staged: excel_minutas.StagedGroupImport, minuta_id: int, grupo_label: str, mapping: dict[str, str]
+    ) -> None:
+        self._busy.run(
+            self._tasks,
+            "Guardando gramos…",
+            excel_minutas.apply_minuta_group,
+            staged,
+            minuta_id,
+            food_mapping=mapping,
+            on_success=lambda summary: self._importacion_completada(summary, grupo_label),
+            on_error=lambda exc: self._mostrar_error(exc, "No fue posible importar el archivo Excel."),
+        )
+
+    def _importacion_completada(self, summary: excel_minutas.GroupImportSummary, grupo_label: str) -> None:
+        self.refresh()
+        message = (
+            f"Grupo importado: {grupo_label}\n\n"
+            f"Filas leídas no vacías: {summary.rows_processed}\n"
+            f"Filas importadas: {summary.rows_imported}\n"
+            f"Alimentos detectados: {summary.foods_detected}\n"
+            f"Alimentos cargados/actualizados: {summary.rows_imported}"
+        )
+        if summary.empty_food_rows:
+            message += f"\n\nFilas con alimento vacío ignoradas: {summary.empty_food_rows}"
+        if summary.unknown_foods:
+            message += (
+                f"\n\nFilas con alimento no encontrado: {summary.unknown_food_rows}"
+                "\nAlimentos no encontrados en catálogo:\n- " + "\n- ".join(summary.unknown_foods)
             )
-            if summary.empty_food_rows:
-                message += f"\n\nFilas con alimento vacío ignoradas: {summary.empty_food_rows}"
-            if summary.unknown_foods:
-                message += (
-                    f"\n\nFilas con alimento no encontrado: {summary.unknown_food_rows}"
-                    "\nAlimentos no encontrados en catálogo:\n- " + "\n- ".join(summary.unknown_foods)
-                )
-            messagebox.showinfo("Importación completada", message, parent=self)
-        except RuntimeError as exc:
-            messagebox.showerror("Dependencia faltante", str(exc), parent=self)
-        except ValueError as exc:
-            messagebox.showerror("Validación", str(exc), parent=self)
-        except Exception:
-            messagebox.showerror("Error", "No fue posible importar el archivo Excel.", parent=self)
+        messagebox.showinfo("Importación completada", message, parent=self)
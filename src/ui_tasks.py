@@ -0,0 +1,235 @@
+"""Ejecución de tareas largas fuera del hilo de Tk.
+
+Las operaciones de base de datos y Excel se envían a un pool de hilos; el
+resultado vuelve al hilo de la interfaz revisando los futures con ``after()``,
+porque Tk no admite llamadas desde otros hilos. Cada hilo del pool usa su propia
+conexión SQLite (``db.get_connection`` es por hilo).
+"""
+from __future__ import annotations
+
+import threading
+import tkinter as tk
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from tkinter import ttk
+from typing import Any
+
+POLL_MS = 25
+PROGRESS_REFRESH_MS = 100
+MAX_WORKERS = 2
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="minutas-task")
+        return _executor
+
+
+class TaskRunner:
+    """Envía funciones al pool y entrega sus resultados en el hilo de Tk.
+
+    ``scheduler`` es cualquier objeto con ``after(ms, callback)`` (normalmente el
+    widget dueño de la tarea). Si el widget se destruye antes de terminar, los
+    callbacks se descartan.
+    """
+
+    def __init__(self, scheduler: Any, poll_ms: int = POLL_MS, executor: ThreadPoolExecutor | None = None):
+        self._scheduler = scheduler
+        self._poll_ms = poll_ms
+        self._executor = executor
+        self._pending: list[tuple[Future, Callable[[Any], None] | None, Callable[[BaseException], None] | None]] = []
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_success: Callable[[Any], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+        **kwargs: Any,
+    ) -> Future:
+        future = (self._executor or get_executor()).submit(fn, *args, **kwargs)
+        self._pending.append((future, on_success, on_error))
+        if not self._polling:
+            self._polling = True
+            self._scheduler.after(self._poll_ms, self._poll)
+        return future
+
+    def _alive(self) -> bool:
+        exists = getattr(self._scheduler, "winfo_exists", None)
+        if exists is None:
+            return True
+        try:
+            return bool(exists())
+        except tk.TclError:
+            return False
+
+    def _poll(self) -> None:
+        if not self._alive():
+            self._pending.clear()
+            self._polling = False
+            return
+
+        done = [entry for entry in self._pending if entry[0].done()]
+        self._pending = [entry for entry in self._pending if not entry[0].done()]
+        for future, on_success, on_error in done:
+            if future.cancelled():
+                continue
+            exc = future.exception()
+            if exc is None:
+                if on_success is not None:
+                    on_success(future.result())
+            elif on_error is not None:
+                on_error(exc)
+
+        if self._pending:
+            self._scheduler.after(self._poll_ms, self._poll)
+        else:
+            self._polling = False
+
+
+class ProgressState:
+    """Último avance informado desde el hilo de trabajo.
+
+    Se pasa como ``progress`` a los importadores; sólo guarda la tupla (una
+    asignación atómica), y la interfaz la lee cada ``PROGRESS_REFRESH_MS``.
+    """
+
+    def __init__(self) -> None:
+        self.value: tuple[int, int | None, str] | None = None
+
+    def __call__(self, done: int, total: int | None, phase: str) -> None:
+        self.value = (done, total, phase)
+
+
+class BusyIndicator:
+    """Barra de progreso, cursor de espera y botones deshabilitados mientras corre una tarea.
+
+    La barra es indeterminada salvo que la tarea informe avance con un
+    ``ProgressState``; con ``on_cancel`` se muestra además un botón Cancelar.
+    """
+
+    def __init__(self, window: tk.Misc, parent: tk.Misc, widgets: Iterable[ttk.Widget] = ()):
+        self._window = window
+        self._widgets = list(widgets)
+        self._depth = 0
+        self._message = ""
+        self._progress_state: ProgressState | None = None
+        self._on_cancel: Callable[[], None] | None = None
+        self.status_var = tk.StringVar(value="")
+        self.frame = ttk.Frame(parent)
+        self.progress = ttk.Progressbar(self.frame, mode="indeterminate", length=160)
+        self.label = ttk.Label(self.frame, textvariable=self.status_var)
+        self.cancel_button = ttk.Button(self.frame, text="Cancelar", command=self._cancel)
+
+    def add(self, *widgets: ttk.Widget) -> None:
+        self._widgets.extend(widgets)
+
+    def start(
+        self,
+        message: str = "Procesando…",
+        progress: ProgressState | None = None,
+        on_cancel: Callable[[], None] | None = None,
+    ) -> None:
+        self._depth += 1
+        self._message = message
+        self.status_var.set(message)
+        if progress is not None:
+            self._progress_state = progress
+            self._window.after(PROGRESS_REFRESH_MS, self._refresh_progress)
+        if on_cancel is not None:
+            self._on_cancel = on_cancel
+            self.cancel_button.state(["!disabled"])
+            self.cancel_button.pack(side="left", padx=(8, 0))
+        if self._depth > 1:
+            return
+        for widget in self._widgets:
+            widget.state(["disabled"])
+        self.progress.configure(mode="indeterminate", value=0)
+        self.progress.pack(side="left")
+        self.label.pack(side="left", padx=(8, 0))
+        self.progress.start(15)
+        self._window.configure(cursor="watch")
+
+    def _refresh_progress(self) -> None:
+        state = self._progress_state
+        if state is None or self._depth == 0:
+            return
+        if state.value is not None:
+            done, total, phase = state.value
+            if total:
+                if str(self.progress.cget("mode")) != "determinate":
+                    self.progress.stop()
+                    self.progress.configure(mode="determinate", maximum=100)
+                self.progress.configure(value=min(100.0, done * 100 / total))
+                self.status_var.set(f"{self._message} {phase}: {done:,}/{total:,}")
+            else:
+                self.status_var.set(f"{self._message} {phase}: {done:,}")
+        self._window.after(PROGRESS_REFRESH_MS, self._refresh_progress)
+
+    def _cancel(self) -> None:
+        if self._on_cancel is None:
+            return
+        self._on_cancel()
+        self.cancel_button.state(["disabled"])
+        self._message = "Cancelando…"
+        self.status_var.set(self._message)
+
+    def stop(self) -> None:
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        self._progress_state = None
+        self._on_cancel = None
+        self.progress.stop()
+        self.progress.pack_forget()
+        self.label.pack_forget()
+        self.cancel_button.pack_forget()
+        self.status_var.set("")
+        for widget in self._widgets:
+            try:
+                widget.state(["!disabled"])
+            except tk.TclError:
+                pass
+        try:
+            self._window.configure(cursor="")
+        except tk.TclError:
+            pass
+
+    def run(
+        self,
+        runner: TaskRunner,
+        message: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_success: Callable[[Any], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+        progress_state: ProgressState | None = None,
+        on_cancel: Callable[[], None] | None = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Inicia el indicador, ejecuta ``fn`` en segundo plano y lo detiene antes de los callbacks."""
+        self.start(message, progress_state, on_cancel)
+
+        def success(result: Any) -> None:
+            self.stop()
+            if on_success is not None:
+                on_success(result)
+
+        def error(exc: BaseException) -> None:
+            self.stop()
+            if on_error is not None:
+                on_error(exc)
+
+        return runner.submit(fn, *args, on_success=success, on_error=error, **kwargs)
@@ -0,0 +1,398 @@
+"""Tabla virtual sobre ``ttk.Treeview`` para listas grandes.
+
+Los datos viven en un ``ColumnStore`` (una lista por columna más el orden de
+vista); el Treeview sólo tiene tantos ítems como filas caben en pantalla, y al
+desplazarse se reescriben sus valores en lugar de insertar o borrar ítems.
+Refrescar con ``set_rows`` calcula la diferencia por clave, así que tras editar
+una fila sólo cambia esa fila en el almacén y, si está a la vista, su ítem.
+"""
+from __future__ import annotations
+
+import tkinter as tk
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from dataclasses import dataclass
+from tkinter import ttk
+from typing import Any
+
+SORT_ASC = " ▲"
+SORT_DESC = " ▼"
+
+
+@dataclass(frozen=True)
+class Diff:
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def sort_key(value: Any) -> tuple[int, Any]:
+    """Números antes que texto; el texto se compara sin distinguir mayúsculas."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, "" if value is None else str(value).casefold())
+
+
+class ColumnStore:
+    """Filas indexadas por clave, guardadas por columna, con un orden de vista.
+
+    Las filas existentes conservan su posición interna al actualizarse; sólo las
+    eliminaciones compactan las listas.
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = tuple(columns)
+        self.sort_column: str | None = None
+        self.sort_reverse = False
+        self._keys: list[Hashable] = []
+        self._data: list[list[Any]] = [[] for _ in self.columns]
+        self._index: dict[Hashable, int] = {}
+        self._order: list[int] = []
+        self._positions: dict[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def row(self, position: int) -> tuple[Any, ...]:
+        index = self._order[position]
+        return tuple(column[index] for column in self._data)
+
+    def key_at(self, position: int) -> Hashable:
+        return self._keys[self._order[position]]
+
+    def get(self, key: Hashable) -> tuple[Any, ...] | None:
+        index = self._index.get(key)
+        if index is None:
+            return None
+        return tuple(column[index] for column in self._data)
+
+    def keys(self) -> list[Hashable]:
+        return [self._keys[index] for index in self._order]
+
+    def position_of(self, key: Hashable) -> int | None:
+        index = self._index.get(key)
+        if index is None:
+            return None
+        if self._positions is None:
+            self._positions = {row: position for position, row in enumerate(self._order)}
+        return self._positions[index]
+
+    def _width(self, values: Sequence[Any]) -> tuple[Any, ...]:
+        if len(values) != len(self.columns):
+            raise ValueError(f"Se esperaban {len(self.columns)} columnas y llegaron {len(values)}.")
+        return tuple(values)
+
+    def _write(self, key: Hashable, values: tuple[Any, ...]) -> str | None:
+        """Inserta o actualiza una fila; devuelve 'added', 'changed' o None si no cambió."""
+        index = self._index.get(key)
+        if index is None:
+            self._index[key] = len(self._keys)
+            self._keys.append(key)
+            for column, value in zip(self._data, values):
+                column.append(value)
+            return "added"
+        if all(column[index] == value for column, value in zip(self._data, values)):
+            return None
+        for column, value in zip(self._data, values):
+            column[index] = value
+        return "changed"
+
+    def _compact(self, removed: set[Hashable]) -> None:
+        keep = [index for index, key in enumerate(self._keys) if key not in removed]
+        remap = {old: new for new, old in enumerate(keep)}
+        self._keys = [self._keys[index] for index in keep]
+        self._data = [[column[index] for index in keep] for column in self._data]
+        self._index = {key: index for index, key in enumerate(self._keys)}
+        self._order = [remap[index] for index in self._order if index in remap]
+
+    def _resort(self) -> None:
+        if self.sort_column is not None:
+            values = self._data[self.columns.index(self.sort_column)]
+            # Columnas homogéneas (lo normal) evitan llamar sort_key por fila.
+            if all(type(value) in (int, float) for value in values):
+                keys = values
+            elif all(type(value) is str for value in values):
+                keys = [value.casefold() for value in values]
+            else:
+                keys = [sort_key(value) for value in values]
+            self._order.sort(key=keys.__getitem__, reverse=self.sort_reverse)
+        self._positions = None
+
+    def replace(self, rows: Iterable[tuple[Hashable, Sequence[Any]]]) -> Diff:
+        """Deja exactamente ``rows``; sin columna de orden, la vista sigue el orden recibido."""
+        incoming = {key: self._width(values) for key, values in rows}
+        removed = {key for key in self._index if key not in incoming}
+        if removed:
+            self._compact(removed)
+
+        current = dict(zip(self._keys, zip(*self._data)))
+        added = changed = 0
+        for key, values in incoming.items():
+            existing = current.get(key)
+            if existing is None:
+                self._write(key, values)
+                added += 1
+            elif existing != values:
+                self._write(key, values)
+                changed += 1
+
+        if self.sort_column is None:
+            self._order = [self._index[key] for key in incoming]
+        elif added or removed or changed:
+            self._order = list(range(len(self._keys)))
+        self._resort()
+        return Diff(added=added, changed=changed, removed=len(removed))
+
+    def upsert(self, rows: Iterable[tuple[Hashable, Sequence[Any]]]) -> Diff:
+        """Agrega o actualiza ``rows`` sin tocar las demás; las nuevas van al final si no hay orden."""
+        added = changed = 0
+        for key, values in rows:
+            outcome = self._write(key, self._width(values))
+            if outcome == "added":
+                added += 1
+                self._order.append(self._index[key])
+            changed += outcome == "changed"
+        if added or (changed and self.sort_column is not None):
+            self._resort()
+        return Diff(added=added, changed=changed)
+
+    def remove(self, keys: Iterable[Hashable]) -> Diff:
+        removed = {key for key in keys if key in self._index}
+        if removed:
+            self._compact(removed)
+            self._positions = None
+        return Diff(removed=len(removed))
+
+    def sort(self, column: str | None, reverse: bool = False) -> None:
+        """Ordena la vista por ``column`` (None mantiene el orden actual); el orden es estable."""
+        if column is not None and column not in self.columns:
+            raise ValueError(f"Columna desconocida: {column}.")
+        self.sort_column = column
+        self.sort_reverse = reverse
+        self._resort()
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview con sólo las filas visibles, encabezados que ordenan y selección por clave.
+
+    ``columns`` es una lista de ``(id, título, ancho, anchor)``. ``on_activate``
+    recibe la clave de la fila con doble clic o Enter.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        columns: Sequence[tuple[str, str, int, str]],
+        height: int = 15,
+        on_activate: Callable[[Hashable], None] | None = None,
+        sortable: bool = True,
+    ):
+        super().__init__(master)
+        self.store = ColumnStore([column[0] for column in columns])
+        self._titles = {column[0]: column[1] for column in columns}
+        self._on_activate = on_activate
+        self._offset = 0
+        self._selected: Hashable | None = None
+        self._slots: list[str] = []
+        # Valores mostrados por cada ítem; None = ítem desenganchado (sin fila).
+        self._slot_values: list[tuple[Any, ...] | None] = []
+        self._tree_height = 0
+
+        self.tree = ttk.Treeview(self, columns=self.store.columns, show="headings", height=height, selectmode="browse")
+        for column_id, title, width, anchor in columns:
+            command = (lambda c=column_id: self.toggle_sort(c)) if sortable else ""
+            self.tree.heading(column_id, text=title, command=command)
+            self.tree.column(column_id, width=width, anchor=anchor)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="left", fill="y")
+
+        self._resize_slots(height)
+        self.tree.bind("<Configure>", self._on_configure, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select, add="+")
+        self.tree.bind("<Double-1>", lambda _e: self._activate(), add="+")
+        self.tree.bind("<Return>", lambda _e: self._activate(), add="+")
+        self.tree.bind("<MouseWheel>", self._on_wheel, add="+")
+        self.tree.bind("<Button-4>", lambda _e: self.scroll(-3), add="+")
+        self.tree.bind("<Button-5>", lambda _e: self.scroll(3), add="+")
+        self.tree.bind("<Up>", lambda _e: self._move_selection(-1), add="+")
+        self.tree.bind("<Down>", lambda _e: self._move_selection(1), add="+")
+        self.tree.bind("<Prior>", lambda _e: self._move_selection(-self._page()), add="+")
+        self.tree.bind("<Next>", lambda _e: self._move_selection(self._page()), add="+")
+        self.tree.bind("<Home>", lambda _e: self._select_position(0), add="+")
+        self.tree.bind("<End>", lambda _e: self._select_position(len(self.store) - 1), add="+")
+
+    # --- datos -----------------------------------------------------------------
+
+    def set_rows(self, rows: Iterable[tuple[Hashable, Sequence[Any]]]) -> Diff:
+        diff = self.store.replace(rows)
+        if self._selected is not None and self._selected not in self.store:
+            self._selected = None
+        self._render()
+        self._fit()
+        return diff
+
+    def upsert_rows(self, rows: Iterable[tuple[Hashable, Sequence[Any]]]) -> Diff:
+        diff = self.store.upsert(rows)
+        if diff:
+            self._render()
+        return diff
+
+    def remove_rows(self, keys: Iterable[Hashable]) -> Diff:
+        diff = self.store.remove(keys)
+        if diff:
+            if self._selected is not None and self._selected not in self.store:
+                self._selected = None
+            self._render()
+        return diff
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    # --- orden -----------------------------------------------------------------
+
+    def sort_by(self, column: str | None, reverse: bool = False) -> None:
+        self.store.sort(column, reverse)
+        for column_id, title in self._titles.items():
+            suffix = ""
+            if column_id == column:
+                suffix = SORT_DESC if reverse else SORT_ASC
+            self.tree.heading(column_id, text=title + suffix)
+        if self._selected is not None:
+            self.see(self._selected)
+        self._render()
+
+    def toggle_sort(self, column: str) -> None:
+        reverse = self.store.sort_column == column and not self.store.sort_reverse
+        self.sort_by(column, reverse)
+
+    # --- selección -------------------------------------------------------------
+
+    def selected_key(self) -> Hashable | None:
+        return self._selected
+
+    def select(self, key: Hashable | None, see: bool = True) -> None:
+        self._selected = key if key in self.store else None
+        if see and self._selected is not None:
+            self.see(self._selected)
+        self._render()
+
+    def see(self, key: Hashable) -> None:
+        position = self.store.position_of(key)
+        if position is None:
+            return
+        visible = len(self._slots)
+        if position < self._offset:
+            self._offset = position
+        elif position >= self._offset + visible:
+            self._offset = position - visible + 1
+        self._render()
+
+    def _select_position(self, position: int) -> str:
+        if len(self.store):
+            position = max(0, min(position, len(self.store) - 1))
+            self.select(self.store.key_at(position))
+        return "break"
+
+    def _page(self) -> int:
+        return max(1, len(self._slots) - 1)
+
+    def _move_selection(self, delta: int) -> str:
+        current = self.store.position_of(self._selected) if self._selected is not None else None
+        return self._select_position(0 if current is None else current + delta)
+
+    def _on_tree_select(self, _event: tk.Event) -> None:
+        selection = self.tree.selection()
+        if not selection:
+            return
+        slot = self._slots.index(selection[0])
+        position = self._offset + slot
+        if position < len(self.store):
+            self._selected = self.store.key_at(position)
+
+    def _activate(self) -> str | None:
+        if self._on_activate is not None and self._selected is not None:
+            self._on_activate(self._selected)
+        return "break"
+
+    # --- desplazamiento --------------------------------------------------------
+
+    def scroll(self, rows: int) -> str:
+        self._offset += rows
+        self._render()
+        return "break"
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self._offset = int(float(amount) * len(self.store))
+        elif action == "scroll":
+            self._offset += int(amount) * (len(self._slots) if unit == "pages" else 1)
+        self._render()
+
+    def _on_configure(self, event: tk.Event) -> None:
+        self._tree_height = event.height
+        self._fit()
+
+    def _fit(self) -> None:
+        """Ajusta la cantidad de ítems a la altura real; hace falta una fila dibujada para medirla."""
+        if not self._tree_height or not self._slots or self._slot_values[0] is None:
+            return
+        bbox = self.tree.bbox(self._slots[0])
+        if not bbox:
+            return
+        _x, top, _width, row_height = bbox
+        rows = max(1, (self._tree_height - top) // max(1, row_height))
+        if rows != len(self._slots):
+            self._resize_slots(rows)
+            self._render()
+
+    def _resize_slots(self, rows: int) -> None:
+        while len(self._slots) < rows:
+            slot = f"slot{len(self._slots)}"
+            self.tree.insert("", "end", iid=slot, values=())
+            self.tree.detach(slot)
+            self._slots.append(slot)
+            self._slot_values.append(None)
+        while len(self._slots) > rows:
+            self.tree.delete(self._slots.pop())
+            self._slot_values.pop()
+
+    # --- dibujo ----------------------------------------------------------------
+
+    def _render(self) -> None:
+        total = len(self.store)
+        visible = len(self._slots)
+        self._offset = max(0, min(self._offset, total - visible))
+
+        selected_slot = None
+        for number, slot in enumerate(self._slots):
+            position = self._offset + number
+            if position < total:
+                values = self.store.row(position)
+                if self._slot_values[number] is None:
+                    self.tree.move(slot, "", number)
+                if self._slot_values[number] != values:
+                    self.tree.item(slot, values=values)
+                    self._slot_values[number] = values
+                if self._selected is not None and self.store.key_at(position) == self._selected:
+                    selected_slot = slot
+            elif self._slot_values[number] is not None:
+                self._slot_values[number] = None
+                self.tree.detach(slot)
+
+        current = self.tree.selection()
+        wanted = (selected_slot,) if selected_slot else ()
+        if tuple(current) != wanted:
+            self.tree.selection_set(wanted)
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -1,79 +1,13 @@
 from __future__ import annotations
 
 import tkinter as tk
-from decimal import Decimal, ROUND_HALF_UP
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 
+import excel_pedidos
 import models
-
-
-def normalize_food_name(name: str) -> str:
-    return " ".join(name.strip().split()).casefold()
-
-
-_POUNDS_FOODS_RAW = {
-    "Ahuyama",
-    "Apio",
-    "Arveja verde c/cáscara",
-    "Banano bocadillo",
-    "Banano común",
-    "Calabazín",
-    "Cebolla cabezona",
-    "Cebolla larga",
-    "Crema de leche x 125 gr",
-    "Espinaca",
-    "Fresa",
-    "Durazno NACIONAL MADURO",
-    "Guayaba JUGO",
-    "Habichuela",
-    "Lechuga",
-    "Mandarina PORCION",
-    "Mango PORCION",
-    "Manzana ANA O ROYAL",
-    "Mora JUGO",
-    "Naranja DULCE PORCION",
-    "Papa común",
-    "Papaya PORCION",
-    "Pepino cohombro",
-    "Pepino de guiso",
-    "Pera PORCION",
-    "Piña ORO MIEL PORCIÓN",
-    "Plátano maduro",
-    "Plátano verde",
-    "Queso doble crema",
-    "Remolacha",
-    "Repollo blanco",
-    "Tomate chonto o río",
-    "Zanahoria",
-    "Carne de res MAGRA MOLIDA",
-    "Carne de res MAGRA BLANDA",
-    "Carne de cerdo MAGRA",
-    "Pechuga de pollo",
-    "Arroz",
-    "Azúcar",
-    "Chocolate de mesa",
-    "Harina de trigo",
-    "Harina de maíz para arepas",
-    "Lenteja",
-    "Sal",
-    "Frijol rojo",
-    "Tomate de arbol",
-}
-
-POUNDS_FOODS = {normalize_food_name(food) for food in _POUNDS_FOODS_RAW}
-
-
-def _round_half_up(value: Decimal) -> int:
-    return int(value.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
-
-
-def format_pedido_final(nombre_alimento: str, total_gramos: float | int) -> str:
-    if normalize_food_name(nombre_alimento) in POUNDS_FOODS:
-        libras = Decimal(str(total_gramos)) / Decimal("500")
-        return f"{_round_half_up(libras)} lb"
-    total = Decimal(str(total_gramos))
-    total_str = str(int(total)) if total == total.to_integral_value() else str(total.normalize())
-    return f"{total_str} g"
+from ui_minuta_picker import pick_minuta
+from ui_tasks import BusyIndicator, TaskRunner
+from ui_virtual_table import VirtualTable
 
 
 class WeeklyOrderWindow(tk.Toplevel):
@@ -137,7 +71,13 @@ class WeeklyOrderWindow(tk.Toplevel):
         self.minutas_count_var = tk.StringVar(value="Minutas en la semana: 0")
         ttk.Label(left, textvariable=self.minutas_count_var).pack(anchor="w", pady=(8, 0))
 
-        ttk.Button(left, text="Generar pedido semanal", command=self.calculate).pack(fill="x", pady=(8, 0))
+        task_buttons = [
+            ttk.Button(left, text="Generar pedido semanal", command=self.calculate),
+            ttk.Button(left, text="Exportar pedido del jardín", command=self.export_jardin),
+            ttk.Button(left, text="Exportar pedido de todos los jardines", command=self.export_todos),
+        ]
+        for button in task_buttons:
+            button.pack(fill="x", pady=(8, 0))
 
         right = ttk.LabelFrame(body, text="Resultado", padding=8)
         right.pack(side="left", fill="both", expand=True, padx=(10, 0))
@@ -148,6 +88,10 @@ class WeeklyOrderWindow(tk.Toplevel):
             justify="left",
         ).pack(anchor="nw")
 
+        self._tasks = TaskRunner(self)
+        self._busy = BusyIndicator(self, right, task_buttons)
+        self._busy.frame.pack(anchor="nw", pady=(12, 0))
+
         self.refresh_jardines()
 
     def _update_minutas_count(self) -> None:
@@ -200,18 +144,16 @@ class WeeklyOrderWindow(tk.Toplevel):
             messagebox.showwarning("Atención", "Selecciona un jardín.", parent=self)
             return
 
-        minutas = models.list_minutas()
-        if not minutas:
+        if not models.has_minutas():
             messagebox.showwarning("Atención", "No hay minutas creadas. Crea una primero.", parent=self)
             return
 
         already = {row["minuta_id"] for row in self._minutas_jardin}
-        candidates = [m for m in minutas if m["id"] not in already]
-        if not candidates:
+        if not models.has_minutas(exclude=already):
             messagebox.showinfo("Información", "Este jardín ya tiene todas las minutas asignadas.", parent=self)
             return
 
-        selected = self._pick_minuta(candidates)
+        selected = pick_minuta(self, "Selecciona la minuta para el pedido semanal:", already)
         if not selected:
             return
 
@@ -221,39 +163,6 @@ class WeeklyOrderWindow(tk.Toplevel):
         except Exception:
             messagebox.showerror("Error", "No fue posible agregar la minuta a la semana.", parent=self)
 
-    def _pick_minuta(self, minutas: list) -> dict | None:
-        picker = tk.Toplevel(self)
-        picker.title("Seleccionar minuta")
-        picker.geometry("420x360")
-        picker.transient(self)
-        picker.grab_set()
-
-        frame = ttk.Frame(picker, padding=12)
-        frame.pack(fill="both", expand=True)
-        ttk.Label(frame, text="Selecciona la minuta para el pedido semanal:").pack(anchor="w")
-
-        listbox = tk.Listbox(frame)
-        listbox.pack(fill="both", expand=True, pady=(8, 8))
-        for minuta in minutas:
-            listbox.insert(tk.END, minuta["nombre"])
-
-        chosen = {"row": None}
-
-        def accept() -> None:
-            idx = listbox.curselection()
-            if not idx:
-                return
-            chosen["row"] = minutas[idx[0]]
-            picker.destroy()
-
-        buttons = ttk.Frame(frame)
-        buttons.pack(fill="x")
-        ttk.Button(buttons, text="Cancelar", command=picker.destroy).pack(side="right")
-        ttk.Button(buttons, text="Seleccionar", command=accept).pack(side="right", padx=(0, 8))
-
-        picker.wait_window()
-        return chosen["row"]
-
     def remove_minuta_semana(self) -> None:
         jardin = self._selected_jardin()
         if not jardin:
@@ -284,6 +193,80 @@ class WeeklyOrderWindow(tk.Toplevel):
             raise ValueError(f"{label} debe ser un entero mayor o igual a 0.")
         return value
 
+    def _read_ninos(self) -> tuple[int, int] | None:
+        try:
+            return (
+                self._parse_non_negative_int(self.ninos_g1_var.get(), "#Niños Grupo 1"),
+                self._parse_non_negative_int(self.ninos_g2_var.get(), "#Niños Grupo 2"),
+            )
+        except ValueError as exc:
+            messagebox.showerror("Validación", str(exc), parent=self)
+            return None
+
+    def _export(
+        self,
+        ninos_por_jardin: dict[int, tuple[int, int]],
+        jardin_ids: list[int] | None,
+        initialfile: str,
+    ) -> None:
+        file_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Exportar pedido semanal",
+            defaultextension=".xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")],
+            initialfile=initialfile,
+        )
+        if not file_path:
+            return
+        if file_path.lower().endswith(".csv"):
+            export, detalle = excel_pedidos.export_weekly_orders_csv, "Filas exportadas"
+        else:
+            export, detalle = excel_pedidos.export_weekly_orders_xlsx, "Jardines exportados"
+        self._busy.run(
+            self._tasks,
+            "Exportando pedido…",
+            export,
+            file_path,
+            ninos_por_jardin,
+            jardin_ids,
+            on_success=lambda count: messagebox.showinfo(
+                "Pedido exportado", f"{detalle}: {count}\nArchivo: {file_path}", parent=self
+            ),
+            on_error=self._export_error,
+        )
+
+    def _export_error(self, exc: BaseException) -> None:
+        if isinstance(exc, RuntimeError):
+            messagebox.showerror("Dependencia faltante", str(exc), parent=self)
+        else:
+            messagebox.showerror("Error", "No fue posible exportar el pedido.", parent=self)
+
+    def export_jardin(self) -> None:
+        jardin = self._selected_jardin()
+        if not jardin:
+            messagebox.showwarning("Validación", "Selecciona un jardín.", parent=self)
+            return
+        ninos = self._read_ninos()
+        if ninos is None:
+            return
+        self._export({jardin["id"]: ninos}, [jardin["id"]], f"pedido_{jardin['nombre']}.xlsx")
+
+    def export_todos(self) -> None:
+        ninos = self._read_ninos()
+        if ninos is None:
+            return
+        jardines = models.list_jardines()
+        if not jardines:
+            messagebox.showwarning("Validación", "No hay jardines creados.", parent=self)
+            return
+        if not messagebox.askyesno(
+            "Confirmar",
+            f"Se usará #Niños G1 = {ninos[0]} y #Niños G2 = {ninos[1]} para todos los jardines. ¿Continuar?",
+            parent=self,
+        ):
+            return
+        self._export({j["id"]: ninos for j in jardines}, None, "pedido_semanal.xlsx")
+
     def calculate(self) -> None:
         if not self._minutas_jardin:
             messagebox.showwarning("Validación", "Agrega al menos una minuta.", parent=self)
@@ -296,14 +279,29 @@ class WeeklyOrderWindow(tk.Toplevel):
             messagebox.showerror("Validación", str(exc), parent=self)
             return
 
-        minuta_ids = [row["minuta_id"] for row in self._minutas_jardin]
-        resumen = models.calculate_weekly_order(minuta_ids, ninos_g1, ninos_g2)
-
-        if not resumen:
-            messagebox.showinfo("Resultado", "No se encontraron alimentos para las minutas de la semana.", parent=self)
+        jardin = self._selected_jardin()
+        if not jardin:
+            messagebox.showwarning("Validación", "Selecciona un jardín.", parent=self)
             return
 
-        self._show_result_window(resumen, len(set(minuta_ids)), ninos_g1, ninos_g2)
+        minuta_count = len({row["minuta_id"] for row in self._minutas_jardin})
+
+        def show(resumen: list[dict[str, float | int | str]]) -> None:
+            if not resumen:
+                messagebox.showinfo("Resultado", "No se encontraron alimentos para las minutas de la semana.", parent=self)
+                return
+            self._show_result_window(resumen, minuta_count, ninos_g1, ninos_g2)
+
+        self._busy.run(
+            self._tasks,
+            "Calculando pedido…",
+            models.calculate_weekly_order_for_jardin,
+            jardin["id"],
+            ninos_g1,
+            ninos_g2,
+            on_success=show,
+            on_error=lambda _exc: messagebox.showerror("Error", "No fue posible calcular el pedido.", parent=self),
+        )
 
     def _show_result_window(
         self,
@@ -322,35 +320,27 @@ class WeeklyOrderWindow(tk.Toplevel):
         ttk.Label(root, text=f"Minutas en la semana: {selected_count}").pack(anchor="w")
         ttk.Label(root, text=f"Niños G1: {ninos_g1} | Niños G2: {ninos_g2}").pack(anchor="w", pady=(2, 10))
 
-        columns = ("alimento", "suma_g1", "suma_g2", "total", "pedido_final")
-        tree = ttk.Treeview(root, columns=columns, show="headings")
-        tree.heading("alimento", text="Alimento")
-        tree.heading("suma_g1", text="Suma gramos G1")
-        tree.heading("suma_g2", text="Suma gramos G2")
-        tree.heading("total", text="Total general en gramos")
-        tree.heading("pedido_final", text="Pedido final")
-
-        tree.column("alimento", width=220)
-        tree.column("suma_g1", width=120, anchor="e")
-        tree.column("suma_g2", width=120, anchor="e")
-        tree.column("total", width=165, anchor="e")
-        tree.column("pedido_final", width=110, anchor="e")
-
-        yscroll = ttk.Scrollbar(root, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=yscroll.set)
-
-        tree.pack(side="left", fill="both", expand=True)
-        yscroll.pack(side="left", fill="y")
-
-        for row in resumen:
-            tree.insert(
-                "",
-                "end",
-                values=(
+        table = VirtualTable(
+            root,
+            columns=[
+                ("alimento", "Alimento", 220, "w"),
+                ("suma_g1", "Suma gramos G1", 120, "e"),
+                ("suma_g2", "Suma gramos G2", 120, "e"),
+                ("total", "Total general en gramos", 165, "e"),
+                ("pedido_final", "Pedido final", 110, "e"),
+            ],
+        )
+        table.pack(fill="both", expand=True)
+        table.set_rows(
+            (
+                row["alimento_id"],
+                (
                     row["alimento_nombre"],
                     row["suma_gramos_g1"],
                     row["suma_gramos_g2"],
                     row["total_general"],
-                    format_pedido_final(row["alimento_nombre"], row["total_general"]),
+                    row["pedido_final"],
                 ),
             )
+            for row in resumen
+        )
@@ -0,0 +1,94 @@
+"""Unidades de pedido por alimento.
+
+Cada alimento puede tener en ``alimento_unidades`` una unidad de pedido (por
+ejemplo ``lb``), cuántos gramos trae cada unidad, una regla de redondeo y un
+tamaño de paquete opcional (en unidades). Los alimentos sin fila se piden en
+gramos sin redondear.
+
+La tabla se lee una vez y se guarda en memoria junto con
+``unidades_version``, que los triggers incrementan con cada cambio; mientras
+la versión no cambie, convertir un pedido no vuelve a consultarla.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import db
+
+GRAMOS = "g"
+REDONDEO_MEDIO_ARRIBA = "medio_arriba"
+REDONDEO_ARRIBA = "arriba"
+REDONDEO_NINGUNO = "ninguno"
+REDONDEOS = (REDONDEO_MEDIO_ARRIBA, REDONDEO_ARRIBA, REDONDEO_NINGUNO)
+
+# Tolerancia para que errores de punto flotante (p. ej. 2.4999999) no cambien el redondeo.
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Unidad:
+    unidad: str
+    gramos_por_unidad: float
+    redondeo: str = REDONDEO_MEDIO_ARRIBA
+    tamano_paquete: float | None = None
+
+
+def _format_number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return f"{round(value, 3):f}".rstrip("0").rstrip(".")
+
+
+def convertir(total_gramos: float, unidad: Unidad | None) -> tuple[float, str]:
+    """Cantidad a pedir y su unidad para ``total_gramos``."""
+    if unidad is None:
+        return float(total_gramos), GRAMOS
+    cantidad = total_gramos / unidad.gramos_por_unidad
+    if unidad.tamano_paquete:
+        paquetes = math.ceil(cantidad / unidad.tamano_paquete - _EPSILON)
+        cantidad = max(0, paquetes) * unidad.tamano_paquete
+    elif unidad.redondeo == REDONDEO_MEDIO_ARRIBA:
+        cantidad = math.floor(cantidad + 0.5 + _EPSILON)
+    elif unidad.redondeo == REDONDEO_ARRIBA:
+        cantidad = math.ceil(cantidad - _EPSILON)
+    return float(cantidad), unidad.unidad
+
+
+def format_pedido(cantidad: float, unidad: str) -> str:
+    return f"{_format_number(cantidad)} {unidad}"
+
+
+def format_pedido_final(total_gramos: float, unidad: Unidad | None) -> str:
+    return format_pedido(*convertir(total_gramos, unidad))
+
+
+_cache_lock = threading.Lock()
+_cache: dict[Path, tuple[int, dict[int, Unidad]]] = {}
+
+
+def unidades_version() -> int:
+    row = db.get_connection().execute("SELECT version FROM unidades_version WHERE id = 1").fetchone()
+    return 0 if row is None else int(row[0])
+
+
+def load_unidades() -> dict[int, Unidad]:
+    """Unidades por ``alimento_id``; sólo relee la tabla si cambió su versión."""
+    version = unidades_version()
+    with _cache_lock:
+        cached = _cache.get(db.DB_PATH)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    rows = db.get_connection().execute(
+        "SELECT alimento_id, unidad, gramos_por_unidad, redondeo, tamano_paquete FROM alimento_unidades"
+    )
+    table = {
+        row["alimento_id"]: Unidad(row["unidad"], row["gramos_por_unidad"], row["redondeo"], row["tamano_paquete"])
+        for row in rows
+    }
+    with _cache_lock:
+        _cache[db.DB_PATH] = (version, table)
+    return table
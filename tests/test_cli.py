@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import subprocess
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import cli
+import db
+import excel_minutas
+import models
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmpdir.name) / "cli.db"
+        self._old_data_dir = db.DATA_DIR
+        self._old_db_path = db.DB_PATH
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        db.DATA_DIR = self._old_data_dir
+        db.DB_PATH = self._old_db_path
+        self._tmpdir.cleanup()
+
+    def _run(self, *argv: str) -> tuple[int, str, str]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            code = cli.main(["--db", str(self.db_path), *argv])
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_weekly_order_for_all_jardines_as_csv(self) -> None:
+        code, out, _ = self._run("init")
+        self.assertEqual(code, 0)
+        self.assertGreater(json.loads(out)["alimentos_insertados"], 0)
+
+        arroz_id = models.find_alimento_id("Arroz")
+        minuta_id = models.create_minuta("M1")
+        models.add_or_update_item(minuta_id, arroz_id, 50, 70)
+        for nombre in ("Sol", "Luna"):
+            models.add_minuta_a_semana(models.create_jardin(nombre), minuta_id)
+
+        ninos_csv = Path(self._tmpdir.name) / "ninos.csv"
+        ninos_csv.write_text("jardin,ninos_g1,ninos_g2\nSol,10,0\n", encoding="utf-8")
+        code, out, _ = self._run("pedido", "--todos", "--ninos", "1", "1", "--ninos-csv", str(ninos_csv), "--formato", "csv")
+
+        self.assertEqual(code, 0)
+        rows = {row["jardin"]: row for row in csv.DictReader(io.StringIO(out))}
+        self.assertEqual(set(rows), {"Sol", "Luna"})
+        self.assertEqual(float(rows["Sol"]["total_general"]), 500)
+        self.assertEqual(float(rows["Luna"]["total_general"]), 120)
+        self.assertEqual(rows["Sol"]["pedido_final"], "1 lb")
+
+    def test_resolves_jardines_and_minutas_by_name(self) -> None:
+        self._run("init")
+        jardin_id = models.create_jardin("Pequeños Gigantes")
+        minuta_id = models.create_minuta("Minuta Uno")
+        jardines = {int(row["id"]): row["nombre"] for row in models.list_jardines()}
+        keys = cli._jardin_keys(jardines)
+
+        self.assertEqual(cli._resolve_jardin("pequenos  gigantes", jardines, keys), jardin_id)
+        self.assertEqual(cli._resolve_jardin(str(jardin_id), jardines, keys), jardin_id)
+        self.assertEqual(cli._resolve_minuta(" MINUTA uno "), minuta_id)
+        with self.assertRaises(ValueError):
+            cli._resolve_jardin("Otro", jardines, keys)
+        with self.assertRaises(ValueError):
+            cli._resolve_minuta("Minuta Dos")
+
+    def test_unit_csv_changes_pedido_final(self) -> None:
+        self._run("init")
+        unidades_csv = Path(self._tmpdir.name) / "unidades.csv"
+        unidades_csv.write_text(
+            "alimento,unidad,gramos_por_unidad,redondeo,tamano_paquete\n"
+            "ARROZ,bulto,1000,arriba,\n"
+            "Huevo de gallina,cubeta,1500,,2\n"
+            "No existe,kg,1000,,\n",
+            encoding="utf-8",
+        )
+        code, out, _ = self._run("importar-unidades", str(unidades_csv))
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out), {"unidades_guardadas": 2})
+
+        minuta_id = models.create_minuta("M1")
+        models.add_or_update_item(minuta_id, models.find_alimento_id("Arroz"), 50, 70)
+        models.add_or_update_item(minuta_id, models.find_alimento_id("Huevo de gallina"), 50, 50)
+        models.add_minuta_a_semana(models.create_jardin("Sol"), minuta_id)
+
+        code, out, _ = self._run("pedido", "--jardin", "Sol", "--ninos", "30", "0")
+        self.assertEqual(code, 0)
+        pedido = {row["alimento"]: row["pedido_final"] for row in json.loads(out)}
+        self.assertEqual(pedido, {"Arroz": "2 bulto", "Huevo de gallina": "2 cubeta"})
+
+    def test_failures_return_non_zero_exit_code(self) -> None:
+        code, _, err = self._run("pedido", "--jardin", "No existe", "--ninos", "1", "1")
+        self.assertEqual(code, 1)
+        self.assertIn("No existe el jardín", err)
+
+        code, _, _ = self._run("importar-minutas", str(Path(self._tmpdir.name) / "falta.xlsx"))
+        self.assertEqual(code, 1)
+
+    def test_pedido_requires_ninos_for_every_target_jardin(self) -> None:
+        self._run("init")
+        minuta_id = models.create_minuta("M1")
+        models.add_or_update_item(minuta_id, models.find_alimento_id("Arroz"), 50, 70)
+        for nombre in ("Sol", "Luna"):
+            models.add_minuta_a_semana(models.create_jardin(nombre), minuta_id)
+
+        code, out, err = self._run("pedido", "--todos")
+        self.assertEqual((code, out), (1, ""))
+        self.assertIn("--ninos", err)
+
+        ninos_csv = Path(self._tmpdir.name) / "ninos.csv"
+        ninos_csv.write_text("jardin,ninos_g1,ninos_g2\nSol,10,0\n", encoding="utf-8")
+        code, out, err = self._run("pedido", "--todos", "--ninos-csv", str(ninos_csv))
+        self.assertEqual((code, out), (1, ""))
+        self.assertIn("Luna", err)
+
+        code, _, _ = self._run("pedido", "--jardin", "Sol", "--ninos-csv", str(ninos_csv))
+        self.assertEqual(code, 0)
+
+    def test_strict_minutas_import_fails_on_unknown_foods(self) -> None:
+        try:
+            from openpyxl import Workbook
+        except ModuleNotFoundError as exc:
+            self.skipTest(f"openpyxl no disponible: {exc}")
+        self._run("init")
+        xlsx = Path(self._tmpdir.name) / "minutas.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Minutas"
+        ws.append(excel_minutas.HEADERS)
+        ws.append(["M1", "Arroz", 10, 10])
+        ws.append(["M1", "No existe", 5, 5])
+        wb.save(xlsx)
+
+        code, out, _ = self._run("importar-minutas", str(xlsx))
+        self.assertEqual(code, 0)
+        code, out, _ = self._run("importar-minutas", str(xlsx), "--estricto")
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(out)["unknown_foods"], ["No existe"])
+
+    def test_cli_does_not_import_tkinter(self) -> None:
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, src.cli; print('tkinter' in sys.modules)"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
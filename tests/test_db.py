@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import models
+
+
+class ConnectionManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "test_minutas.db"
+        db.init_db()
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        self._tmpdir.cleanup()
+
+    def test_reuses_connection_per_thread_and_reopens_on_path_change(self) -> None:
+        first = db.get_connection()
+        self.assertIs(first, db.get_connection())
+        self.assertEqual(first.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(first.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+
+        other: list[object] = []
+        worker = threading.Thread(target=lambda: other.append(db.get_connection()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(other[0], first)
+
+        db.DB_PATH = db.DATA_DIR / "otra.db"
+        self.assertIsNot(db.get_connection(), first)
+
+    def test_transaction_groups_operations_and_rolls_back_on_error(self) -> None:
+        with db.transaction():
+            models.create_alimento("Arroz")
+            models.create_alimento("Lenteja")
+        self.assertEqual(models.count_alimentos(), 2)
+
+        with self.assertRaises(ValueError):
+            with db.transaction():
+                models.create_alimento("Avena")
+                models.create_alimento("arroz")
+        self.assertEqual(models.count_alimentos(), 2)
+        self.assertFalse(db.get_connection().in_transaction)
+
+    def test_nested_transaction_rolls_back_only_inner_block(self) -> None:
+        with db.transaction():
+            models.create_alimento("Arroz")
+            try:
+                with db.transaction():
+                    models.create_alimento("Avena")
+                    raise RuntimeError("falla interna")
+            except RuntimeError:
+                pass
+        nombres = [row["nombre"] for row in models.list_alimentos()]
+        self.assertEqual(nombres, ["Arroz"])
+
+    def test_duplicate_checks_use_normalized_names(self) -> None:
+        models.create_alimento("Limón")
+        with self.assertRaisesRegex(ValueError, "Ya existe"):
+            models.create_alimento("  limon ")
+
+        jardin_id = models.create_jardin("Jardín Sol")
+        models.create_jardin("Luna")
+        with self.assertRaisesRegex(ValueError, "Ya existe"):
+            models.rename_jardin(jardin_id, "LUNA")
+        models.rename_jardin(jardin_id, "Jardin Sol Naciente")
+        row = db.get_connection().execute(
+            "SELECT nombre_normalizado FROM jardines WHERE id = ?", (jardin_id,)
+        ).fetchone()
+        self.assertEqual(row[0], "jardin sol naciente")
+
+
+class SchemaMigrationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "test_minutas.db"
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        self._tmpdir.cleanup()
+
+    def test_current_schema_costs_a_single_query(self) -> None:
+        db.init_db()
+        self.assertEqual(db.schema_version(), db.SCHEMA_VERSION)
+
+        statements: list[str] = []
+        db.get_connection().set_trace_callback(statements.append)
+        try:
+            db.init_db()
+        finally:
+            db.get_connection().set_trace_callback(None)
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_migrates_legacy_layout_preserving_rows(self) -> None:
+        conn = db.get_connection()
+        conn.execute("CREATE TABLE alimentos (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE COLLATE NOCASE)")
+        conn.execute(
+            "CREATE TABLE minutas (id INTEGER PRIMARY KEY, jardin_id INTEGER, nombre TEXT NOT NULL, "
+            "fecha_creacion TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.execute(
+            "CREATE TABLE minuta_items (id INTEGER PRIMARY KEY, minuta_id INTEGER NOT NULL, "
+            "alimento_id INTEGER NOT NULL, gramos REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO alimentos(id, nombre) VALUES (1, 'Arroz')")
+        conn.execute("INSERT INTO alimentos(id, nombre) VALUES (2, 'Limón')")
+        conn.execute("INSERT INTO alimentos(id, nombre) VALUES (3, 'limon')")
+        conn.execute("INSERT INTO minutas(id, jardin_id, nombre) VALUES (7, 1, 'M1')")
+        conn.execute("INSERT INTO minuta_items(minuta_id, alimento_id, gramos) VALUES (7, 1, 40)")
+
+        db.init_db()
+
+        self.assertEqual(db.schema_version(), db.SCHEMA_VERSION)
+        self.assertNotIn("jardin_id", db._table_columns(conn, "minutas"))
+        items = models.list_minuta_items(7)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["gramos_1_2"], 40)
+        self.assertEqual(items[0]["gramos_3_5"], 40)
+        self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        normalizados = dict(conn.execute("SELECT id, nombre_normalizado FROM alimentos").fetchall())
+        self.assertEqual(normalizados, {1: "arroz", 2: "limon", 3: None})
+        self.assertEqual(models.find_alimento_id("LIMÓN"), 2)
+        self.assertEqual(models.find_minuta_id(" m1 "), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import diagnostics
+import models
+
+
+class DiagnosticsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "test_minutas.db"
+        db.init_db()
+        diagnostics.reset()
+
+    def tearDown(self) -> None:
+        diagnostics.uninstall()
+        diagnostics.reset()
+        db.close_connection()
+        self._tmpdir.cleanup()
+
+    def test_disabled_by_default_leaves_models_untouched(self) -> None:
+        original = models.list_alimentos
+        self.assertFalse(diagnostics.install_from_env())
+        self.assertIs(models.list_alimentos, original)
+
+        models.list_alimentos()
+        self.assertEqual(diagnostics.report()["functions"], [])
+
+    def test_records_functions_and_normalized_queries(self) -> None:
+        original = models.create_alimento
+        diagnostics.install()
+        self.assertIsNot(models.create_alimento, original)
+
+        models.create_alimento("Arroz")
+        models.create_alimento("Frijol")
+        models.list_alimentos()
+        list(models.iter_weekly_orders({}))
+
+        report = diagnostics.report()
+        by_function = {row["name"]: row for row in report["functions"]}
+        self.assertEqual(by_function["create_alimento"]["count"], 2)
+        self.assertIn("iter_weekly_orders", by_function)
+        inserts = [row for row in report["queries"] if row["name"].startswith("INSERT INTO alimentos")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(inserts[0]["count"], 2)
+
+        dumped = json.loads(diagnostics.dump(Path(self._tmpdir.name) / "diag.json").read_text(encoding="utf-8"))
+        self.assertTrue(dumped["enabled"])
+
+        diagnostics.uninstall()
+        self.assertIs(models.create_alimento, original)
+
+    def test_uninstall_detaches_other_threads_connections(self) -> None:
+        diagnostics.install()
+        opened = threading.Event()
+        uninstalled = threading.Event()
+        worker_conns: list[object] = []
+        recorded: list[list[dict]] = []
+
+        def worker() -> None:
+            worker_conns.append(db.get_connection())
+            opened.set()
+            uninstalled.wait(5)
+            db.get_connection().execute("SELECT COUNT(*) FROM alimentos").fetchone()
+            recorded.append(diagnostics.report()["queries"])
+            db.close_connection()
+
+        detached: list[tuple[object, int]] = []
+        detach = diagnostics._detach
+
+        def spy(conn) -> None:
+            detached.append((conn, threading.get_ident()))
+            detach(conn)
+
+        thread = threading.Thread(target=worker)
+        with mock.patch.object(diagnostics, "_detach", spy):
+            thread.start()
+            opened.wait(5)
+            diagnostics.uninstall()
+            diagnostics.reset()
+            uninstalled.set()
+            thread.join(5)
+
+        self.assertIn((worker_conns[0], thread.ident), detached)
+        self.assertIn((db.get_connection(), threading.get_ident()), detached)
+        self.assertEqual(recorded, [[]])
+
+    def test_generator_time_excludes_consumer(self) -> None:
+        jardin_id = models.create_jardin("Jardín")
+        minuta_id = models.create_minuta("Minuta")
+        alimento_ids = [models.create_alimento(f"Alimento {i}") for i in range(3)]
+        models.bulk_upsert_items([(minuta_id, alimento_id, 10, 20) for alimento_id in alimento_ids])
+        models.add_minuta_a_semana(jardin_id, minuta_id)
+        other = models.create_jardin("Otro")
+        models.add_minuta_a_semana(other, minuta_id)
+        diagnostics.install()
+        diagnostics.reset()
+
+        for _ in models.iter_weekly_orders({jardin_id: (1, 1), other: (1, 1)}):
+            time.sleep(0.05)
+
+        report = diagnostics.report()
+        by_function = {row["name"]: row for row in report["functions"]}
+        self.assertLess(by_function["iter_weekly_orders"]["total_ms"], 50)
+        selects = [row for row in report["queries"] if "jardin_semana_totales" in row["name"]]
+        self.assertEqual(len(selects), 1)
+        self.assertLess(selects[0]["total_ms"], 50)
+
+    def test_histogram_percentiles_use_rolling_window(self) -> None:
+        histogram = diagnostics.LatencyHistogram(window=10)
+        for value in range(1, 101):
+            histogram.add(float(value))
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["max_ms"], 100)
+        self.assertEqual(summary["p50_ms"], 96)
+        self.assertEqual(summary["p95_ms"], 100)
+
+    def test_normalize_sql_groups_bound_values(self) -> None:
+        self.assertEqual(
+            diagnostics.normalize_sql("SELECT id FROM alimentos WHERE nombre_normalizado IN ('a', 'b''c', 3)"),
+            "SELECT id FROM alimentos WHERE nombre_normalizado IN (?, ...)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
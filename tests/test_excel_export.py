@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import excel_pedidos
+import models
+
+
+class WeeklyOrderExportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "test_minutas.db"
+        db.init_db()
+
+        arroz_id = models.create_alimento("Arroz")
+        ahuyama_id = models.create_alimento("Ahuyama")
+        models.set_alimento_unidad(ahuyama_id, "lb", 500)
+        m1_id = models.create_minuta("M1")
+        m2_id = models.create_minuta("M2")
+        models.add_or_update_item(m1_id, arroz_id, 50, 70)
+        models.add_or_update_item(m2_id, ahuyama_id, 100, 120)
+
+        self.sol_id = models.create_jardin("Sol: sede [norte]")
+        self.luna_id = models.create_jardin("Luna")
+        models.add_minuta_a_semana(self.sol_id, m1_id)
+        models.add_minuta_a_semana(self.sol_id, m2_id)
+        models.add_minuta_a_semana(self.luna_id, m1_id)
+        self.ninos = {self.sol_id: (10, 5), self.luna_id: (1, 1)}
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        self._tmpdir.cleanup()
+
+    def test_xlsx_has_one_sheet_per_jardin_with_pedido_final(self) -> None:
+        try:
+            from openpyxl import load_workbook
+        except ModuleNotFoundError as exc:
+            self.skipTest(f"openpyxl no disponible: {exc}")
+
+        output = Path(self._tmpdir.name) / "pedido.xlsx"
+        self.assertEqual(excel_pedidos.export_weekly_orders_xlsx(output, self.ninos), 2)
+
+        wb = load_workbook(output, read_only=True)
+        self.assertEqual(sorted(wb.sheetnames), ["Luna", "Sol_ sede _norte_"])
+        rows = list(wb["Sol_ sede _norte_"].iter_rows(values_only=True))
+        wb.close()
+
+        self.assertEqual(list(rows[0]), excel_pedidos.PEDIDO_HEADERS)
+        by_name = {row[0]: row for row in rows[1:]}
+        self.assertEqual(by_name["Ahuyama"][7], 1600)
+        self.assertEqual(by_name["Ahuyama"][8], "3 lb")
+        self.assertEqual(by_name["Arroz"][7], 850)
+
+    def test_csv_export_for_a_single_jardin(self) -> None:
+        output = Path(self._tmpdir.name) / "pedido.csv"
+        count = excel_pedidos.export_weekly_orders_csv(output, self.ninos, [self.luna_id])
+
+        with output.open(newline="", encoding="utf-8-sig") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual(count, 1)
+        self.assertEqual([(row["jardin"], row["alimento"]) for row in rows], [("Luna", "Arroz")])
+        self.assertEqual(float(rows[0]["total_general"]), 120)
+
+    def test_sheet_titles_are_truncated_and_unique(self) -> None:
+        used: set[str] = set()
+        first = excel_pedidos._sheet_title("Jardín infantil con un nombre muy largo", used)
+        second = excel_pedidos._sheet_title("Jardín infantil con un nombre muy largo II", used)
+
+        self.assertEqual(len(first), 31)
+        self.assertLessEqual(len(second), 31)
+        self.assertNotEqual(first.casefold(), second.casefold())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,7 @@ class ExcelImportTest(unittest.TestCase):
         seed.seed_if_empty()
 
     def tearDown(self) -> None:
+        db.close_connection()
         self._tmpdir.cleanup()
 
     def _build_workbook(self, rows: list[list[object]]) -> Path:
@@ -91,6 +92,27 @@ class ExcelImportTest(unittest.TestCase):
         self.assertEqual(summary.empty_food_rows, 1)
         self.assertEqual(summary.unknown_foods, ["No existe"])
 
+    def test_import_matches_existing_minutas_by_name_key(self) -> None:
+        existing = models.create_minuta("Minuta Ñandú")
+        models.create_minuta("Minuta  ñandú")
+        xlsx = self._build_workbook(
+            [
+                ["MINUTA ÑANDÚ", "Arroz", 10, 10],
+                ["minuta ñandú", "Limon", 5, 5],
+                ["Minuta nueva", "Arroz", 3, 4],
+                ["Minuta nueva", "Limon", 6, 7],
+            ]
+        )
+
+        summary = excel_minutas.import_minutas(xlsx)
+
+        self.assertEqual(summary.minutas_created, 1)
+        self.assertEqual(summary.minutas_updated, 3)
+        self.assertEqual(models.count_minutas(), 3)
+        # Con nombres repetidos se usa la minuta más antigua.
+        self.assertEqual(len(models.list_minuta_items(existing)), 2)
+        self.assertEqual(len(models.list_minuta_items(models.find_minuta_id("minuta nueva"))), 2)
+
     def test_import_fails_with_missing_headers(self) -> None:
         try:
             from openpyxl import Workbook
@@ -108,6 +130,47 @@ class ExcelImportTest(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Faltan: gramos_grupo_2"):
             excel_minutas.import_minutas(output)
 
+    def test_import_reports_throttled_progress_by_phase(self) -> None:
+        foods = [row["nombre"] for row in models.list_alimentos()][:50]
+        rows = [[f"Minuta {i % 3}", foods[i % len(foods)], 10, 20] for i in range(1200)]
+        xlsx = self._build_workbook(rows)
+        calls: list[tuple[int, int | None, str]] = []
+
+        excel_minutas.import_minutas(xlsx, progress=lambda done, total, phase: calls.append((done, total, phase)))
+
+        reading = [call for call in calls if call[2] == excel_minutas.PHASE_READING]
+        writing = [call for call in calls if call[2] == excel_minutas.PHASE_WRITING]
+        self.assertLessEqual(len(reading), 1200 // excel_minutas.PROGRESS_EVERY_ROWS + 2)
+        self.assertEqual([done for done, _, _ in reading], sorted(done for done, _, _ in reading))
+        self.assertEqual(reading[-1][:2], (1200, 1200))
+        self.assertEqual(reading[1][1], 1200)
+        self.assertEqual(writing[-1][:2], (150, 150))
+
+    def test_cancelled_import_leaves_no_partial_minutas(self) -> None:
+        models.create_minuta("Existente")
+        xlsx = self._build_workbook([["Nueva", "Arroz", 10, 20], ["Existente", "Arroz", 5, 5]])
+        token = excel_minutas.CancelToken()
+
+        def cancel_when_writing(_done: int, _total: int | None, phase: str) -> None:
+            if phase == excel_minutas.PHASE_WRITING:
+                token.cancel()
+
+        with self.assertRaises(excel_minutas.ImportCancelled):
+            excel_minutas.import_minutas(xlsx, progress=cancel_when_writing, cancel=token)
+
+        self.assertEqual([row["nombre"] for row in models.list_minutas()], ["Existente"])
+        self.assertEqual(db.get_connection().execute("SELECT COUNT(*) FROM minuta_items").fetchone()[0], 0)
+
+    def test_cancelled_group_import_does_not_write(self) -> None:
+        minuta_id = models.create_minuta("Minuta 1")
+        xlsx = self._build_group_workbook([["Arroz", 33]])
+        token = excel_minutas.CancelToken()
+        token.cancel()
+
+        with self.assertRaises(excel_minutas.ImportCancelled):
+            excel_minutas.import_minuta_group(xlsx, minuta_id=minuta_id, grupo="g1", cancel=token)
+        self.assertEqual(models.list_minuta_items(minuta_id), [])
+
     def test_group_import_allows_loading_each_age_group_separately(self) -> None:
         minuta_id = models.create_minuta("Minuta 1")
         xlsx = self._build_group_workbook(
@@ -147,6 +210,99 @@ class ExcelImportTest(unittest.TestCase):
         self.assertEqual(rows["Pimentón"]["gramos_3_5"], 20)
         self.assertEqual(rows["Lenteja"]["gramos_3_5"], 10)
 
+    def test_group_import_is_all_or_nothing_on_invalid_row(self) -> None:
+        minuta_id = models.create_minuta("Minuta 1")
+        xlsx = self._build_group_workbook(
+            [
+                ["Arroz", 33],
+                ["Lenteja", "abc"],
+            ]
+        )
+
+        with self.assertRaisesRegex(ValueError, "Fila 3"):
+            excel_minutas.import_minuta_group(xlsx, minuta_id=minuta_id, grupo="g1")
+
+        self.assertEqual(models.list_minuta_items(minuta_id), [])
+
+    def test_group_import_keeps_other_group_and_last_duplicate_wins(self) -> None:
+        minuta_id = models.create_minuta("Minuta 1")
+        arroz_id = next(row["id"] for row in models.list_alimentos() if row["nombre"] == "Arroz")
+        models.add_or_update_item(minuta_id, arroz_id, 10, 20)
+        xlsx = self._build_group_workbook(
+            [
+                ["Arroz", 30],
+                ["arroz", 35],
+            ]
+        )
+
+        summary = excel_minutas.import_minuta_group(xlsx, minuta_id=minuta_id, grupo="g1")
+
+        self.assertEqual(summary.rows_imported, 2)
+        self.assertEqual(summary.foods_detected, 2)
+        rows = models.list_minuta_items(minuta_id)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["gramos_1_2"], 35)
+        self.assertEqual(rows[0]["gramos_3_5"], 20)
+
+    def test_staged_group_import_applies_mapping_without_rereading(self) -> None:
+        minuta_id = models.create_minuta("Minuta 1")
+        xlsx = self._build_group_workbook(
+            [
+                ["Arroz", 30],
+                ["Frijol", 10],
+                ["Frijol", 12],
+            ]
+        )
+
+        staged = excel_minutas.stage_minuta_group(xlsx, grupo="g1")
+        xlsx.unlink()
+
+        self.assertEqual(staged.unknown_foods(), ["Frijol"])
+        self.assertEqual(staged.unknown_foods({"Frijol": "Lenteja"}), [])
+        self.assertEqual(models.list_minuta_items(minuta_id), [])
+
+        summary = excel_minutas.apply_minuta_group(staged, minuta_id, food_mapping={"Frijol": "Lenteja"})
+
+        self.assertEqual(summary.rows_processed, 3)
+        self.assertEqual(summary.rows_imported, 3)
+        self.assertEqual(summary.unknown_food_rows, 0)
+        rows = {row["alimento_nombre"]: row for row in models.list_minuta_items(minuta_id)}
+        self.assertEqual(rows["Arroz"]["gramos_1_2"], 30)
+        self.assertEqual(rows["Lenteja"]["gramos_1_2"], 12)
+
+    def test_manual_mapping_is_saved_as_alias_for_next_imports(self) -> None:
+        minuta_id = models.create_minuta("Minuta 1")
+        xlsx = self._build_group_workbook([["Fríjoles rojos", 10]])
+
+        first = excel_minutas.import_minuta_group(
+            xlsx, minuta_id=minuta_id, grupo="g1", food_mapping={"Fríjoles rojos": "Frijol rojo"}
+        )
+        self.assertEqual(first.rows_imported, 1)
+        self.assertIn("frijoles rojos", models.load_alias_map())
+
+        second = excel_minutas.import_minuta_group(xlsx, minuta_id=minuta_id, grupo="g2")
+        self.assertEqual(second.unknown_foods, [])
+        rows = {row["alimento_nombre"]: row for row in models.list_minuta_items(minuta_id)}
+        self.assertEqual(rows["Frijol rojo"]["gramos_3_5"], 10)
+
+        plain = self._build_workbook([["Minuta 2", "FRIJOLES ROJOS", 5, 6]])
+        self.assertEqual(excel_minutas.import_minutas(plain).unknown_foods, [])
+
+    def test_aliases_can_be_bulk_loaded_from_csv(self) -> None:
+        csv_path = Path(self._tmpdir.name) / "alias.csv"
+        csv_path.write_text(
+            "alias,alimento\nPapa pastusa,Papa común\nPollo pechuga,Pechuga de pollo\nX,No existe\n",
+            encoding="utf-8",
+        )
+
+        self.assertEqual(excel_minutas.import_aliases_csv(csv_path), 2)
+        aliases = models.load_alias_map()
+        self.assertEqual(aliases["papa pastusa"], models.find_alimento_id("Papa común"))
+
+        csv_path.write_text("nombre,alimento\n", encoding="utf-8")
+        with self.assertRaisesRegex(ValueError, "Faltan: alias"):
+            excel_minutas.import_aliases_csv(csv_path)
+
     def _build_group_workbook(self, rows: list[list[object]]) -> Path:
         try:
             from openpyxl import Workbook
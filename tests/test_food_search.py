@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import time
+import unittest
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from food_search import FoodSearchIndex
+from seed import INITIAL_FOODS
+from ui_food_search import IncrementalSearch
+
+LATENCY_BUDGET_MS = 10
+
+
+class FakeScheduler:
+    def __init__(self) -> None:
+        self.pending: dict[str, object] = {}
+        self._next = 0
+
+    def after(self, _ms: int, callback) -> str:
+        self._next += 1
+        token = f"after#{self._next}"
+        self.pending[token] = callback
+        return token
+
+    def after_cancel(self, token: str) -> None:
+        self.pending.pop(token, None)
+
+    def fire(self) -> None:
+        callbacks, self.pending = list(self.pending.values()), {}
+        for callback in callbacks:
+            callback()
+
+
+class FoodSearchIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = FoodSearchIndex(enumerate(INITIAL_FOODS, start=1))
+
+    def _names(self, query: str, limit: int = 50) -> list[str]:
+        return [hit.nombre for hit in self.index.search(query, limit)]
+
+    def test_prefix_and_token_matches_ignore_accents_and_case(self) -> None:
+        self.assertEqual(self._names("AZUCAR"), ["Azúcar, blanco", "Leche condensada azucarada"])
+        self.assertEqual(self._names("leche en pol"), ["Leche en polvo entera de vaca"])
+        self.assertEqual(
+            self._names("pul mad"),
+            [
+                "Durazno maduro, pulpa",
+                "Mango, maduro pulpa",
+                "Manzana, maduro pulpa",
+                "Papaya, maduro pulpa",
+                "Pera, maduro pulpa",
+            ],
+        )
+        self.assertEqual(self._names("xyz"), [])
+
+    def test_names_starting_with_the_query_come_first(self) -> None:
+        names = self._names("pan")
+        self.assertEqual(names[:4], ["Pan aliñado", "Pan Coco", "Pan dulce, regular horneado", "Pan tajado"])
+        self.assertIn("Panela", names)
+
+    def test_results_are_capped_and_exact_lookup_uses_normalized_names(self) -> None:
+        self.assertEqual(len(self.index.search("", limit=10)), 10)
+        self.assertEqual(len(self.index.search("a", limit=3)), 3)
+        hit = self.index.find_exact("  arroz ")
+        self.assertEqual(hit.nombre, "Arroz")
+        self.assertIsNone(self.index.find_exact("arr"))
+
+    def test_keystroke_latency_on_50k_foods(self) -> None:
+        names = [f"{food} {serial}" for serial in range(50_000 // len(INITIAL_FOODS) + 1) for food in INITIAL_FOODS]
+        index = FoodSearchIndex(enumerate(names[:50_000]))
+        typed = "leche en polvo"
+        worst = 0.0
+        for end in range(1, len(typed) + 1):
+            started = time.perf_counter()
+            hits = index.search(typed[:end])
+            worst = max(worst, (time.perf_counter() - started) * 1000)
+            self.assertLessEqual(len(hits), 50)
+        for query in ("1", "a 1", "de 12", "cruda"):
+            started = time.perf_counter()
+            index.search(query)
+            worst = max(worst, (time.perf_counter() - started) * 1000)
+        self.assertLess(worst, LATENCY_BUDGET_MS)
+
+
+class IncrementalSearchTest(unittest.TestCase):
+    def test_keystrokes_are_debounced_into_one_search(self) -> None:
+        scheduler = FakeScheduler()
+        text = {"value": ""}
+        results: list[list[str]] = []
+        search = IncrementalSearch(
+            scheduler,
+            lambda: text["value"],
+            lambda hits: results.append([hit.nombre for hit in hits]),
+            index=FoodSearchIndex(enumerate(INITIAL_FOODS)),
+        )
+
+        for value in ("c", "ca", "can"):
+            text["value"] = value
+            search.schedule()
+        self.assertEqual(len(scheduler.pending), 1)
+        scheduler.fire()
+
+        self.assertEqual(results, [["Canela"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import models
+from fuzzy_match import FoodMatcher
+from seed import INITIAL_FOODS
+
+
+class FoodMatcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.matcher = FoodMatcher(enumerate(INITIAL_FOODS, start=1))
+
+    def test_ranks_closest_catalog_entries_first(self) -> None:
+        self.assertEqual(self.matcher.match("Fríjol  ROJO")[0].nombre, "Frijol rojo")
+        self.assertEqual(self.matcher.match("pimenton rojo")[0].nombre, "Pimentón")
+        self.assertEqual(self.matcher.match("Zanahorias")[0].nombre, "Zanahoria")
+
+        scores = [match.score for match in self.matcher.match("Leche entera", limit=5)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_precomputed_keys_match_like_normalizing(self) -> None:
+        keys = [models.normalize_food_name(nombre) for nombre in INITIAL_FOODS]
+        with_keys = FoodMatcher(enumerate(INITIAL_FOODS, start=1), keys)
+        for query in ("Fríjol  ROJO", "pimenton rojo", "Leche entera"):
+            self.assertEqual(with_keys.match(query), self.matcher.match(query))
+
+    def test_best_match_respects_threshold(self) -> None:
+        exact = self.matcher.best_match("arroz")
+        self.assertIsNotNone(exact)
+        self.assertEqual(exact.nombre, "Arroz")
+        self.assertEqual(exact.score, 1.0)
+        self.assertIsNone(self.matcher.best_match("Quinua"))
+        self.assertEqual(self.matcher.match("   "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
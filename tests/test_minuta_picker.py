@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from ui_minuta_picker import selection_order
+
+
+class SelectionOrderTest(unittest.TestCase):
+    def test_keeps_click_order_not_listing_order(self) -> None:
+        order = selection_order([], [4])
+        order = selection_order(order, (1, 4))
+        order = selection_order(order, (1, 3, 4))
+        self.assertEqual(order, [4, 1, 3])
+
+    def test_deselecting_keeps_the_rest_in_place(self) -> None:
+        self.assertEqual(selection_order([4, 1, 3], (3, 4)), [4, 3])
+
+    def test_shift_range_is_added_in_listing_order(self) -> None:
+        self.assertEqual(selection_order([7], (7, 2, 3, 4)), [7, 2, 3, 4])
+
+    def test_plain_click_restarts_the_order(self) -> None:
+        self.assertEqual(selection_order([4, 1, 3], (2,)), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
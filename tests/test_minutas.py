@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import db
+import models
+from seed import seed_if_empty
+
+
+class MinutasPagingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._old_data_dir = db.DATA_DIR
+        self._old_db_path = db.DB_PATH
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "minutas.db"
+        db.init_db()
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        db.DATA_DIR = self._old_data_dir
+        db.DB_PATH = self._old_db_path
+        self._tmpdir.cleanup()
+
+    def _insert_minutas(self, count: int) -> None:
+        # Pocas fechas distintas para que el cursor tenga que desempatar por id.
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO minutas(nombre, fecha_creacion) VALUES (?, ?)",
+                [(f"Minuta {i}", f"2024-01-0{1 + i % 3} 08:00:00") for i in range(count)],
+            )
+
+    def test_create_minuta_has_no_cap_by_default(self) -> None:
+        for i in range(30):
+            models.create_minuta(f"Minuta {i}")
+        self.assertEqual(models.count_minutas(), 30)
+
+    def test_configured_cap_is_enforced(self) -> None:
+        with mock.patch.object(models, "MAX_MINUTAS", 2):
+            models.create_minuta("Uno")
+            models.create_minuta("Dos")
+            with self.assertRaises(ValueError):
+                models.create_minuta("Tres")
+        self.assertEqual(models.count_minutas(), 2)
+
+    def test_has_minutas_ignores_excluded_ids(self) -> None:
+        self.assertFalse(models.has_minutas())
+        uno = models.create_minuta("Uno")
+        dos = models.create_minuta("Dos")
+        self.assertTrue(models.has_minutas())
+        self.assertTrue(models.has_minutas(exclude=[uno]))
+        self.assertFalse(models.has_minutas(exclude=[uno, dos]))
+
+    def test_pages_cover_listing_in_order_without_repeats(self) -> None:
+        self._insert_minutas(250)
+
+        pages: list[list[int]] = []
+        cursor = None
+        while True:
+            rows = models.list_minutas_page(40, cursor)
+            if not rows:
+                break
+            pages.append([row["id"] for row in rows])
+            cursor = models.minuta_cursor(rows[-1])
+
+        self.assertEqual([len(page) for page in pages], [40] * 6 + [10])
+        self.assertEqual([i for page in pages for i in page], [row["id"] for row in models.list_minutas()])
+
+    def test_minuta_pages_are_index_ranges(self) -> None:
+        self._insert_minutas(50)
+        conn = db.get_connection()
+        conn.execute("ANALYZE")
+        first = models.list_minutas_page(10)
+        queries: list[str] = []
+        conn.set_trace_callback(queries.append)
+        try:
+            models.list_minutas_page(10)
+            models.list_minutas_page(10, models.minuta_cursor(first[-1]))
+        finally:
+            conn.set_trace_callback(None)
+
+        for query in queries:
+            plan = " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}"))
+            self.assertIn("idx_minutas_fecha_creacion", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_minuta_item_pages_follow_full_listing(self) -> None:
+        seed_if_empty()
+        minuta_id = models.create_minuta("Con ítems")
+        alimento_ids = [row["id"] for row in models.list_alimentos()[:23]]
+        models.bulk_upsert_items([(minuta_id, alimento_id, 10, 20) for alimento_id in alimento_ids])
+
+        items: list[int] = []
+        cursor = None
+        while rows := models.list_minuta_items_page(minuta_id, 5, cursor):
+            items.extend(row["id"] for row in rows)
+            cursor = models.minuta_item_cursor(rows[-1])
+
+        self.assertEqual(items, [row["id"] for row in models.list_minuta_items(minuta_id)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+"""Planes de consulta de ``models`` y de los triggers.
+
+Cada función pública de ``models`` que toca la base se ejecuta sobre una base
+con datos; cada sentencia que emite pasa por ``EXPLAIN QUERY PLAN`` y el test
+falla si alguna recorre entera una tabla que crece con el uso. Los listados
+completos declaran qué tablas pueden recorrer.
+"""
+from __future__ import annotations
+
+import inspect
+import re
+import tempfile
+import unittest
+from collections.abc import Callable
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import db
+import models
+import unidades
+
+LARGE_TABLES = {
+    "alimentos",
+    "jardines",
+    "minutas",
+    "minuta_items",
+    "jardin_minutas_semana",
+    "jardin_semana_totales",
+    "alimento_alias",
+    "alimento_unidades",
+}
+
+# Funciones sin SQL.
+NO_SQL = {"normalize_name", "normalize_food_name", "minuta_key", "minuta_cursor", "minuta_item_cursor"}
+
+# Recorridos completos esperados, por función.
+FULL_SCANS: dict[str, set[str]] = {
+    "list_alimentos": {"alimentos"},
+    "load_alias_map": {"alimento_alias"},
+    "list_alimento_unidades": {"alimentos", "alimento_unidades"},
+    "count_alimentos": {"alimentos"},
+    "list_jardines": {"jardines"},
+    "list_minutas": {"minutas"},
+    # Recorre idx_minutas_fecha_creacion en orden y corta en LIMIT.
+    "list_minutas_page": {"minutas"},
+    "count_minutas": {"minutas"},
+    # EXISTS corta en la primera fila que cumple.
+    "has_minutas": {"minutas"},
+    "iter_weekly_orders": {"jardin_semana_totales"},
+    "check_weekly_totals": {"jardin_minutas_semana", "minuta_items", "jardin_semana_totales"},
+    "rebuild_weekly_totals": {"jardin_minutas_semana", "minuta_items", "jardin_semana_totales"},
+}
+
+_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+_SCAN = re.compile(r"^SCAN (\w+)")
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+
+
+def scanned_tables(conn, statement: str, params: tuple = ()) -> set[str]:
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(statement):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    scanned = set()
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", params):
+        match = _SCAN.match(row["detail"])
+        if match:
+            scanned.add(aliases.get(match.group(1), match.group(1)))
+    return scanned & LARGE_TABLES
+
+
+class QueryPlanTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._old_data_dir = db.DATA_DIR
+        self._old_db_path = db.DB_PATH
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "plans.db"
+        db.init_db()
+        self._populate()
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        db.DATA_DIR = self._old_data_dir
+        db.DB_PATH = self._old_db_path
+        self._tmpdir.cleanup()
+
+    def _populate(self) -> None:
+        conn = db.get_connection()
+        with db.transaction():
+            conn.executemany(
+                "INSERT INTO alimentos(nombre, nombre_normalizado) VALUES (?, ?)",
+                [(f"Alimento {i:03d}", f"alimento {i:03d}") for i in range(200)],
+            )
+            conn.executemany(
+                "INSERT INTO jardines(nombre, nombre_normalizado) VALUES (?, ?)",
+                [(f"Jardín {i:02d}", f"jardin {i:02d}") for i in range(20)],
+            )
+            conn.executemany(
+                "INSERT INTO minutas(nombre, nombre_clave) VALUES (?, ?)",
+                [(f"Minuta {i:02d}", f"minuta {i:02d}") for i in range(40)],
+            )
+            conn.executemany(
+                "INSERT INTO minuta_items(minuta_id, alimento_id, gramos_1_2, gramos_3_5) VALUES (?, ?, ?, ?)",
+                [(m, 1 + (m * 7 + k) % 200, 10, 20) for m in range(1, 41) for k in range(15)],
+            )
+            conn.executemany(
+                "INSERT INTO jardin_minutas_semana(jardin_id, minuta_id, orden) VALUES (?, ?, ?)",
+                [(j, 1 + (j + k) % 40, k + 1) for j in range(1, 21) for k in range(4)],
+            )
+            conn.executemany(
+                "INSERT INTO alimento_alias(alias_normalizado, alimento_id) VALUES (?, ?)",
+                [(f"alias {i:03d}", i) for i in range(1, 51)],
+            )
+            conn.executemany(
+                "INSERT INTO alimento_unidades(alimento_id, unidad, gramos_por_unidad) VALUES (?, 'lb', 500)",
+                [(i,) for i in range(1, 51)],
+            )
+
+    def _cases(self) -> dict[str, Callable[[], object]]:
+        item_id = models.list_minuta_items(1)[0]["id"]
+        first_items = models.list_minuta_items_page(2, 5)
+        first_minutas = models.list_minutas_page(10)
+        return {
+            "find_alimento_ids": lambda: models.find_alimento_ids(["alimento 001", "no existe"]),
+            "find_alimento_id": lambda: models.find_alimento_id("Alimento 002"),
+            "list_alimentos": models.list_alimentos,
+            "create_alimento": lambda: models.create_alimento("Alimento nuevo"),
+            "delete_alimento": lambda: models.delete_alimento(199),
+            "load_alias_map": models.load_alias_map,
+            "save_food_aliases": lambda: models.save_food_aliases({"Otro alias": "Alimento 003"}),
+            "save_alimento_unidades": lambda: models.save_alimento_unidades([(60, "kg", 1000, "arriba", None)]),
+            "set_alimento_unidad": lambda: models.set_alimento_unidad(61, "lb", 500),
+            "clear_alimento_unidad": lambda: models.clear_alimento_unidad(1),
+            "list_alimento_unidades": models.list_alimento_unidades,
+            "count_alimentos": models.count_alimentos,
+            "list_jardines": models.list_jardines,
+            "create_jardin": lambda: models.create_jardin("Jardín nuevo"),
+            "rename_jardin": lambda: models.rename_jardin(2, "Jardín renombrado"),
+            "delete_jardin": lambda: models.delete_jardin(20),
+            "list_minutas": models.list_minutas,
+            "list_minutas_page": lambda: models.list_minutas_page(10, models.minuta_cursor(first_minutas[-1])),
+            "find_minuta_ids": lambda: models.find_minuta_ids(["minuta 01", "minuta 02", "no existe"]),
+            "find_minuta_id": lambda: models.find_minuta_id("MINUTA  03"),
+            "create_minuta": lambda: models.create_minuta("Minuta nueva"),
+            "count_minutas": models.count_minutas,
+            "has_minutas": lambda: models.has_minutas(exclude=[1, 2, 3]),
+            "get_minuta": lambda: models.get_minuta(3),
+            "update_minuta_nombre": lambda: models.update_minuta_nombre(3, "Minuta renombrada"),
+            "delete_minuta": lambda: models.delete_minuta(40),
+            "list_minuta_items": lambda: models.list_minuta_items(2),
+            "list_minuta_items_page": lambda: models.list_minuta_items_page(
+                2, 5, models.minuta_item_cursor(first_items[-1])
+            ),
+            "add_or_update_item": lambda: models.add_or_update_item(4, 150, 11, 22),
+            "bulk_upsert_items": lambda: models.bulk_upsert_items([(5, 151, 11, 22), (5, 152, 12, 23)]),
+            "update_item_gramos": lambda: models.update_item_gramos(item_id, 12, 24),
+            "add_or_update_item_by_group": lambda: models.add_or_update_item_by_group(6, 153, "g1", 30),
+            "bulk_upsert_items_by_group": lambda: models.bulk_upsert_items_by_group(6, "g2", [(154, 40)]),
+            "remove_item": lambda: models.remove_item(item_id),
+            "list_jardin_minutas_semana": lambda: models.list_jardin_minutas_semana(3),
+            "add_minuta_a_semana": lambda: models.add_minuta_a_semana(3, 30),
+            "remove_minuta_de_semana": lambda: models.remove_minuta_de_semana(4, 6),
+            "move_minuta_en_semana": lambda: models.move_minuta_en_semana(7, 11, 1),
+            "shift_minuta_en_semana": lambda: models.shift_minuta_en_semana(7, 9, 1),
+            "reorder_semana": lambda: models.reorder_semana(8, [12, 11, 10, 9]),
+            "assign_minutas_a_jardines": lambda: models.assign_minutas_a_jardines([9, 10, 11], [20, 21]),
+            "copy_semana": lambda: models.copy_semana(12, [13, 14, 15]),
+            "calculate_weekly_order": lambda: models.calculate_weekly_order([1, 2, 3], 10, 20),
+            "calculate_weekly_order_for_jardin": lambda: models.calculate_weekly_order_for_jardin(5, 10, 20),
+            "iter_weekly_orders": lambda: list(models.iter_weekly_orders({5: (10, 20)}, default_ninos=(1, 1))),
+            "calculate_weekly_orders_bulk": lambda: models.calculate_weekly_orders_bulk({5: (1, 2), 6: (3, 4)}, [5, 6]),
+            "check_weekly_totals": models.check_weekly_totals,
+            "rebuild_weekly_totals": models.rebuild_weekly_totals,
+        }
+
+    def test_every_models_query_is_covered(self) -> None:
+        public = {
+            name
+            for name, value in vars(models).items()
+            if inspect.isfunction(value) and value.__module__ == "models" and not name.startswith("_")
+        }
+        self.assertEqual(public - NO_SQL, set(self._cases()))
+
+    def test_models_queries_do_not_scan_large_tables(self) -> None:
+        conn = db.get_connection()
+        for name, call in self._cases().items():
+            # Con la tabla de unidades ya en memoria (es de unidades.py), los
+            # pedidos sólo leen su versión.
+            unidades.load_unidades()
+            statements: list[str] = []
+            conn.set_trace_callback(statements.append)
+            try:
+                call()
+            finally:
+                conn.set_trace_callback(None)
+            executed = [s for s in dict.fromkeys(statements) if not s.lstrip().upper().startswith(_CONTROL)]
+            with self.subTest(name):
+                self.assertTrue(executed, "no ejecutó ninguna consulta")
+                for statement in executed:
+                    unexpected = scanned_tables(conn, statement) - FULL_SCANS.get(name, set())
+                    self.assertFalse(unexpected, f"{statement.strip()[:200]}\nrecorre {sorted(unexpected)}")
+
+    def test_trigger_statements_do_not_scan_large_tables(self) -> None:
+        conn = db.get_connection()
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        self.assertTrue(triggers)
+        for name, sql in triggers:
+            body = sql[sql.index("BEGIN") + len("BEGIN") : sql.rindex("END")]
+            for statement in filter(str.strip, body.split(";")):
+                statement = re.sub(r"\b(?:NEW|OLD)\.\w+", "?", statement)
+                with self.subTest(trigger=name):
+                    unexpected = scanned_tables(conn, statement, (1,) * statement.count("?"))
+                    self.assertFalse(unexpected, f"{' '.join(statement.split())[:200]}\nrecorre {sorted(unexpected)}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import db
+import models
+import seed
+
+
+class SeedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._old_data_dir = db.DATA_DIR
+        self._old_db_path = db.DB_PATH
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "seed.db"
+        db.init_db()
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        db.DATA_DIR = self._old_data_dir
+        db.DB_PATH = self._old_db_path
+        self._tmpdir.cleanup()
+
+    def test_unchanged_seed_only_reads_its_metadata(self) -> None:
+        self.assertEqual(seed.seed_if_empty(), len(seed.INITIAL_FOODS))
+        self.assertEqual(seed.seed_state(), (seed.SEED_VERSION, seed.initial_checksum()))
+
+        statements: list[str] = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            self.assertEqual(seed.seed_if_empty(), 0)
+        finally:
+            conn.set_trace_callback(None)
+        self.assertEqual(len(statements), 1)
+        self.assertIn("seed_metadata", statements[0])
+
+    def test_deleted_seed_food_is_not_restored_until_the_seed_changes(self) -> None:
+        seed.seed_if_empty()
+        models.delete_alimento(models.find_alimento_id("Mora"))
+
+        seed.seed_if_empty()
+        self.assertIsNone(models.find_alimento_id("Mora"))
+
+        with mock.patch.object(seed, "SEED_VERSION", seed.SEED_VERSION + 1):
+            self.assertEqual(seed.seed_if_empty(), 1)
+        self.assertIsNotNone(models.find_alimento_id("Mora"))
+
+    def test_changed_seed_inserts_only_the_delta(self) -> None:
+        seed.seed_if_empty()
+        before = models.count_alimentos()
+
+        with mock.patch.object(seed, "INITIAL_FOODS", [*seed.INITIAL_FOODS, "Quinua", "  ARROZ "]):
+            self.assertEqual(seed.seed_if_empty(), 1)
+            self.assertEqual(seed.seed_if_empty(), 0)
+        self.assertEqual(models.count_alimentos(), before + 1)
+
+    def test_csv_catalog_loads_once_per_version(self) -> None:
+        path = Path(self._tmpdir.name) / "catalogo.csv"
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["codigo", "Alimento"])
+            writer.writerows([str(i), f"Alimento sintético {i}"] for i in range(5000))
+            writer.writerow(["x", "Alimento Sintético 1"])
+
+        self.assertEqual(seed.load_seed_csv(path), 5000)
+        self.assertEqual(seed.load_seed_csv(path), 0)
+        self.assertEqual(seed.seed_state("csv:catalogo.csv")[0], 1)
+        self.assertEqual(seed.load_seed_csv(path, version=2), 0)
+        self.assertEqual(seed.seed_state("csv:catalogo.csv")[0], 2)
+
+    def test_csv_without_alimento_column_is_rejected(self) -> None:
+        path = Path(self._tmpdir.name) / "malo.csv"
+        path.write_text("nombre\nArroz\n", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            seed.load_seed_csv(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
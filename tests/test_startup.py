@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import tempfile
+import textwrap
+import time
+import unittest
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import app
+import db
+from seed import seed_if_empty
+
+# Presupuestos generosos: detectan regresiones (imports pesados, trabajo de más
+# antes del primer dibujo), no pequeñas variaciones entre máquinas.
+FIRST_PAINT_BUDGET_MS = 1500
+PREPARE_BUDGET_MS = 250
+NO_DISPLAY_EXIT = 77
+
+LAZY_MODULES = (
+    "openpyxl",
+    "excel_minutas",
+    "excel_pedidos",
+    "ui_catalogo",
+    "ui_diagnosticos",
+    "ui_jardines",
+    "ui_minutas",
+    "ui_weekly_order",
+)
+
+
+class StartupTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._old_data_dir = db.DATA_DIR
+        self._old_db_path = db.DB_PATH
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "startup.db"
+        db.init_db()
+        seed_if_empty()
+        db.close_connection()
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        db.DATA_DIR = self._old_data_dir
+        db.DB_PATH = self._old_db_path
+        self._tmpdir.cleanup()
+
+    def _python(self, script: str) -> subprocess.CompletedProcess:
+        prelude = textwrap.dedent(
+            f"""
+            import json, sys
+            from pathlib import Path
+            sys.path.insert(0, {str(ROOT / "src")!r})
+            """
+        )
+        return subprocess.run(
+            [sys.executable, "-c", prelude + textwrap.dedent(script)],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+    def test_main_window_import_does_not_load_secondary_windows_or_openpyxl(self) -> None:
+        result = self._python(
+            f"""
+            import app, ui_main
+            print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))
+            """
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), [])
+
+    def test_database_preparation_on_seeded_database_fits_budget(self) -> None:
+        profile = app.StartupProfile(started=time.perf_counter())
+        app._prepare_database(profile)
+
+        phases = {row["fase"]: row["ms"] for row in profile.report()["fases"]}
+        self.assertEqual(set(phases), {"init_db", "seed_if_empty"})
+        self.assertLess(sum(phases.values()), PREPARE_BUDGET_MS, phases)
+
+    def test_cold_start_to_first_main_window_paint_fits_budget(self) -> None:
+        result = self._python(
+            f"""
+            import app
+            import db
+            import tkinter as tk
+
+            db.DATA_DIR = Path({str(db.DATA_DIR)!r})
+            db.DB_PATH = Path({str(db.DB_PATH)!r})
+            try:
+                root = tk.Tk()
+            except tk.TclError:
+                sys.exit({NO_DISPLAY_EXIT})
+            profile = app.StartupProfile()
+            app.start(root, profile, on_ready=root.quit)
+            root.after({FIRST_PAINT_BUDGET_MS * 4}, root.quit)
+            root.mainloop()
+            print(json.dumps({{
+                "paint": profile.elapsed_ms("primer dibujo"),
+                "ready": profile.elapsed_ms("base lista"),
+            }}))
+            """
+        )
+        if result.returncode == NO_DISPLAY_EXIT:
+            self.skipTest("Tk no puede abrir una ventana en este entorno")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        timings = json.loads(result.stdout)
+        self.assertIsNotNone(timings["paint"], "la ventana principal nunca se dibujó")
+        self.assertIsNotNone(timings["ready"], "la base no quedó lista")
+        self.assertLess(timings["paint"], FIRST_PAINT_BUDGET_MS, timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ui_tasks import ProgressState, TaskRunner
+
+
+class FakeScheduler:
+    """Sustituto de ``widget.after`` que ejecuta los callbacks al llamar a ``run_until_idle``."""
+
+    def __init__(self) -> None:
+        self.callbacks: list = []
+        self.thread_ids: list[int] = []
+
+    def after(self, _ms: int, callback) -> None:
+        self.callbacks.append(callback)
+
+    def run_until_idle(self, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.callbacks:
+            if time.monotonic() > deadline:
+                raise AssertionError("Las tareas no terminaron a tiempo.")
+            callback = self.callbacks.pop(0)
+            time.sleep(0.005)
+            callback()
+
+
+class TaskRunnerTest(unittest.TestCase):
+    def test_results_and_errors_are_delivered_on_the_polling_thread(self) -> None:
+        scheduler = FakeScheduler()
+        runner = TaskRunner(scheduler, poll_ms=1)
+        results: list = []
+        worker_threads: list[int] = []
+
+        def work(value: int) -> int:
+            worker_threads.append(threading.get_ident())
+            return value * 2
+
+        def fail() -> None:
+            raise ValueError("fallo")
+
+        runner.submit(work, 21, on_success=lambda result: results.append((threading.get_ident(), result)))
+        runner.submit(fail, on_error=lambda exc: results.append((threading.get_ident(), str(exc))))
+        self.assertTrue(runner.busy)
+
+        scheduler.run_until_idle()
+
+        main_thread = threading.get_ident()
+        self.assertFalse(runner.busy)
+        self.assertNotIn(main_thread, worker_threads)
+        self.assertEqual(sorted(results, key=str), sorted([(main_thread, 42), (main_thread, "fallo")], key=str))
+
+    def test_callbacks_are_dropped_when_the_widget_is_gone(self) -> None:
+        scheduler = FakeScheduler()
+        scheduler.winfo_exists = lambda: False
+        runner = TaskRunner(scheduler, poll_ms=1)
+        results: list = []
+
+        runner.submit(lambda: 1, on_success=results.append)
+        scheduler.run_until_idle()
+
+        self.assertEqual(results, [])
+        self.assertFalse(runner.busy)
+
+    def test_progress_state_keeps_the_latest_report_from_the_worker(self) -> None:
+        scheduler = FakeScheduler()
+        runner = TaskRunner(scheduler, poll_ms=1)
+        progress = ProgressState()
+
+        def work() -> None:
+            for done in range(0, 1001, 500):
+                progress(done, 1000, "leyendo")
+
+        runner.submit(work)
+        scheduler.run_until_idle()
+
+        self.assertEqual(progress.value, (1000, 1000, "leyendo"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from ui_virtual_table import ColumnStore, Diff
+
+
+def _rows(store: ColumnStore) -> list[tuple]:
+    return [store.row(position) for position in range(len(store))]
+
+
+class ColumnStoreTest(unittest.TestCase):
+    def test_replace_reports_only_the_rows_that_differ(self) -> None:
+        store = ColumnStore(["alimento", "g1"])
+        self.assertEqual(store.replace([(1, ("Arroz", 10)), (2, ("Papa", 20)), (3, ("Sal", 1))]), Diff(added=3))
+
+        diff = store.replace([(1, ("Arroz", 10)), (3, ("Sal", 2)), (4, ("Mora", 5))])
+
+        self.assertEqual(diff, Diff(added=1, changed=1, removed=1))
+        self.assertEqual(store.keys(), [1, 3, 4])
+        self.assertEqual(store.get(3), ("Sal", 2))
+        self.assertIsNone(store.get(2))
+        self.assertFalse(store.replace([(1, ("Arroz", 10)), (3, ("Sal", 2)), (4, ("Mora", 5))]))
+
+    def test_sort_numbers_and_text_and_keep_it_across_updates(self) -> None:
+        store = ColumnStore(["alimento", "g1"])
+        store.replace([(1, ("papa", 20.5)), (2, ("Arroz", 3)), (3, ("mora", "")), (4, ("Banano", 100))])
+
+        store.sort("g1")
+        self.assertEqual(store.keys(), [2, 1, 4, 3])
+        store.sort("alimento", reverse=True)
+        self.assertEqual(store.keys(), [1, 3, 4, 2])
+
+        store.upsert([(5, ("Zanahoria", 1)), (2, ("Yuca", 3))])
+        self.assertEqual(store.keys(), [5, 2, 1, 3, 4])
+        self.assertEqual(store.position_of(4), 4)
+        self.assertEqual(_rows(store)[1], ("Yuca", 3))
+
+    def test_remove_compacts_and_keeps_view_order(self) -> None:
+        store = ColumnStore(["alimento"])
+        store.replace([(key, (f"A{key:03d}",)) for key in range(100)])
+        store.sort("alimento", reverse=True)
+
+        self.assertEqual(store.remove([99, 50, 1000]), Diff(removed=2))
+
+        self.assertEqual(len(store), 98)
+        self.assertEqual(store.keys()[:2], [98, 97])
+        self.assertEqual(store.position_of(49), 98 - 1 - 49)
+        self.assertNotIn(50, store)
+
+    def test_rows_with_wrong_width_are_rejected(self) -> None:
+        store = ColumnStore(["alimento", "g1"])
+        with self.assertRaises(ValueError):
+            store.replace([(1, ("Arroz",))])
+        with self.assertRaises(ValueError):
+            store.sort("g9")
+
+
+if __name__ == "__main__":
+    unittest.main()
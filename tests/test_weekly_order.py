@@ -10,7 +10,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 import db
 import models
-from ui_weekly_order import format_pedido_final
+import seed
+import unidades
 
 
 class WeeklyOrderUnionTest(unittest.TestCase):
@@ -21,6 +22,7 @@ class WeeklyOrderUnionTest(unittest.TestCase):
         db.init_db()
 
     def tearDown(self) -> None:
+        db.close_connection()
         self._tmpdir.cleanup()
 
     def test_includes_food_present_in_only_one_selected_minuta(self) -> None:
@@ -72,17 +74,319 @@ class WeeklyOrderUnionTest(unittest.TestCase):
         self.assertEqual(by_name_2["Arroz"]["total_general"], 30 * 4)
         self.assertEqual(by_name_2["Frijol"]["total_general"], 20 * 4)
 
+    def test_bulk_orders_match_single_jardin_calculation(self) -> None:
+        arroz_id = models.create_alimento("Arroz")
+        frijol_id = models.create_alimento("Frijol")
+        m1_id = models.create_minuta("M1")
+        m2_id = models.create_minuta("M2")
+        models.add_or_update_item(m1_id, arroz_id, 50, 70)
+        models.add_or_update_item(m2_id, arroz_id, 25, 30)
+        models.add_or_update_item(m2_id, frijol_id, 10, 20)
+
+        j1_id = models.create_jardin("J1")
+        j2_id = models.create_jardin("J2")
+        j3_id = models.create_jardin("J3")
+        models.add_minuta_a_semana(j1_id, m1_id)
+        models.add_minuta_a_semana(j1_id, m2_id)
+        models.add_minuta_a_semana(j2_id, m2_id)
+
+        ninos = {j1_id: (10, 5), j2_id: (3, 4)}
+        pedidos = models.calculate_weekly_orders_bulk(ninos)
+
+        self.assertEqual(set(pedidos), {j1_id, j2_id})
+        self.assertEqual(pedidos[j1_id], models.calculate_weekly_order([m1_id, m2_id], 10, 5))
+        self.assertEqual(pedidos[j2_id], models.calculate_weekly_order([m2_id], 3, 4))
+
+        subset = dict(models.iter_weekly_orders({**ninos, j3_id: (1, 1)}, jardin_ids=[j2_id, j3_id]))
+        self.assertEqual(list(subset), [j2_id])
+
+        with self.assertRaises(ValueError):
+            models.calculate_weekly_orders_bulk({j1_id: (-1, 0)})
+
+    def test_missing_ninos_are_an_error_unless_a_default_is_given(self) -> None:
+        arroz_id = models.create_alimento("Arroz")
+        minuta_id = models.create_minuta("M1")
+        models.add_or_update_item(minuta_id, arroz_id, 50, 70)
+        j1_id = models.create_jardin("J1")
+        j2_id = models.create_jardin("J2")
+        models.add_minuta_a_semana(j1_id, minuta_id)
+        models.add_minuta_a_semana(j2_id, minuta_id)
+
+        # Se valida al llamar, antes de consumir el generador.
+        with self.assertRaises(ValueError):
+            models.iter_weekly_orders({j1_id: (1, 1)}, [j1_id, j2_id])
+        with self.assertRaises(ValueError):
+            models.iter_weekly_orders({j1_id: (-1, 1)})
+        with self.assertRaises(ValueError):
+            models.calculate_weekly_orders_bulk({j1_id: (1, 1)})
+
+        pedidos = models.calculate_weekly_orders_bulk({j1_id: (1, 1)}, default_ninos=(0, 2))
+        self.assertEqual(pedidos[j1_id][0]["total_general"], 120)
+        self.assertEqual(pedidos[j2_id][0]["total_general"], 140)
+
+    def test_materialized_totals_follow_item_and_week_changes(self) -> None:
+        arroz_id = models.create_alimento("Arroz")
+        frijol_id = models.create_alimento("Frijol")
+        m1_id = models.create_minuta("M1")
+        m2_id = models.create_minuta("M2")
+        jardin_id = models.create_jardin("J1")
+        models.add_minuta_a_semana(jardin_id, m1_id)
+        models.add_minuta_a_semana(jardin_id, m2_id)
+
+        models.add_or_update_item(m1_id, arroz_id, 50, 70)
+        models.add_or_update_item(m2_id, arroz_id, 25, 30)
+        models.add_or_update_item_by_group(m2_id, frijol_id, "g2", 15)
+        models.add_or_update_item(m1_id, arroz_id, 40, 70)
+
+        def assert_matches_raw() -> None:
+            week = [row["minuta_id"] for row in models.list_jardin_minutas_semana(jardin_id)]
+            self.assertEqual(
+                models.calculate_weekly_order_for_jardin(jardin_id, 2, 3),
+                models.calculate_weekly_order(week, 2, 3),
+            )
+            self.assertEqual(models.check_weekly_totals(), 0)
+
+        assert_matches_raw()
+        models.remove_minuta_de_semana(jardin_id, m1_id)
+        assert_matches_raw()
+        models.delete_alimento(frijol_id)
+        assert_matches_raw()
+        models.delete_minuta(m2_id)
+        assert_matches_raw()
+        self.assertEqual(models.calculate_weekly_order_for_jardin(jardin_id, 2, 3), [])
+
+    def test_rebuild_repairs_drifted_totals(self) -> None:
+        arroz_id = models.create_alimento("Arroz")
+        m1_id = models.create_minuta("M1")
+        jardin_id = models.create_jardin("J1")
+        models.add_minuta_a_semana(jardin_id, m1_id)
+        models.add_or_update_item(m1_id, arroz_id, 50, 70)
+
+        db.get_connection().execute("UPDATE jardin_semana_totales SET suma_gramos_g1 = 1")
+        self.assertEqual(models.check_weekly_totals(), 2)
+        self.assertEqual(models.rebuild_weekly_totals(), 2)
+        self.assertEqual(models.check_weekly_totals(), 0)
+        self.assertEqual(models.calculate_weekly_order_for_jardin(jardin_id, 1, 0)[0]["suma_gramos_g1"], 50)
+
+
+class WeekOrderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "test_minutas.db"
+        db.init_db()
+        self.jardin_id = models.create_jardin("Sol")
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        self._tmpdir.cleanup()
+
+    def _week(self, jardin_id: int | None = None) -> list[int]:
+        rows = models.list_jardin_minutas_semana(jardin_id or self.jardin_id)
+        self.assertEqual([row["orden"] for row in rows], list(range(1, len(rows) + 1)))
+        return [row["minuta_id"] for row in rows]
+
+    def _fill_week(self, size: int, jardin_id: int | None = None) -> list[int]:
+        minuta_ids = [models.create_minuta(f"M{i}") for i in range(size)]
+        for minuta_id in minuta_ids:
+            models.add_minuta_a_semana(jardin_id or self.jardin_id, minuta_id)
+        return minuta_ids
+
+    def _count_statements(self, action) -> int:
+        statements: list[str] = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            action()
+        finally:
+            conn.set_trace_callback(None)
+        return len(set(statements))
+
+    def test_add_appends_once(self) -> None:
+        a, b = self._fill_week(2)
+        models.add_minuta_a_semana(self.jardin_id, a)
+        self.assertEqual(self._week(), [a, b])
+
+    def test_move_shift_and_remove_keep_positions_contiguous(self) -> None:
+        a, b, c, d, e = self._fill_week(5)
+
+        self.assertEqual(models.move_minuta_en_semana(self.jardin_id, d, 1), 1)
+        self.assertEqual(self._week(), [d, a, b, c, e])
+        self.assertEqual(models.move_minuta_en_semana(self.jardin_id, d, 99), 5)
+        self.assertEqual(self._week(), [a, b, c, e, d])
+        self.assertEqual(models.shift_minuta_en_semana(self.jardin_id, b, -1), 1)
+        self.assertEqual(models.shift_minuta_en_semana(self.jardin_id, b, -1), 1)
+        self.assertEqual(self._week(), [b, a, c, e, d])
+        self.assertEqual(models.shift_minuta_en_semana(self.jardin_id, a, 2), 4)
+        self.assertEqual(self._week(), [b, c, e, a, d])
+
+        models.remove_minuta_de_semana(self.jardin_id, c)
+        self.assertEqual(self._week(), [b, e, a, d])
+        with self.assertRaises(ValueError):
+            models.move_minuta_en_semana(self.jardin_id, c, 1)
+
+    def test_reorder_applies_full_order_and_rejects_partial_lists(self) -> None:
+        a, b, c = self._fill_week(3)
+        models.reorder_semana(self.jardin_id, [c, a, b])
+        self.assertEqual(self._week(), [c, a, b])
+        for invalid in ([c, a], [c, a, a], [c, a, b, 999]):
+            with self.assertRaises(ValueError):
+                models.reorder_semana(self.jardin_id, invalid)
+        self.assertEqual(self._week(), [c, a, b])
+
+    def test_reordering_does_not_touch_weekly_totals(self) -> None:
+        arroz_id = models.create_alimento("Arroz")
+        a, b = self._fill_week(2)
+        models.add_or_update_item(a, arroz_id, 10, 20)
+        models.add_or_update_item(b, arroz_id, 5, 5)
+        models.reorder_semana(self.jardin_id, [b, a])
+        models.move_minuta_en_semana(self.jardin_id, a, 2)
+        self.assertEqual(models.check_weekly_totals(), 0)
+        self.assertEqual(models.calculate_weekly_order_for_jardin(self.jardin_id, 1, 1)[0]["total_general"], 40)
+
+    def test_assign_appends_minutas_to_many_jardines_in_order(self) -> None:
+        a, b, c = self._fill_week(3)
+        otro = models.create_jardin("Luna")
+        vacio = models.create_jardin("Estrella")
+        models.add_minuta_a_semana(otro, b)
+
+        inserted = models.assign_minutas_a_jardines([self.jardin_id, otro, vacio, 999], [c, a, 999])
+
+        self.assertEqual(inserted, 4)
+        self.assertEqual(self._week(), [a, b, c])
+        self.assertEqual(self._week(otro), [b, c, a])
+        self.assertEqual(self._week(vacio), [c, a])
+        self.assertEqual(models.check_weekly_totals(), 0)
+
+    def test_copy_replaces_destination_weeks_with_source_order(self) -> None:
+        arroz_id = models.create_alimento("Arroz")
+        a, b, c = self._fill_week(3)
+        models.add_or_update_item(b, arroz_id, 10, 20)
+        models.reorder_semana(self.jardin_id, [c, a, b])
+        luna = models.create_jardin("Luna")
+        estrella = models.create_jardin("Estrella")
+        models.add_minuta_a_semana(luna, b)
+        models.add_minuta_a_semana(luna, models.create_minuta("Sólo Luna"))
+
+        self.assertEqual(models.copy_semana(self.jardin_id, [luna, estrella, self.jardin_id]), 6)
+
+        self.assertEqual(self._week(luna), [c, a, b])
+        self.assertEqual(self._week(estrella), [c, a, b])
+        self.assertEqual(self._week(), [c, a, b])
+        self.assertEqual(models.check_weekly_totals(), 0)
+        self.assertEqual(
+            models.calculate_weekly_order_for_jardin(estrella, 1, 1),
+            models.calculate_weekly_order_for_jardin(self.jardin_id, 1, 1),
+        )
+
+    def test_copy_from_missing_origin_keeps_destination_weeks(self) -> None:
+        a, b = self._fill_week(2)
+        luna = models.create_jardin("Luna")
+        models.add_minuta_a_semana(luna, b)
+
+        with self.assertRaises(ValueError):
+            models.copy_semana(999, [self.jardin_id, luna])
+
+        self.assertEqual(self._week(), [a, b])
+        self.assertEqual(self._week(luna), [b])
+
+    def test_copy_never_clears_the_origin_even_as_a_string_id(self) -> None:
+        a, b = self._fill_week(2)
+        luna = models.create_jardin("Luna")
+
+        self.assertEqual(models.copy_semana(str(self.jardin_id), [str(self.jardin_id), luna]), 2)
+
+        self.assertEqual(self._week(), [a, b])
+        self.assertEqual(self._week(luna), [a, b])
+
+    def test_copy_of_empty_week_clears_destinations(self) -> None:
+        (a,) = self._fill_week(1)
+        vacio = models.create_jardin("Vacío")
+
+        self.assertEqual(models.copy_semana(vacio, [self.jardin_id]), 0)
+
+        self.assertEqual(self._week(), [])
+        self.assertEqual(models.check_weekly_totals(), 0)
+
+    def test_statement_count_does_not_depend_on_week_length(self) -> None:
+        counts = []
+        for size in (4, 60):
+            jardin_id = models.create_jardin(f"Jardín {size}")
+            week = self._fill_week(size, jardin_id)
+            counts.append(
+                [
+                    self._count_statements(lambda: models.move_minuta_en_semana(jardin_id, week[-1], 1)),
+                    self._count_statements(lambda: models.shift_minuta_en_semana(jardin_id, week[0], 1)),
+                    self._count_statements(lambda: models.reorder_semana(jardin_id, list(reversed(week)))),
+                    self._count_statements(lambda: models.remove_minuta_de_semana(jardin_id, week[1])),
+                    self._count_statements(lambda: models.add_minuta_a_semana(jardin_id, week[1])),
+                ]
+            )
+            self.assertEqual(len(self._week(jardin_id)), size)
+        self.assertEqual(counts[0], counts[1])
+
 
 class WeeklyOrderPedidoFinalFormatTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db.DATA_DIR = Path(self._tmpdir.name)
+        db.DB_PATH = db.DATA_DIR / "test_minutas.db"
+        db.init_db()
+        seed.seed_if_empty()
+        self.jardin_id = models.create_jardin("Sol")
+        self.minuta_id = models.create_minuta("M1")
+        models.add_minuta_a_semana(self.jardin_id, self.minuta_id)
+
+    def tearDown(self) -> None:
+        db.close_connection()
+        self._tmpdir.cleanup()
+
+    def _pedido(self, nombre: str, gramos: float, ninos: int = 1) -> str:
+        alimento_id = models.find_alimento_id(nombre) or models.create_alimento(nombre)
+        models.add_or_update_item(self.minuta_id, alimento_id, gramos, gramos)
+        resumen = models.calculate_weekly_order_for_jardin(self.jardin_id, ninos, 0)
+        return next(row["pedido_final"] for row in resumen if row["alimento_id"] == alimento_id)
+
     def test_pounds_rounds_half_up_at_point_five(self) -> None:
-        self.assertEqual(format_pedido_final("Ahuyama", 5750), "12 lb")
+        self.assertEqual(self._pedido("Ahuyama", 575, ninos=10), "12 lb")
 
     def test_pounds_rounds_down_when_below_point_five(self) -> None:
-        self.assertEqual(format_pedido_final("Arroz", 5200), "10 lb")
+        self.assertEqual(self._pedido("Arroz", 520, ninos=10), "10 lb")
 
     def test_non_pounds_food_keeps_grams(self) -> None:
-        self.assertEqual(format_pedido_final("Yuca", 5750), "5750 g")
+        self.assertEqual(self._pedido("Yuca", 575, ninos=10), "5750 g")
+
+    def test_seed_units_cover_catalog_names_the_old_list_missed(self) -> None:
+        self.assertEqual(self._pedido("Mango, maduro pulpa", 1000), "2 lb")
+        self.assertEqual(self._pedido("Tomate de árbol", 1000), "2 lb")
+
+    def test_rounding_rules_and_package_size(self) -> None:
+        leche = models.create_alimento("Leche en bolsa")
+        models.set_alimento_unidad(leche, "bolsa", 1100, redondeo="arriba")
+        self.assertEqual(self._pedido("Leche en bolsa", 2300), "3 bolsa")
+
+        models.set_alimento_unidad(leche, "L", 1000, redondeo="ninguno")
+        self.assertEqual(self._pedido("Leche en bolsa", 2300), "2.3 L")
+
+        models.set_alimento_unidad(leche, "L", 1000, tamano_paquete=6)
+        self.assertEqual(self._pedido("Leche en bolsa", 6100), "12 L")
+
+        models.clear_alimento_unidad(leche)
+        self.assertEqual(self._pedido("Leche en bolsa", 2300), "2300 g")
+
+        with self.assertRaises(ValueError):
+            models.set_alimento_unidad(leche, "L", 0)
+        with self.assertRaises(ValueError):
+            models.set_alimento_unidad(leche, "L", 1000, redondeo="banquero")
+
+    def test_unit_table_is_reloaded_only_when_its_version_changes(self) -> None:
+        first = unidades.load_unidades()
+        self.assertIs(unidades.load_unidades(), first)
 
+        models.set_alimento_unidad(models.find_alimento_id("Yuca") or models.create_alimento("Yuca"), "kg", 1000)
+        second = unidades.load_unidades()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second), len(first) + 1)
 
 
 if __name__ == "__main__":